@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DATABASE_URL, create_pool
+from repositories.ads import GET_OPEN_AD_FEATURES_QUERY, GET_OPEN_AD_QUERY, AdsRepository
+
+
+async def _seed(pool, count: int, description_length: int) -> tuple[int, list[int]]:
+    seller_id = await pool.fetchval("INSERT INTO users (is_verified_seller) VALUES (TRUE) RETURNING id")
+    rows = await pool.fetch(
+        """
+        INSERT INTO ads (seller_id, name, description, category, images_qty)
+        SELECT $1, 'bench', repeat(md5(g::text), $3 / 32 + 1), g % 100 + 1, g % 10
+        FROM generate_series(1, $2) AS g
+        RETURNING id
+        """,
+        seller_id,
+        count,
+        description_length,
+    )
+    return seller_id, [r["id"] for r in rows]
+
+
+async def _cleanup(pool, seller_id: int, item_ids: list[int]) -> None:
+    await pool.execute("DELETE FROM ads WHERE id = ANY($1::integer[])", item_ids)
+    await pool.execute("DELETE FROM users WHERE id = $1", seller_id)
+
+
+async def _row_bytes(pool, query: str, item_id: int) -> int:
+    # Uncompressed text size of the row, close to what goes over the wire
+    return await pool.fetchval(f"SELECT octet_length(t::text) FROM ({query}) AS t", item_id)
+
+
+async def _latencies(fn, item_ids: list[int]) -> np.ndarray:
+    samples = []
+    for item_id in item_ids:
+        start = time.perf_counter()
+        await fn(item_id)
+        samples.append(time.perf_counter() - start)
+    return np.asarray(samples) * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    pool = await create_pool(args.dsn)
+    repo = AdsRepository(pool)
+    try:
+        print(f"{'description':>11} {'query':>9} {'row bytes':>10} {'p50 ms':>8} {'p99 ms':>8}")
+        for length in (int(s) for s in args.lengths.split(",")):
+            seller_id, item_ids = await _seed(pool, args.ads, length)
+            try:
+                for name, query, fn in (
+                    ("full", GET_OPEN_AD_QUERY, repo.get_by_id),
+                    ("features", GET_OPEN_AD_FEATURES_QUERY, repo.get_features_by_id),
+                ):
+                    await _latencies(fn, item_ids[:10])
+                    ms = await _latencies(fn, item_ids)
+                    size = await _row_bytes(pool, query, item_ids[0])
+                    print(
+                        f"{length:>11} {name:>9} {size:>10} "
+                        f"{np.percentile(ms, 50):>8.3f} {np.percentile(ms, 99):>8.3f}"
+                    )
+            finally:
+                await _cleanup(pool, seller_id, item_ids)
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full ad row vs feature-only row for scoring lookups")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--ads", type=int, default=2000)
+    parser.add_argument("--lengths", default="100,5000,50000")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
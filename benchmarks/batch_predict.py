@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def _item(i: int) -> dict:
+    return {
+        "seller_id": i % 1000 + 1,
+        "is_verified_seller": bool(i % 2),
+        "item_id": i + 1,
+        "name": "Item",
+        "description": "x" * (i % 500 + 1),
+        "category": i % 100 + 1,
+        "images_qty": i % 10,
+    }
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Throughput of POST /predict/batch vs POST /predict")
+    parser.add_argument("--sizes", default="1,10,100,1000,10000")
+    parser.add_argument("--single-limit", type=int, default=1000)
+    args = parser.parse_args()
+
+    with TestClient(main.app) as client:
+        main.app.state.cache = None
+        print(f"{'batch':>6} {'batch items/s':>14} {'single items/s':>15} {'speedup':>8}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            items = [_item(i) for i in range(size)]
+            client.post("/predict/batch", json={"items": items[:1]})
+
+            start = time.perf_counter()
+            response = client.post("/predict/batch", json={"items": items})
+            batch_rate = size / (time.perf_counter() - start)
+            assert response.status_code == 200
+
+            single_rate = None
+            if size <= args.single_limit:
+                start = time.perf_counter()
+                for item in items:
+                    client.post("/predict", json=item)
+                single_rate = size / (time.perf_counter() - start)
+            single = f"{single_rate:>15.0f}" if single_rate else f"{'-':>15}"
+            speedup = f"{batch_rate / single_rate:>7.1f}x" if single_rate else f"{'-':>8}"
+            print(f"{size:>6} {batch_rate:>14.0f} {single} {speedup}")
+
+
+if __name__ == "__main__":
+    run()
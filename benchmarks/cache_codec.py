@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+from storages.cache_codec import decode_value, encode_value, get_codec, payload_to_json
+
+
+def _values(count: int) -> list[dict]:
+    rng = np.random.default_rng(0)
+    return [
+        {"is_violation": bool(p > 0.5), "probability": float(p)}
+        for p in rng.random(count)
+    ]
+
+
+def _legacy_hit(payload: str) -> Response:
+    # decode_responses=True client + json.loads + FastAPI re-serialization
+    return JSONResponse(jsonable_encoder(json.loads(payload)))
+
+
+def _passthrough_hit(payload: bytes) -> Response:
+    return Response(content=payload_to_json(payload), media_type="application/json")
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    us = np.asarray(samples) * 1e6
+    return float(np.percentile(us, 50)), float(np.percentile(us, 99))
+
+
+def _time_each(fn, payloads) -> list[float]:
+    samples = []
+    for payload in payloads:
+        start = time.perf_counter()
+        fn(payload)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _redis_report(url: str, formats: dict[str, list], keys: int) -> None:
+    from redis.asyncio import Redis
+
+    client = Redis.from_url(url)
+    try:
+        print(f"\n{'format':>12} {'MEMORY USAGE B/key':>20} {'GET p50 us':>12} {'GET p99 us':>12}")
+        for name, payloads in formats.items():
+            names = [f"bench:codec:{name}:{i}" for i in range(keys)]
+            pipe = client.pipeline(transaction=False)
+            for key, payload in zip(names, payloads):
+                pipe.set(key, payload, ex=600)
+            await pipe.execute()
+            usage = [await client.memory_usage(key) for key in names[:1000]]
+            samples = []
+            for key in names:
+                start = time.perf_counter()
+                await client.get(key)
+                samples.append(time.perf_counter() - start)
+            p50, p99 = _percentiles(samples)
+            print(f"{name:>12} {np.mean(usage):>20.1f} {p50:>12.1f} {p99:>12.1f}")
+            await client.delete(*names)
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Size and cache-hit latency of prediction cache codecs")
+    parser.add_argument("--keys", type=int, default=20000)
+    parser.add_argument("--redis-url", help="also report Redis MEMORY USAGE and GET latency")
+    args = parser.parse_args()
+
+    values = _values(args.keys)
+    formats = {
+        "legacy json": [json.dumps(v) for v in values],
+        "json": [encode_value(v, get_codec("json")) for v in values],
+        "struct": [encode_value(v, get_codec("struct")) for v in values],
+    }
+    for payload, value in zip(formats["struct"], values):
+        assert decode_value(payload) == value
+
+    print(f"{'format':>12} {'value bytes':>12} {'hit p50 us':>12} {'hit p99 us':>12}")
+    for name, payloads in formats.items():
+        fn = _legacy_hit if name == "legacy json" else _passthrough_hit
+        _time_each(fn, payloads[:1000])
+        p50, p99 = _percentiles(_time_each(fn, payloads))
+        size = np.mean([len(p) for p in payloads])
+        print(f"{name:>12} {size:>12.1f} {p50:>12.2f} {p99:>12.2f}")
+
+    if args.redis_url:
+        asyncio.run(_redis_report(args.redis_url, formats, args.keys))
+
+
+if __name__ == "__main__":
+    main()
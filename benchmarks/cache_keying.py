@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storages.cache import cache_key_features, cache_key_predict
+
+
+def _synthetic(count: int, seed: int):
+    # Zipf-distributed items, as with repeated moderation of popular ads
+    rng = np.random.default_rng(seed)
+    items = rng.zipf(1.3, count) % 200000
+    for item_id in items.tolist():
+        item = np.random.default_rng(item_id)
+        yield {
+            "seller_id": int(item.integers(1, 50000)),
+            "is_verified_seller": bool(item.random() < 0.3),
+            "item_id": item_id + 1,
+            "description": "x" * int(item.lognormal(5, 1) % 3000),
+            "category": int(item.integers(1, 100)),
+            "images_qty": int(item.integers(0, 10)),
+        }
+
+
+def _replay(path: str):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _request_key(p: dict) -> str:
+    return cache_key_predict(
+        "v", p["seller_id"], p["is_verified_seller"], p["item_id"], len(p["description"]), p["category"], p["images_qty"]
+    )
+
+
+def _feature_key(p: dict) -> str:
+    return cache_key_features(
+        "v", p["is_verified_seller"], p["images_qty"], len(p["description"]), p["category"]
+    )
+
+
+class _LRU:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.keys: OrderedDict[str, None] = OrderedDict()
+        self.hits = 0
+        self.lookups = 0
+
+    def access(self, key: str) -> bool:
+        self.lookups += 1
+        if key in self.keys:
+            self.keys.move_to_end(key)
+            self.hits += 1
+            return True
+        self.keys[key] = None
+        if len(self.keys) > self.capacity:
+            self.keys.popitem(last=False)
+        return False
+
+    @property
+    def ratio(self) -> float:
+        return self.hits / max(self.lookups, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hit ratio of per-request vs feature-space cache keys")
+    parser.add_argument("--input", help="NDJSON of /predict payloads to replay (synthetic traffic if omitted)")
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--capacities", default="1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    payloads = list(_replay(args.input) if args.input else _synthetic(args.requests, args.seed))
+    request_keys = [_request_key(p) for p in payloads]
+    feature_keys = [_feature_key(p) for p in payloads]
+    print(
+        f"{len(payloads)} requests, {len(set(request_keys))} distinct request keys, "
+        f"{len(set(feature_keys))} distinct feature keys"
+    )
+    print(f"{'capacity':>9} {'request key':>12} {'feature key':>12} {'feature+request':>16}")
+    for capacity in (int(c) for c in args.capacities.split(",")):
+        request_lru = _LRU(capacity)
+        feature_lru = _LRU(capacity)
+        # Both tiers share the same Redis, so split the capacity between them
+        tiered_feature = _LRU(capacity // 2)
+        tiered_request = _LRU(capacity - capacity // 2)
+        tiered_hits = 0
+        for request_key, feature_key in zip(request_keys, feature_keys):
+            request_lru.access(request_key)
+            feature_lru.access(feature_key)
+            # /predict checks the feature key first and only then the request key
+            if tiered_feature.access(feature_key) or tiered_request.access(request_key):
+                tiered_hits += 1
+        print(
+            f"{capacity:>9} {request_lru.ratio:>12.1%} {feature_lru.ratio:>12.1%} "
+            f"{tiered_hits / max(len(payloads), 1):>16.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DATABASE_URL, create_pool
+from repositories.ads import AdsRepository
+
+
+async def _seed(pool, count: int, results_per_ad: int) -> tuple[int, list[int]]:
+    seller_id = await pool.fetchval("INSERT INTO users (is_verified_seller) VALUES (FALSE) RETURNING id")
+    rows = await pool.fetch(
+        """
+        INSERT INTO ads (seller_id, name, description, category, images_qty)
+        SELECT $1, 'bench', 'x', 1, 0 FROM generate_series(1, $2)
+        RETURNING id
+        """,
+        seller_id,
+        count,
+    )
+    item_ids = [r["id"] for r in rows]
+    await pool.execute(
+        """
+        INSERT INTO moderation_results (item_id, status)
+        SELECT item_id, 'pending'
+        FROM UNNEST($1::integer[]) AS item_id, generate_series(1, $2)
+        """,
+        item_ids,
+        results_per_ad,
+    )
+    return seller_id, item_ids
+
+
+async def _cleanup(pool, seller_id: int, item_ids: list[int]) -> None:
+    await pool.execute("DELETE FROM moderation_results WHERE item_id = ANY($1::integer[])", item_ids)
+    await pool.execute("DELETE FROM ads WHERE id = ANY($1::integer[])", item_ids)
+    await pool.execute("DELETE FROM users WHERE id = $1", seller_id)
+
+
+async def _close_three_statements(pool, item_id: int) -> float:
+    # The previous close_ad: row locks are held from the UPDATE until COMMIT
+    async with pool.acquire() as conn:
+        tx = conn.transaction()
+        await tx.start()
+        locked = time.perf_counter()
+        await conn.fetchrow(
+            "UPDATE ads SET is_closed = TRUE WHERE id = $1 AND is_closed = FALSE RETURNING id", item_id
+        )
+        await conn.fetch("SELECT id FROM moderation_results WHERE item_id = $1", item_id)
+        await conn.execute("DELETE FROM moderation_results WHERE item_id = $1", item_id)
+        await tx.commit()
+        return time.perf_counter() - locked
+
+
+async def _close_cte(pool, item_id: int) -> float:
+    start = time.perf_counter()
+    await AdsRepository(pool).close_with_results(item_id)
+    return time.perf_counter() - start
+
+
+def _row(name: str, latencies: list[float], lock_hold: list[float]) -> str:
+    ms = np.asarray(latencies) * 1000
+    hold = np.asarray(lock_hold) * 1000
+    return (
+        f"{name:>16} {np.percentile(ms, 50):>8.2f} {np.percentile(ms, 99):>8.2f}"
+        f" {np.percentile(hold, 50):>10.2f} {np.percentile(hold, 99):>10.2f}"
+    )
+
+
+async def _bench_single(pool, count: int, results_per_ad: int) -> None:
+    print(f"{'path':>16} {'p50 ms':>8} {'p99 ms':>8} {'lock p50':>10} {'lock p99':>10}")
+    for name, close in (("3 statements", _close_three_statements), ("CTE", _close_cte)):
+        seller_id, item_ids = await _seed(pool, count, results_per_ad)
+        latencies, lock_hold = [], []
+        try:
+            for item_id in item_ids:
+                start = time.perf_counter()
+                lock_hold.append(await close(pool, item_id))
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await _cleanup(pool, seller_id, item_ids)
+        print(_row(name, latencies, lock_hold))
+
+
+async def _timed_close(pool, size: int, results_per_ad: int, close) -> float:
+    seller_id, item_ids = await _seed(pool, size, results_per_ad)
+    try:
+        start = time.perf_counter()
+        await close(item_ids)
+        return time.perf_counter() - start
+    finally:
+        await _cleanup(pool, seller_id, item_ids)
+
+
+async def _bench_batch(pool, sizes: list[int], results_per_ad: int) -> None:
+    print(f"{'ads':>6} {'one by one ms':>14} {'batch ms':>9} {'speedup':>8}")
+    repo = AdsRepository(pool)
+
+    async def one_by_one(item_ids):
+        for item_id in item_ids:
+            await repo.close_with_results(item_id)
+
+    for size in sizes:
+        single = await _timed_close(pool, size, results_per_ad, one_by_one)
+        batch = await _timed_close(pool, size, results_per_ad, repo.close_many_with_results)
+        print(f"{size:>6} {single * 1000:>14.1f} {batch * 1000:>9.1f} {single / max(batch, 1e-9):>7.1f}x")
+
+
+async def run(args: argparse.Namespace) -> None:
+    pool = await create_pool(args.dsn)
+    try:
+        await _bench_single(pool, args.ads, args.results_per_ad)
+        print()
+        await _bench_batch(pool, [int(s) for s in args.batch_sizes.split(",")], args.results_per_ad)
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="close_ad: three statements in a transaction vs one CTE")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--ads", type=int, default=1000)
+    parser.add_argument("--results-per-ad", type=int, default=3)
+    parser.add_argument("--batch-sizes", default="100,1000,10000")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DATABASE_URL, create_pool
+from repositories.ads import AdsRepository
+from repositories.moderation_results import ModerationResultsRepository
+
+
+async def _seed(pool, count: int) -> tuple[int, list[int]]:
+    seller_id = await pool.fetchval("INSERT INTO users (is_verified_seller) VALUES (TRUE) RETURNING id")
+    rows = await pool.fetch(
+        """
+        INSERT INTO ads (seller_id, name, description, category, images_qty)
+        SELECT $1, 'bench', repeat('x', g % 500 + 1), g % 100 + 1, g % 10
+        FROM generate_series(1, $2) AS g
+        RETURNING id
+        """,
+        seller_id,
+        count,
+    )
+    return seller_id, [r["id"] for r in rows]
+
+
+async def _cleanup(pool, seller_id: int, item_ids: list[int]) -> None:
+    await pool.execute("DELETE FROM moderation_results WHERE item_id = ANY($1::integer[])", item_ids)
+    await pool.execute("DELETE FROM ads WHERE id = ANY($1::integer[])", item_ids)
+    await pool.execute("DELETE FROM users WHERE id = $1", seller_id)
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def _loop(fn, args_list):
+    for args in args_list:
+        await fn(*args)
+
+
+async def _bench_size(pool, size: int) -> list[tuple[str, float, float]]:
+    ads_repo = AdsRepository(pool)
+    results_repo = ModerationResultsRepository(pool)
+    seller_id, item_ids = await _seed(pool, size)
+    try:
+        get_single = await _timed(_loop(ads_repo.get_by_id, [(i,) for i in item_ids]))
+        get_bulk = await _timed(ads_repo.get_many(item_ids))
+
+        task_ids = []
+        start = time.perf_counter()
+        for item_id in item_ids:
+            task_ids.append(await results_repo.create(item_id))
+        create_single = time.perf_counter() - start
+        start = time.perf_counter()
+        bulk_task_ids = await results_repo.create_many(item_ids)
+        create_bulk = time.perf_counter() - start
+
+        completed = [(task_id, bool(task_id % 2), 0.5) for task_id in task_ids]
+        update_single = await _timed(_loop(results_repo.update_completed, completed))
+        update_bulk = await _timed(
+            results_repo.update_completed_many([(t, bool(t % 2), 0.5) for t in bulk_task_ids])
+        )
+    finally:
+        await _cleanup(pool, seller_id, item_ids)
+    return [
+        ("get", get_single, get_bulk),
+        ("create", create_single, create_bulk),
+        ("update_completed", update_single, update_bulk),
+    ]
+
+
+async def run(dsn: str, sizes: list[int]) -> None:
+    pool = await create_pool(dsn)
+    try:
+        print(f"{'rows':>6} {'operation':>17} {'per-row ms':>11} {'bulk ms':>9} {'speedup':>8}")
+        for size in sizes:
+            for name, single, bulk in await _bench_size(pool, size):
+                print(
+                    f"{size:>6} {name:>17} {single * 1000:>11.1f} {bulk * 1000:>9.1f}"
+                    f" {single / max(bulk, 1e-9):>7.1f}x"
+                )
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs bulk repository queries against PostgreSQL")
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--sizes", default="1,100,10000")
+    args = parser.parse_args()
+    asyncio.run(run(args.dsn, [int(s) for s in args.sizes.split(",")]))
+
+
+if __name__ == "__main__":
+    main()
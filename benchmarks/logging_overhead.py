@@ -0,0 +1,74 @@
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logging_config import ContextFilter, DroppingQueueHandler, JsonFormatter, SamplingFilter
+
+_RECORD_DEFAULTS = (logging.logProcesses, logging.logMultiprocessing, logging._srcfile)
+
+
+def _emit_requests(logger: logging.Logger, count: int) -> float:
+    features = [[0.0, 0.1, 0.012, 0.07]]
+    start = time.perf_counter()
+    for i in range(count):
+        logger.info("Request: seller_id=%s, item_id=%s, features=%s", i, i, features)
+        logger.info("Prediction: is_violation=%s, probability=%s", False, 0.12)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def _run(name: str, count: int, use_queue: bool, rate: float, fmt: logging.Formatter) -> None:
+    # setup_logging() also stops LogRecord from collecting caller/process info.
+    logging.logProcesses, logging.logMultiprocessing, logging._srcfile = (
+        (False, False, None) if use_queue else _RECORD_DEFAULTS
+    )
+    with tempfile.NamedTemporaryFile(suffix=".log", delete=False) as tmp:
+        path = tmp.name
+    output = logging.FileHandler(path)
+    output.setFormatter(fmt)
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    listener = None
+    if use_queue:
+        handler = DroppingQueueHandler(queue.Queue(maxsize=count * 2 + 1))
+        handler.addFilter(SamplingFilter({"bench": rate}))
+        handler.addFilter(ContextFilter())
+        listener = logging.handlers.QueueListener(handler.queue, output)
+        listener.start()
+    else:
+        handler = output
+    logger.addHandler(handler)
+    try:
+        per_request_us = _emit_requests(logger, count)
+    finally:
+        if listener is not None:
+            listener.stop()
+        logger.removeHandler(handler)
+        output.close()
+    size = os.path.getsize(path)
+    os.remove(path)
+    print(f"{name:>24} {per_request_us:>14.2f} {size / count:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and volume of prediction-path logging")
+    parser.add_argument("--requests", type=int, default=50000)
+    args = parser.parse_args()
+
+    text = logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+    print(f"{'setup':>24} {'us/request':>14} {'bytes/request':>14}")
+    _run("sync file (basicConfig)", args.requests, False, 1.0, text)
+    _run("queue text", args.requests, True, 1.0, text)
+    _run("queue json", args.requests, True, 1.0, JsonFormatter())
+    _run("queue json sampled 1%", args.requests, True, 0.01, JsonFormatter())
+
+
+if __name__ == "__main__":
+    main()
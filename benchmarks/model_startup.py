@@ -0,0 +1,73 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import load_artifact, load_model, save_artifact, save_model, train_model
+from services.predict_service import FEATURE_NAMES, FEATURE_SCALES
+from services.scorer import build_scorer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = {
+    "pickle": "from model import load_model; from services.scorer import build_scorer; "
+    "build_scorer(load_model({path!r}))",
+    "artifact": "from model import load_artifact; from services.scorer import build_scorer; "
+    "build_scorer(load_artifact({path!r}))",
+    "mlflow": "from model import load_model_from_mlflow; load_model_from_mlflow()",
+}
+
+
+def _cold_start_ms(code: str, runs: int) -> float | None:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True
+        )
+        if result.returncode != 0:
+            return None
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _warm_load_us(fn, number: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model startup time for pickle and mmap artifact")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mlflow", action="store_true", help="also measure MLflow registry loading")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = train_model()
+        pickle_path = os.path.join(tmp, "model.pkl")
+        artifact_path = os.path.join(tmp, "model.bin")
+        save_model(model, pickle_path)
+        save_artifact(model, artifact_path, FEATURE_NAMES, FEATURE_SCALES)
+
+        print(f"{'format':>10} {'size B':>8} {'cold start ms':>14} {'warm load us':>13}")
+        for name, path, loader in (
+            ("pickle", pickle_path, load_model),
+            ("artifact", artifact_path, load_artifact),
+        ):
+            cold = _cold_start_ms(COLD_START[name].format(path=path), args.runs)
+            warm = _warm_load_us(lambda: build_scorer(loader(path)))
+            print(f"{name:>10} {os.path.getsize(path):>8} {cold:>14.1f} {warm:>13.1f}")
+        if args.mlflow:
+            cold = _cold_start_ms(COLD_START["mlflow"], args.runs)
+            print(f"{'mlflow':>10} {'-':>8} {cold if cold is not None else float('nan'):>14.1f} {'-':>13}")
+
+
+if __name__ == "__main__":
+    main()
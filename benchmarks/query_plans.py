@@ -0,0 +1,183 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import asyncpg
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DATABASE_URL
+from repositories.ads import GET_OPEN_AD_FEATURES_QUERY, GET_OPEN_AD_QUERY, GET_OPEN_ADS_FEATURES_QUERY
+from repositories.moderation_results import UPDATE_COMPLETED_MANY_QUERY
+
+# Schema before V0005-V0008, recreated inside a rolled-back transaction
+BASELINE_DDL = (
+    "DROP INDEX IF EXISTS idx_ads_open_features",
+    "DROP INDEX IF EXISTS idx_users_id_verified",
+    "DROP INDEX IF EXISTS idx_moderation_results_pending",
+    "CREATE INDEX IF NOT EXISTS idx_moderation_results_status ON moderation_results(status)",
+)
+
+
+async def seed(conn: asyncpg.Connection, rows: int) -> None:
+    existing = await conn.fetchval("SELECT count(*) FROM ads")
+    if existing >= rows:
+        print(f"ads already has {existing} rows, skipping seed")
+        return
+    missing = rows - existing
+    print(f"seeding {missing} ads and moderation results...")
+    await conn.execute(
+        "INSERT INTO users (is_verified_seller) SELECT g % 3 = 0 FROM generate_series(1, $1) AS g",
+        max(missing // 10, 1),
+    )
+    max_user = await conn.fetchval("SELECT max(id) FROM users")
+    await conn.execute(
+        """
+        INSERT INTO ads (seller_id, name, description, category, images_qty, is_closed)
+        SELECT 1 + (g * 7919) % $2, 'ad ' || g, repeat('x', g % 2000 + 1), g % 100 + 1, g % 10,
+               g % 10 = 0
+        FROM generate_series(1, $1) AS g
+        """,
+        missing,
+        max_user,
+    )
+    # Most results are finished; only a small tail is still pending
+    await conn.execute(
+        """
+        INSERT INTO moderation_results (item_id, status, is_violation, probability, processed_at, created_at)
+        SELECT a.id,
+               CASE WHEN a.id % 20 = 0 THEN 'pending' ELSE 'completed' END,
+               CASE WHEN a.id % 20 = 0 THEN NULL ELSE a.id % 7 = 0 END,
+               CASE WHEN a.id % 20 = 0 THEN NULL ELSE (a.id % 100) / 100.0 END,
+               CASE WHEN a.id % 20 = 0 THEN NULL ELSE now() END,
+               now() - (a.id % 90) * interval '1 day'
+        FROM ads a
+        WHERE a.id > $1
+        """,
+        await conn.fetchval("SELECT coalesce(max(item_id), 0) FROM moderation_results"),
+    )
+    await conn.execute("VACUUM ANALYZE users")
+    await conn.execute("VACUUM ANALYZE ads")
+    await conn.execute("VACUUM ANALYZE moderation_results")
+
+
+def _plan_summary(plan: dict) -> str:
+    nodes = []
+
+    def walk(node):
+        if "Index Name" in node:
+            nodes.append(f"{node['Node Type']} using {node['Index Name']}")
+        elif node["Node Type"].endswith("Scan"):
+            nodes.append(f"{node['Node Type']} on {node.get('Relation Name', '?')}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return "; ".join(nodes)
+
+
+async def _explain(conn: asyncpg.Connection, query: str, *args) -> dict:
+    result = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args)
+    return (json.loads(result) if isinstance(result, str) else result)[0]
+
+
+async def _latency_ms(conn: asyncpg.Connection, query: str, args_list: list) -> tuple[float, float]:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        await conn.fetch(query, *args)
+        samples.append(time.perf_counter() - start)
+    ms = np.asarray(samples) * 1000
+    return float(np.percentile(ms, 50)), float(np.percentile(ms, 99))
+
+
+async def _index_sizes(conn: asyncpg.Connection) -> list:
+    return await conn.fetch(
+        """
+        SELECT indexrelname, pg_relation_size(indexrelid) AS bytes
+        FROM pg_stat_user_indexes
+        WHERE relname IN ('ads', 'users', 'moderation_results')
+        ORDER BY relname, indexrelname
+        """
+    )
+
+
+async def measure(conn: asyncpg.Connection, label: str, samples: int, update_rows: int) -> None:
+    open_ids = [
+        r["id"]
+        for r in await conn.fetch(
+            "SELECT id FROM ads WHERE is_closed = FALSE ORDER BY random() LIMIT $1", samples
+        )
+    ]
+    print(f"\n== {label} ==")
+    for name, query, args_list in (
+        ("ads.get_features_by_id", GET_OPEN_AD_FEATURES_QUERY, [(i,) for i in open_ids]),
+        ("ads.get_by_id", GET_OPEN_AD_QUERY, [(i,) for i in open_ids]),
+        ("ads.get_features_many(100)", GET_OPEN_ADS_FEATURES_QUERY, [(open_ids[:100],)] * 20),
+    ):
+        plan = await _explain(conn, query, *args_list[0])
+        p50, p99 = await _latency_ms(conn, query, args_list)
+        print(f"{name:<28} p50={p50:.3f}ms p99={p99:.3f}ms")
+        print(f"{'':<28} {_plan_summary(plan)}")
+
+    pending = await conn.fetch(
+        "SELECT id FROM moderation_results WHERE status = 'pending' ORDER BY created_at LIMIT $1",
+        update_rows,
+    )
+    task_ids = [r["id"] for r in pending]
+    # Rolled back so both runs update the same pending rows
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        plan = await _explain(
+            conn,
+            UPDATE_COMPLETED_MANY_QUERY,
+            task_ids,
+            [True] * len(task_ids),
+            [0.5] * len(task_ids),
+        )
+    finally:
+        await tx.rollback()
+    name = f"update_completed_many({len(task_ids)})"
+    print(f"{name:<28} {plan['Execution Time']:.1f}ms")
+
+
+async def run(args: argparse.Namespace) -> None:
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        if args.seed:
+            await seed(conn, args.seed)
+        tx = conn.transaction()
+        await tx.start()
+        try:
+            for statement in BASELINE_DDL:
+                await conn.execute(statement)
+            await conn.execute("ANALYZE ads")
+            await measure(conn, "before (V0004 schema)", args.samples, args.update_rows)
+        finally:
+            await tx.rollback()
+        await measure(conn, "after (V0005-V0008)", args.samples, args.update_rows)
+        print()
+        for row in await _index_sizes(conn):
+            print(f"{row['indexrelname']:<40} {row['bytes'] / 2 ** 20:>8.1f} MiB")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN and latency of hot queries before/after the V0005-V0008 indexes"
+    )
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--seed", type=int, default=0, help="seed ads up to this many rows (e.g. 5000000)")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--update-rows", type=int, default=10000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
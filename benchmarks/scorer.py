@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import train_model
+from services.scorer import LinearScorer, SklearnScorer
+
+
+def _per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sklearn and linear fast-path scoring")
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    model = train_model()
+    sklearn_scorer = SklearnScorer(model)
+    linear_scorer = LinearScorer(model)
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>6} {'sklearn us':>12} {'linear us':>12} {'speedup':>8}")
+    for rows in (1, 16, 256, 4096):
+        features = rng.random((rows, 4))
+        number = max(10, args.number // rows)
+
+        def sklearn_call():
+            model.predict(features)
+            model.predict_proba(features)
+
+        sklearn_us = _per_call_us(sklearn_call, number)
+        linear_us = _per_call_us(lambda: linear_scorer.score(features), number)
+        fallback_us = _per_call_us(lambda: sklearn_scorer.score(features), number)
+        print(
+            f"{rows:>6} {sklearn_us:>12.1f} {linear_us:>12.1f} {sklearn_us / linear_us:>7.1f}x"
+            f"  (sklearn predict_proba only: {fallback_us:.1f} us)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from metrics import CIRCUIT_BREAKER_REJECTED_TOTAL, CIRCUIT_BREAKER_STATE
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+CIRCUIT_BREAKER_RESET_SECONDS = float(os.environ.get("CIRCUIT_BREAKER_RESET_SECONDS", "5"))
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_exceptions: tuple[type[BaseException], ...] = (Exception,),
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_BREAKER_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_exceptions = failure_exceptions
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._state_gauge = CIRCUIT_BREAKER_STATE.labels(dependency=name)
+        self._rejected = CIRCUIT_BREAKER_REJECTED_TOTAL.labels(dependency=name)
+        self._state_gauge.set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+            self.state = state
+            self._state_gauge.set(_STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        # Half-open lets a single probe through; its outcome closes or reopens
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self._rejected.inc()
+        return False
+
+    def record_success(self) -> None:
+        self._probing = False
+        self.failures = 0
+        self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def release(self) -> None:
+        # A probe that ended with a non-dependency error proves nothing
+        self._probing = False
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            result = await fn(*args, **kwargs)
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, failure_exceptions: tuple[type[BaseException], ...] = (Exception,)) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, failure_exceptions)
+    return breaker
+
+
+def get_breakers() -> dict[str, CircuitBreaker]:
+    return dict(_breakers)
@@ -1,9 +1,13 @@
+import asyncio
 import json
 import logging
 from datetime import datetime
 from typing import Optional
 
 from aiokafka import AIOKafkaProducer
+from aiokafka.errors import KafkaError
+
+from circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -11,21 +15,43 @@ KAFKA_BOOTSTRAP_SERVERS = "localhost:9092"
 MODERATION_TOPIC = "moderation"
 DLQ_TOPIC = "moderation_dlq"
 
+KAFKA_FAILURES = (KafkaError, OSError, asyncio.TimeoutError)
+
 
 class KafkaProducer:
-    def __init__(self, bootstrap_servers: str = KAFKA_BOOTSTRAP_SERVERS):
+    def __init__(
+        self,
+        bootstrap_servers: str = KAFKA_BOOTSTRAP_SERVERS,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         self.bootstrap_servers = bootstrap_servers
         self._producer: Optional[AIOKafkaProducer] = None
+        self._breaker = breaker
 
     async def start(self):
         if self._producer is None:
-            self._producer = AIOKafkaProducer(
+            producer = AIOKafkaProducer(
                 bootstrap_servers=self.bootstrap_servers,
                 value_serializer=lambda v: json.dumps(v).encode("utf-8"),
             )
-            await self._producer.start()
+            try:
+                await producer.start()
+            except BaseException:
+                await producer.stop()
+                raise
+            self._producer = producer
             logger.info("Kafka producer started")
 
+    async def _start_and_send(self, topic: str, message: dict):
+        await self.start()
+        await self._producer.send_and_wait(topic, message)
+
+    async def _send(self, topic: str, message: dict):
+        if self._breaker is None:
+            await self._start_and_send(topic, message)
+        else:
+            await self._breaker.call(self._start_and_send, topic, message)
+
     async def stop(self):
         if self._producer:
             await self._producer.stop()
@@ -33,24 +59,22 @@ class KafkaProducer:
             logger.info("Kafka producer stopped")
 
     async def send_moderation_request(self, item_id: int, task_id: int):
-        await self.start()
         message = {
             "item_id": item_id,
             "task_id": task_id,
             "timestamp": datetime.utcnow().isoformat() + "Z",
         }
-        await self._producer.send_and_wait(MODERATION_TOPIC, message)
+        await self._send(MODERATION_TOPIC, message)
         logger.info("Sent moderation request for item_id=%s task_id=%s", item_id, task_id)
 
     async def send_to_dlq(
         self, original_message: dict, error: str, retry_count: int = 0
     ):
-        await self.start()
         dlq_message = {
             "original_message": original_message,
             "error": error,
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "retry_count": retry_count,
         }
-        await self._producer.send_and_wait(DLQ_TOPIC, dlq_message)
+        await self._send(DLQ_TOPIC, dlq_message)
         logger.warning("Sent message to DLQ: %s", error)
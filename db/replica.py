@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from metrics import DB_READ_ROUTE_TOTAL, DB_REPLICA_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+REPLICA_READ_YOUR_WRITES_SECONDS = float(os.environ.get("REPLICA_READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "1"))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.environ.get("REPLICA_LAG_CHECK_INTERVAL_SECONDS", "1"))
+REPLICA_RECENT_WRITES_MAX_SIZE = int(os.environ.get("REPLICA_RECENT_WRITES_MAX_SIZE", "100000"))
+
+# A replica that has replayed everything it received is not lagging, even if
+# the primary has been idle and the last replayed transaction is old.
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+REPLICA = "replica"
+READ_YOUR_WRITES = "read_your_writes"
+REPLICA_LAG = "replica_lag"
+REPLICA_UNAVAILABLE = "replica_unavailable"
+REPLICA_ERROR = "replica_error"
+REPLICA_MISS = "replica_miss"
+
+
+class _FallbackReader:
+    def __init__(
+        self,
+        replica,
+        primary,
+        failures: tuple[type[BaseException], ...],
+        keys: Iterable[Any] = (),
+    ):
+        self._replica = replica
+        self._primary = primary
+        self._failures = (CircuitOpenError, *failures)
+        self._keys = keys
+
+    async def _read(self, method: str, *args, **kwargs):
+        try:
+            return await getattr(self._replica, method)(*args, **kwargs)
+        except self._failures as exc:
+            logger.warning("Replica read failed, retrying on primary: %s", exc)
+            DB_READ_ROUTE_TOTAL.labels(pool="primary", reason=REPLICA_ERROR).inc()
+            return await getattr(self._primary, method)(*args, **kwargs)
+
+    async def _confirm_on_primary(self, method: str, *args, **kwargs):
+        # A row written by another process may not have replayed yet; a miss
+        # must not turn into a 404 or a cached "not found"
+        DB_READ_ROUTE_TOTAL.labels(pool="primary", reason=REPLICA_MISS).inc()
+        return await getattr(self._primary, method)(*args, **kwargs)
+
+    async def fetch(self, *args, **kwargs):
+        rows = await self._read("fetch", *args, **kwargs)
+        if set(self._keys) - {row["id"] for row in rows}:
+            return await self._confirm_on_primary("fetch", *args, **kwargs)
+        return rows
+
+    async def fetchrow(self, *args, **kwargs):
+        row = await self._read("fetchrow", *args, **kwargs)
+        if row is None:
+            return await self._confirm_on_primary("fetchrow", *args, **kwargs)
+        return row
+
+    async def fetchval(self, *args, **kwargs):
+        value = await self._read("fetchval", *args, **kwargs)
+        if value is None:
+            return await self._confirm_on_primary("fetchval", *args, **kwargs)
+        return value
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary,
+        replica,
+        replica_breaker: CircuitBreaker,
+        read_your_writes: float = REPLICA_READ_YOUR_WRITES_SECONDS,
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+        lag_check_interval: float = REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+        max_recent_writes: int = REPLICA_RECENT_WRITES_MAX_SIZE,
+        fallback_errors: tuple[type[BaseException], ...] = (),
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.read_your_writes = read_your_writes
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.max_recent_writes = max_recent_writes
+        self.lag: float | None = None
+        self._replica_breaker = replica_breaker
+        # e.g. pool timeouts: they do not open the replica circuit, but the read is retried
+        self._fallback_errors = (*replica_breaker.failure_exceptions, *fallback_errors)
+        self._recent_writes: OrderedDict[tuple[str, Any], float] = OrderedDict()
+        self._lag_task: asyncio.Task | None = None
+
+    def __getattr__(self, name: str):
+        # Writes, transactions and acquire() always go to the primary
+        return getattr(self.primary, name)
+
+    def mark_written(self, table: str, keys: Iterable[Any]) -> None:
+        if self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        for key in keys:
+            self._recent_writes[(table, key)] = now
+            self._recent_writes.move_to_end((table, key))
+        while len(self._recent_writes) > self.max_recent_writes:
+            self._recent_writes.popitem(last=False)
+
+    def _recently_written(self, table: str, keys: Iterable[Any]) -> bool:
+        if not self._recent_writes:
+            return False
+        cutoff = time.monotonic() - self.read_your_writes
+        for key in keys:
+            written_at = self._recent_writes.get((table, key))
+            if written_at is not None and written_at > cutoff:
+                return True
+        return False
+
+    def route(self, table: str, keys: Iterable[Any]) -> str:
+        if self._replica_breaker.state == OPEN:
+            return REPLICA_UNAVAILABLE
+        if self.lag is None or self.lag > self.max_lag:
+            return REPLICA_LAG
+        if self._recently_written(table, keys):
+            return READ_YOUR_WRITES
+        return REPLICA
+
+    def reader(self, table: str, keys: Iterable[Any]):
+        keys = list(keys)
+        reason = self.route(table, keys)
+        if reason != REPLICA:
+            DB_READ_ROUTE_TOTAL.labels(pool="primary", reason=reason).inc()
+            return self.primary
+        DB_READ_ROUTE_TOTAL.labels(pool="replica", reason=reason).inc()
+        return _FallbackReader(self.replica, self.primary, self._fallback_errors, keys)
+
+    async def check_lag(self) -> float | None:
+        try:
+            self.lag = float(await self.replica.fetchval(REPLICA_LAG_QUERY))
+        except Exception as exc:
+            logger.warning("Replica lag check failed: %s", exc)
+            self.lag = None
+        DB_REPLICA_LAG_SECONDS.set(self.lag if self.lag is not None else -1)
+        return self.lag
+
+    async def start(self) -> None:
+        await self.check_lag()
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._lag_loop())
+
+    async def _lag_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lag_check_interval)
+            await self.check_lag()
+
+    async def close(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+        await self.replica.close()
+        await self.primary.close()
+
+
+def read_pool(pool, table: str, keys: Iterable[Any]):
+    if isinstance(pool, ReplicaRouter):
+        return pool.reader(table, keys)
+    return pool
+
+
+def mark_written(pool, table: str, keys: Iterable[Any]) -> None:
+    if isinstance(pool, ReplicaRouter):
+        pool.mark_written(table, keys)
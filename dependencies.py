@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from metrics import DEPENDENCY_CONNECT_SECONDS, DEPENDENCY_READY
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("DEPENDENCY_CONNECT_TIMEOUT_SECONDS", "5"))
+DEPENDENCY_RECONNECT_INITIAL_SECONDS = float(os.environ.get("DEPENDENCY_RECONNECT_INITIAL_SECONDS", "1"))
+DEPENDENCY_RECONNECT_MAX_SECONDS = float(os.environ.get("DEPENDENCY_RECONNECT_MAX_SECONDS", "30"))
+
+CONNECTING = "connecting"
+READY = "ready"
+RECONNECTING = "reconnecting"
+
+
+class Dependency:
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Awaitable[Any]],
+        on_ready: Callable[[Any], Awaitable[None]],
+    ):
+        self.name = name
+        self.connect = connect
+        self.on_ready = on_ready
+        self.state = CONNECTING
+        self.attempts = 0
+        self.connect_seconds: float | None = None
+        self.last_error: str | None = None
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "connect_seconds": self.connect_seconds,
+            "last_error": self.last_error,
+        }
+
+
+class DependencyManager:
+    def __init__(
+        self,
+        timeout: float = DEPENDENCY_CONNECT_TIMEOUT_SECONDS,
+        backoff_initial: float = DEPENDENCY_RECONNECT_INITIAL_SECONDS,
+        backoff_max: float = DEPENDENCY_RECONNECT_MAX_SECONDS,
+    ):
+        self.timeout = timeout
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.dependencies: dict[str, Dependency] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, name: str, connect, on_ready) -> None:
+        self.dependencies[name] = Dependency(name, connect, on_ready)
+        DEPENDENCY_READY.labels(dependency=name).set(0)
+
+    @property
+    def ready(self) -> bool:
+        return all(dep.state == READY for dep in self.dependencies.values())
+
+    async def start(self) -> None:
+        deps = list(self.dependencies.values())
+        results = await asyncio.gather(*(self._connect(dep) for dep in deps))
+        for dep, connected in zip(deps, results):
+            if not connected:
+                dep.state = RECONNECTING
+                self._tasks.append(asyncio.create_task(self._reconnect(dep)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _connect(self, dep: Dependency) -> bool:
+        dep.attempts += 1
+        start = time.perf_counter()
+        try:
+            resource = await asyncio.wait_for(dep.connect(), self.timeout)
+        except Exception as exc:
+            dep.last_error = str(exc) or type(exc).__name__
+            logger.error("Failed to connect to %s (attempt %s): %s", dep.name, dep.attempts, dep.last_error)
+            return False
+        dep.connect_seconds = time.perf_counter() - start
+        await dep.on_ready(resource)
+        dep.state = READY
+        dep.last_error = None
+        DEPENDENCY_READY.labels(dependency=dep.name).set(1)
+        DEPENDENCY_CONNECT_SECONDS.labels(dependency=dep.name).set(dep.connect_seconds)
+        logger.info("%s connected in %.3fs", dep.name, dep.connect_seconds)
+        return True
+
+    async def _reconnect(self, dep: Dependency) -> None:
+        delay = self.backoff_initial
+        while True:
+            # Jitter keeps replicas from reconnecting in lockstep
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            if await self._connect(dep):
+                return
+            delay = min(delay * 2, self.backoff_max)
+
+    def status(self) -> dict:
+        return {name: dep.status() for name, dep in self.dependencies.items()}
@@ -0,0 +1,26 @@
+import argparse
+import os
+
+from model import get_model, save_artifact
+from services.predict_service import FEATURE_NAMES, FEATURE_SCALES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the moderation model as a mmap-able artifact")
+    parser.add_argument("--output", default=os.environ.get("MODEL_ARTIFACT_PATH") or "model.bin")
+    args = parser.parse_args()
+
+    model = get_model()
+    source = "mlflow" if os.environ.get("USE_MLFLOW", "").lower() == "true" else "pickle"
+    version = save_artifact(
+        model,
+        args.output,
+        feature_names=FEATURE_NAMES,
+        feature_scales=FEATURE_SCALES,
+        metadata={"source": source, "estimator": type(model).__name__},
+    )
+    print(f"Exported model artifact {args.output} (version {version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,132 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from redis.asyncio import Redis
 from starlette.responses import Response
 
-from db.connection import create_pool
-from model import get_model
+from circuit_breaker import CircuitOpenError, get_breaker
+from clients.kafka import KAFKA_BOOTSTRAP_SERVERS, KAFKA_FAILURES, KafkaProducer
+
+from db.connection import DatabaseTimeoutError, create_pool
+from dependencies import DependencyManager
+from logging_config import setup_logging
 from metrics import get_metrics_content, get_metrics_content_type
 from middleware.prometheus_middleware import PrometheusMiddleware
+from middleware.request_id_middleware import RequestIdMiddleware
+from repositories.hot_queries import HOT_QUERIES
+from routes.admin import router as admin_router
 from routes.async_predict import router as async_predict_router
+from routes.health import router as health_router
 from routes.predict import router as predict_router
-from storages.cache import REDIS_URL, PredictionCache
-
-logging.basicConfig(level=logging.INFO)
+from services.batcher import BATCHING_ENABLED, PredictionBatcher
+from services.inference_executor import create_executor
+from services.model_reloader import ModelReloader
+from services.single_flight import SingleFlight
+from storages.cache import (
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_L1_ENABLED,
+    REDIS_FAILURES,
+    REDIS_URL,
+    LocalCache,
+    PredictionCache,
+)
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
 
+async def _connect_postgres():
+    return await create_pool(hot_queries=HOT_QUERIES)
+
+
+async def _connect_redis() -> Redis:
+    client = Redis.from_url(REDIS_URL)
+    try:
+        await client.ping()
+    except BaseException:
+        await client.aclose()
+        raise
+    return client
+
+
+async def _connect_kafka():
+    kafka_producer = KafkaProducer(KAFKA_BOOTSTRAP_SERVERS, get_breaker("kafka", KAFKA_FAILURES))
+    await kafka_producer.start()
+    return kafka_producer
+
+
+async def _attach_pool(app: FastAPI, pool) -> None:
+    app.state.db_pool = pool
+
+
+async def _attach_redis(app: FastAPI, client: Redis) -> None:
+    breaker = get_breaker("redis", REDIS_FAILURES)
+    if CACHE_L1_ENABLED:
+        cache = PredictionCache(client, LocalCache(), CACHE_INVALIDATION_CHANNEL, breaker=breaker)
+        await cache.start_invalidation_listener()
+    else:
+        cache = PredictionCache(client, breaker=breaker)
+    app.state.redis = client
+    app.state.cache = cache
+
+
+async def _attach_kafka(app: FastAPI, kafka_producer) -> None:
+    app.state.kafka_producer = kafka_producer
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    app.state.db_pool = None
+    app.state.redis = None
+    app.state.cache = None
+    app.state.kafka_producer = None
+    app.state.dependencies = DependencyManager()
+    app.state.dependencies.add("postgres", _connect_postgres, lambda pool: _attach_pool(app, pool))
+    app.state.dependencies.add("redis", _connect_redis, lambda client: _attach_redis(app, client))
+    app.state.dependencies.add("kafka", _connect_kafka, lambda producer: _attach_kafka(app, producer))
+    # Connect to the dependencies while the model loads
+    dependencies_started = asyncio.create_task(app.state.dependencies.start())
+
+    app.state.model = None
+    app.state.executor = create_executor()
+    logger.info("Inference executor: %s", app.state.executor.kind)
+    app.state.model_reloader = ModelReloader(app.state, app.state.executor)
     try:
-        app.state.model = get_model()
-        logger.info("Model loaded successfully")
+        await app.state.model_reloader.reload(force=True)
+        logger.info("Model loaded successfully (version=%s)", app.state.model_reloader.version)
     except Exception as exc:
         logger.error("Failed to load model: %s", exc)
         app.state.model = None
+    await app.state.model_reloader.start()
 
-    try:
-        app.state.db_pool = await create_pool()
-        logger.info("Database pool created")
-    except Exception as exc:
-        logger.error("Failed to connect to database: %s", exc)
-        app.state.db_pool = None
+    app.state.batcher = None
+    if BATCHING_ENABLED:
+        app.state.batcher = PredictionBatcher(executor=app.state.executor)
+        await app.state.batcher.start()
 
-    try:
-        app.state.redis = Redis.from_url(REDIS_URL, decode_responses=True)
-        app.state.cache = PredictionCache(app.state.redis)
-        logger.info("Redis cache connected")
-    except Exception as exc:
-        logger.error("Failed to connect to Redis: %s", exc)
-        app.state.redis = None
-        app.state.cache = None
+    app.state.single_flight = SingleFlight()
 
-    from clients.kafka import KafkaProducer, KAFKA_BOOTSTRAP_SERVERS
-    kafka_producer = KafkaProducer(KAFKA_BOOTSTRAP_SERVERS)
-    try:
-        await kafka_producer.start()
-        app.state.kafka_producer = kafka_producer
-        logger.info("Kafka producer started")
-    except Exception as exc:
-        logger.error("Failed to start Kafka producer: %s", exc)
-        app.state.kafka_producer = None
+    await dependencies_started
 
     yield
 
+    await app.state.dependencies.stop()
+    await app.state.model_reloader.stop()
+    if getattr(app.state, "batcher", None) is not None:
+        await app.state.batcher.stop()
+        app.state.batcher = None
+    if getattr(app.state, "executor", None) is not None:
+        app.state.executor.shutdown()
+        app.state.executor = None
     app.state.model = None
     if getattr(app.state, "db_pool", None) is not None:
         await app.state.db_pool.close()
         app.state.db_pool = None
+    if getattr(app.state, "cache", None) is not None:
+        await app.state.cache.close()
     if getattr(app.state, "redis", None) is not None:
         await app.state.redis.aclose()
         app.state.redis = None
@@ -69,8 +138,21 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(PrometheusMiddleware)
+app.add_middleware(RequestIdMiddleware)
 app.include_router(predict_router)
 app.include_router(async_predict_router)
+app.include_router(admin_router)
+app.include_router(health_router)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+
+@app.exception_handler(DatabaseTimeoutError)
+async def database_timeout_handler(request: Request, exc: DatabaseTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 
 @app.get("/")
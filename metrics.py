@@ -1,7 +1,7 @@
 import time
 from typing import Any, Coroutine, TypeVar
 
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
 
 REQUEST_COUNT = Counter(
     "http_requests_total",
@@ -36,23 +36,142 @@ DB_QUERY_DURATION_SECONDS = Histogram(
     ["query_type"],
     buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
 )
+DB_STATEMENT_DURATION_SECONDS = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent on each named PostgreSQL query",
+    ["query"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Open connections in the PostgreSQL pool",
+    ["pool"],
+)
+DB_POOL_IDLE_CONNECTIONS = Gauge(
+    "db_pool_idle_connections",
+    "Idle connections in the PostgreSQL pool",
+    ["pool"],
+)
+DB_POOL_ACQUIRE_SECONDS = Histogram(
+    "db_pool_acquire_seconds",
+    "Time spent waiting for a connection from the PostgreSQL pool",
+    ["pool"],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0],
+)
+DB_READ_ROUTE_TOTAL = Counter(
+    "db_read_route_total",
+    "Repository reads by the pool that served them and the routing reason",
+    ["pool", "reason"],
+)
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag of the read replica (-1 if it could not be measured)",
+)
 MODEL_PREDICTION_PROBABILITY = Histogram(
     "model_prediction_probability",
     "Distribution of violation probability from ML model",
     buckets=[0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0],
 )
+PREDICTION_BATCH_SIZE = Histogram(
+    "prediction_batch_size",
+    "Number of rows scored in one batched model call",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+)
+PREDICTION_BATCH_QUEUE_WAIT_SECONDS = Histogram(
+    "prediction_batch_queue_wait_seconds",
+    "Time a prediction request waited in the batch queue",
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1],
+)
+INFERENCE_QUEUE_DEPTH = Gauge(
+    "inference_executor_queue_depth",
+    "Inference calls submitted to the executor and not yet finished",
+    ["executor"],
+)
+INFERENCE_EXECUTION_SECONDS = Histogram(
+    "inference_executor_execution_seconds",
+    "Time spent running inference inside the executor",
+    ["executor"],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0],
+)
+MODEL_INFO = Gauge(
+    "model_info",
+    "Currently active model version (value is always 1)",
+    ["version"],
+)
+MODEL_RELOADS_TOTAL = Counter(
+    "model_reloads_total",
+    "Model reload attempts",
+    ["result"],
+)
+LOG_RECORDS_DROPPED_TOTAL = Counter(
+    "log_records_dropped_total",
+    "Log records dropped before reaching the log handler",
+    ["reason"],
+)
+CACHE_REQUESTS_TOTAL = Counter(
+    "cache_requests_total",
+    "Prediction cache lookups by tier and result",
+    ["tier", "result"],
+)
+CACHE_REFRESHES_TOTAL = Counter(
+    "cache_refreshes_total",
+    "Background refreshes of stale prediction cache entries",
+    ["result"],
+)
+FEATURE_CACHE_REQUESTS_TOTAL = Counter(
+    "feature_cache_requests_total",
+    "Lookups in the cache keyed on feature values and model version",
+    ["result"],
+)
+NEGATIVE_CACHE_REQUESTS_TOTAL = Counter(
+    "negative_cache_requests_total",
+    "Lookups of cached 'ad not found' markers",
+    ["result"],
+)
+NEGATIVE_CACHE_STORES_TOTAL = Counter(
+    "negative_cache_stores_total",
+    "'Ad not found' markers written to the cache",
+)
+SINGLE_FLIGHT_COALESCED_TOTAL = Counter(
+    "single_flight_coalesced_total",
+    "Cache-miss requests served by another in-flight computation",
+    ["key_type", "scope"],
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per dependency (0 closed, 1 half-open, 2 open)",
+    ["dependency"],
+)
+CIRCUIT_BREAKER_REJECTED_TOTAL = Counter(
+    "circuit_breaker_rejected_total",
+    "Calls rejected without reaching the dependency because its circuit is open",
+    ["dependency"],
+)
+DEPENDENCY_READY = Gauge(
+    "dependency_ready",
+    "Whether an external dependency is connected (1) or reconnecting (0)",
+    ["dependency"],
+)
+DEPENDENCY_CONNECT_SECONDS = Gauge(
+    "dependency_connect_seconds",
+    "Duration of the last successful connection to an external dependency",
+    ["dependency"],
+)
 
 T = TypeVar("T")
 
 
-async def record_db_duration(query_type: str, coro: Coroutine[Any, Any, T]) -> T:
+async def record_db_duration(
+    query_type: str, coro: Coroutine[Any, Any, T], query: str | None = None
+) -> T:
     start = time.perf_counter()
     try:
         return await coro
     finally:
-        DB_QUERY_DURATION_SECONDS.labels(query_type=query_type).observe(
-            time.perf_counter() - start
-        )
+        duration = time.perf_counter() - start
+        DB_QUERY_DURATION_SECONDS.labels(query_type=query_type).observe(duration)
+        if query is not None:
+            DB_STATEMENT_DURATION_SECONDS.labels(query=query).observe(duration)
 
 
 def get_metrics_content() -> bytes:
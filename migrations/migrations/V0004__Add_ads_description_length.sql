@@ -0,0 +1,3 @@
+ALTER TABLE ads
+    ADD COLUMN description_length INTEGER
+    GENERATED ALWAYS AS (char_length(description)) STORED;
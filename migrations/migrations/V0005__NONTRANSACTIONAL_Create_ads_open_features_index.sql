@@ -0,0 +1,4 @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ads_open_features
+    ON ads (id)
+    INCLUDE (seller_id, category, images_qty, description_length)
+    WHERE is_closed = FALSE;
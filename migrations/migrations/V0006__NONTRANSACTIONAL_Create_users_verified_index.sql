@@ -0,0 +1,3 @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_id_verified
+    ON users (id)
+    INCLUDE (is_verified_seller);
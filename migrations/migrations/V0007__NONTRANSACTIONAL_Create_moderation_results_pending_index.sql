@@ -0,0 +1,3 @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_moderation_results_pending
+    ON moderation_results (created_at)
+    WHERE status = 'pending';
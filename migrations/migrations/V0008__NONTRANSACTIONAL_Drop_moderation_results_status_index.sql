@@ -0,0 +1 @@
+DROP INDEX CONCURRENTLY IF EXISTS idx_moderation_results_status;
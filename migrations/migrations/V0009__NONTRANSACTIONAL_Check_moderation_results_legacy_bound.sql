@@ -0,0 +1,14 @@
+-- ATTACH PARTITION in V0011 skips the full-table scan when a valid CHECK
+-- already implies the partition bound. Adding it NOT VALID takes the
+-- exclusive lock only briefly; VALIDATE then scans under SHARE UPDATE
+-- EXCLUSIVE, so inserts and updates keep running. Both run in autocommit.
+DO $$
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE moderation_results ADD CONSTRAINT moderation_results_legacy_bound '
+        'CHECK (created_at < %L) NOT VALID',
+        date_trunc('month', CURRENT_TIMESTAMP) + INTERVAL '1 month'
+    );
+END $$;
+
+ALTER TABLE moderation_results VALIDATE CONSTRAINT moderation_results_legacy_bound;
@@ -0,0 +1,9 @@
+-- The partitioned table's primary key is (id, created_at). Built here
+-- CONCURRENTLY and attached as a constraint, ATTACH PARTITION in V0011
+-- reuses it instead of building the unique index under ACCESS EXCLUSIVE.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS moderation_results_legacy_id_created_at_key
+    ON moderation_results (id, created_at);
+
+ALTER TABLE moderation_results
+    ADD CONSTRAINT moderation_results_legacy_id_created_at_key
+    UNIQUE USING INDEX moderation_results_legacy_id_created_at_key;
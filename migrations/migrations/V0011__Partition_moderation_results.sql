@@ -0,0 +1,49 @@
+-- Existing rows stay in place and become the first (MINVALUE) partition;
+-- monthly partitions after it are managed by workers/partition_maintenance.py
+ALTER TABLE moderation_results RENAME TO moderation_results_legacy;
+ALTER TABLE moderation_results_legacy RENAME CONSTRAINT moderation_results_pkey TO moderation_results_legacy_pkey;
+ALTER INDEX idx_moderation_results_item_id RENAME TO idx_moderation_results_legacy_item_id;
+ALTER INDEX idx_moderation_results_pending RENAME TO idx_moderation_results_legacy_pending;
+
+CREATE TABLE moderation_results (
+    id INTEGER NOT NULL DEFAULT nextval('moderation_results_id_seq'),
+    item_id INTEGER NOT NULL REFERENCES ads(id),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    is_violation BOOLEAN,
+    probability FLOAT,
+    error_message TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- The sequence must outlive the legacy partition once it is dropped
+ALTER SEQUENCE moderation_results_id_seq OWNED BY moderation_results.id;
+
+CREATE INDEX idx_moderation_results_item_id ON moderation_results (item_id);
+CREATE INDEX idx_moderation_results_pending ON moderation_results (created_at) WHERE status = 'pending';
+
+-- ATTACH neither scans nor builds under the lock: moderation_results_legacy_bound
+-- (V0009) proves the bound, the unique key from V0010 backs the primary key and
+-- the item_id and pending indexes match the parent's. The check is redundant
+-- once the table is a partition.
+DO $$
+DECLARE
+    boundary TIMESTAMP := date_trunc('month', CURRENT_TIMESTAMP) + INTERVAL '1 month';
+BEGIN
+    EXECUTE format(
+        'ALTER TABLE moderation_results ATTACH PARTITION moderation_results_legacy '
+        'FOR VALUES FROM (MINVALUE) TO (%L)',
+        boundary
+    );
+    ALTER TABLE moderation_results_legacy DROP CONSTRAINT moderation_results_legacy_bound;
+    FOR i IN 0..2 LOOP
+        EXECUTE format(
+            'CREATE TABLE moderation_results_p%s PARTITION OF moderation_results '
+            'FOR VALUES FROM (%L) TO (%L)',
+            to_char(boundary + i * INTERVAL '1 month', 'YYYYMM'),
+            boundary + i * INTERVAL '1 month',
+            boundary + (i + 1) * INTERVAL '1 month'
+        );
+    END LOOP;
+END $$;
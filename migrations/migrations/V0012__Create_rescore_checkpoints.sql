@@ -0,0 +1,10 @@
+-- Progress of workers/rescore_ads.py, written in the same transaction as
+-- each chunk's COPY so a resumed run never inserts a chunk twice
+CREATE TABLE rescore_checkpoints (
+    name VARCHAR(64) NOT NULL,
+    shard INTEGER NOT NULL,
+    shards INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (name, shard)
+);
@@ -1,12 +1,54 @@
+import hashlib
+import json
+import mmap
 import os
 import pickle
+import struct
+import time
 from pathlib import Path
 
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+
+ARTIFACT_MAGIC = b"MODART\x00\x00"
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_HEADER = struct.Struct("<8sIII")
+ARTIFACT_ALIGNMENT = 64
+
+
+class ModelArtifact:
+    def __init__(self, path: str):
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, metadata_len, data_offset = ARTIFACT_HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != ARTIFACT_MAGIC:
+            raise ValueError(f"{self.path} is not a model artifact")
+        if format_version != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model artifact format version {format_version}")
+        start = ARTIFACT_HEADER.size
+        self.metadata = json.loads(self._mmap[start:start + metadata_len])
+        n_features = self.metadata["n_features"]
+        data = np.frombuffer(
+            self._mmap,
+            dtype="<f8",
+            count=2 * n_features + 1,
+            offset=data_offset,
+        )
+        self.coef_ = data[:n_features].reshape(1, -1)
+        self.intercept_ = data[n_features:n_features + 1]
+        self.feature_scales = data[n_features + 1:]
+        self.classes_ = np.asarray(self.metadata["classes"])
+        self.version = self.metadata["version"]
+
+    def __reduce__(self):
+        return ModelArtifact, (self.path,)
 
 
 def train_model():
+    from sklearn.linear_model import LogisticRegression
+
     np.random.seed(42)
     X = np.random.rand(1000, 4)
     y = (X[:, 0] < 0.3) & (X[:, 1] < 0.2)
@@ -27,9 +69,62 @@ def load_model(path: str = "model.pkl"):
         return pickle.load(f)
 
 
-def load_model_from_mlflow(model_name: str = "moderation-model", stage: str = "Production"):
+def save_artifact(
+    model,
+    path: str = "model.bin",
+    feature_names: tuple[str, ...] = (),
+    feature_scales: tuple[float, ...] = (),
+    metadata: dict | None = None,
+) -> str:
+    coef = np.asarray(model.coef_, dtype="<f8").ravel()
+    intercept = np.asarray(model.intercept_, dtype="<f8").ravel()[:1]
+    scales = np.asarray(feature_scales, dtype="<f8")
+    if coef.size != scales.size:
+        raise ValueError("feature_scales must have one entry per model coefficient")
+    data = np.concatenate([coef, intercept, scales]).tobytes()
+    version = hashlib.sha256(data).hexdigest()[:12]
+    header = {
+        **(metadata or {}),
+        "version": version,
+        "n_features": int(coef.size),
+        "feature_names": list(feature_names),
+        "classes": np.asarray(model.classes_).tolist(),
+        "created_at": int(time.time()),
+    }
+    metadata_bytes = json.dumps(header).encode("utf-8")
+    data_offset = ARTIFACT_HEADER.size + len(metadata_bytes)
+    data_offset += -data_offset % ARTIFACT_ALIGNMENT
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            ARTIFACT_HEADER.pack(
+                ARTIFACT_MAGIC, ARTIFACT_FORMAT_VERSION, len(metadata_bytes), data_offset
+            )
+        )
+        f.write(metadata_bytes)
+        f.write(b"\x00" * (data_offset - f.tell()))
+        f.write(data)
+    os.replace(tmp_path, path)
+    return version
+
+
+def load_artifact(path: str = "model.bin") -> ModelArtifact:
+    return ModelArtifact(path)
+
+
+def get_artifact_version(path: str = "model.bin") -> str:
+    with open(path, "rb") as f:
+        magic, _, metadata_len, _ = ARTIFACT_HEADER.unpack(f.read(ARTIFACT_HEADER.size))
+        if magic != ARTIFACT_MAGIC:
+            raise ValueError(f"{path} is not a model artifact")
+        return json.loads(f.read(metadata_len))["version"]
+
+
+def load_model_from_mlflow(
+    model_name: str = "moderation-model", stage: str = "Production", version: str | None = None
+):
     import mlflow
-    model_uri = f"models:/{model_name}/{stage}"
+    model_uri = f"models:/{model_name}/{version or stage}"
     return mlflow.sklearn.load_model(model_uri)
 
 
@@ -42,8 +137,60 @@ def ensure_model(path: str = "model.pkl"):
     return model
 
 
+def load_model_versioned(path: str = "model.pkl"):
+    # Hash and unpickle the same bytes, so a file replaced in between cannot
+    # label the old weights with the new version
+    if not Path(path).exists():
+        save_model(train_model(), path)
+    with open(path, "rb") as f:
+        data = f.read()
+    return pickle.loads(data), hashlib.sha256(data).hexdigest()[:12]
+
+
+def get_model_version_from_mlflow(model_name: str = "moderation-model", stage: str = "Production") -> str:
+    from mlflow import MlflowClient
+    versions = MlflowClient().get_latest_versions(model_name, stages=[stage])
+    if not versions:
+        raise LookupError(f"No {stage} version registered for {model_name}")
+    return f"{model_name}/{versions[0].version}"
+
+
+def get_file_version(path: str = "model.pkl") -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
 def get_model():
+    artifact_path = os.environ.get("MODEL_ARTIFACT_PATH")
+    if artifact_path:
+        return load_artifact(artifact_path)
     use_mlflow = os.environ.get("USE_MLFLOW", "").lower() == "true"
     if use_mlflow:
         return load_model_from_mlflow()
     return ensure_model(path=os.environ.get("MODEL_PATH", "model.pkl"))
+
+
+def get_model_with_version():
+    artifact_path = os.environ.get("MODEL_ARTIFACT_PATH")
+    if artifact_path:
+        artifact = load_artifact(artifact_path)
+        return artifact, artifact.version
+    use_mlflow = os.environ.get("USE_MLFLOW", "").lower() == "true"
+    if use_mlflow:
+        # Load the exact registry version that was resolved, not the stage alias
+        model_name, _, version = get_model_version_from_mlflow().rpartition("/")
+        return load_model_from_mlflow(model_name, version=version), f"{model_name}/{version}"
+    return load_model_versioned(path=os.environ.get("MODEL_PATH", "model.pkl"))
+
+
+def get_model_version() -> str | None:
+    artifact_path = os.environ.get("MODEL_ARTIFACT_PATH")
+    if artifact_path:
+        return get_artifact_version(artifact_path)
+    use_mlflow = os.environ.get("USE_MLFLOW", "").lower() == "true"
+    if use_mlflow:
+        return get_model_version_from_mlflow()
+    path = os.environ.get("MODEL_PATH", "model.pkl")
+    if not Path(path).exists():
+        return None
+    return get_file_version(path)
@@ -1,7 +1,8 @@
 import mlflow
 from mlflow.sklearn import log_model
 
-from model import train_model
+from model import save_artifact, train_model
+from services.predict_service import FEATURE_NAMES, FEATURE_SCALES
 
 mlflow.set_tracking_uri("sqlite:///mlflow.db")
 mlflow.set_experiment("moderation-model")
@@ -9,6 +10,14 @@ mlflow.set_experiment("moderation-model")
 with mlflow.start_run():
     model = train_model()
     log_model(model, "model", registered_model_name="moderation-model")
+    save_artifact(
+        model,
+        "model.bin",
+        feature_names=FEATURE_NAMES,
+        feature_scales=FEATURE_SCALES,
+        metadata={"source": "mlflow", "estimator": type(model).__name__},
+    )
+    mlflow.log_artifact("model.bin")
 
 client = mlflow.MlflowClient()
 versions = client.search_model_versions("name='moderation-model'")
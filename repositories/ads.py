@@ -1,7 +1,82 @@
 import asyncpg
 
+from db.replica import mark_written, read_pool
 from metrics import record_db_duration
 
+GET_OPEN_AD_QUERY = """
+SELECT a.id, a.seller_id, a.name, a.description, a.category, a.images_qty,
+       u.is_verified_seller
+FROM ads a
+INNER JOIN users u ON a.seller_id = u.id
+WHERE a.id = $1 AND a.is_closed = FALSE
+"""
+
+GET_OPEN_ADS_QUERY = """
+SELECT a.id, a.seller_id, a.name, a.description, a.category, a.images_qty,
+       u.is_verified_seller
+FROM ads a
+INNER JOIN users u ON a.seller_id = u.id
+WHERE a.id = ANY($1::integer[]) AND a.is_closed = FALSE
+"""
+
+# Scoring only needs the description length, so the TEXT itself is not fetched
+GET_OPEN_AD_FEATURES_QUERY = """
+SELECT a.id, a.seller_id, a.category, a.images_qty, a.description_length,
+       u.is_verified_seller
+FROM ads a
+INNER JOIN users u ON a.seller_id = u.id
+WHERE a.id = $1 AND a.is_closed = FALSE
+"""
+
+GET_OPEN_ADS_FEATURES_QUERY = """
+SELECT a.id, a.seller_id, a.category, a.images_qty, a.description_length,
+       u.is_verified_seller
+FROM ads a
+INNER JOIN users u ON a.seller_id = u.id
+WHERE a.id = ANY($1::integer[]) AND a.is_closed = FALSE
+"""
+
+# One statement closes the ad and drops its moderation results, so no
+# explicit transaction is held open across round trips.
+CLOSE_WITH_RESULTS_QUERY = """
+WITH closed AS (
+    UPDATE ads SET is_closed = TRUE
+    WHERE id = $1 AND is_closed = FALSE
+    RETURNING id
+), deleted AS (
+    DELETE FROM moderation_results m
+    USING closed
+    WHERE m.item_id = closed.id
+    RETURNING m.id
+)
+SELECT closed.id, ARRAY(SELECT id FROM deleted) AS task_ids
+FROM closed
+"""
+
+CLOSE_MANY_WITH_RESULTS_QUERY = """
+WITH closed AS (
+    UPDATE ads SET is_closed = TRUE
+    WHERE id = ANY($1::integer[]) AND is_closed = FALSE
+    RETURNING id
+), deleted AS (
+    DELETE FROM moderation_results m
+    USING closed
+    WHERE m.item_id = closed.id
+    RETURNING m.item_id, m.id
+)
+SELECT closed.id, array_remove(array_agg(deleted.id), NULL) AS task_ids
+FROM closed
+LEFT JOIN deleted ON deleted.item_id = closed.id
+GROUP BY closed.id
+"""
+
+HOT_QUERIES = (
+    GET_OPEN_AD_QUERY,
+    GET_OPEN_AD_FEATURES_QUERY,
+    GET_OPEN_ADS_FEATURES_QUERY,
+    CLOSE_WITH_RESULTS_QUERY,
+)
+
 
 class AdsRepository:
     def __init__(self, pool: asyncpg.Pool):
@@ -10,17 +85,66 @@ class AdsRepository:
     async def get_by_id(self, item_id: int):
         return await record_db_duration(
             "select",
-            self.pool.fetchrow(
-                """
-                SELECT a.id, a.seller_id, a.name, a.description, a.category, a.images_qty,
-                       u.is_verified_seller
-                FROM ads a
-                INNER JOIN users u ON a.seller_id = u.id
-                WHERE a.id = $1 AND a.is_closed = FALSE
-                """,
-                item_id,
-            ),
+            read_pool(self.pool, "ads", [item_id]).fetchrow(GET_OPEN_AD_QUERY, item_id),
+            query="ads.get_by_id",
+        )
+
+    async def get_many(self, item_ids: list[int]) -> dict[int, asyncpg.Record]:
+        if not item_ids:
+            return {}
+        rows = await record_db_duration(
+            "select",
+            read_pool(self.pool, "ads", item_ids).fetch(GET_OPEN_ADS_QUERY, list(item_ids)),
+            query="ads.get_many",
+        )
+        return {row["id"]: row for row in rows}
+
+    async def get_features_by_id(self, item_id: int):
+        return await record_db_duration(
+            "select",
+            read_pool(self.pool, "ads", [item_id]).fetchrow(GET_OPEN_AD_FEATURES_QUERY, item_id),
+            query="ads.get_features_by_id",
+        )
+
+    async def get_features_many(self, item_ids: list[int]) -> dict[int, asyncpg.Record]:
+        if not item_ids:
+            return {}
+        rows = await record_db_duration(
+            "select",
+            read_pool(self.pool, "ads", item_ids).fetch(GET_OPEN_ADS_FEATURES_QUERY, list(item_ids)),
+            query="ads.get_features_many",
+        )
+        return {row["id"]: row for row in rows}
+
+    async def iter_open_features(
+        self,
+        conn: asyncpg.Connection,
+        after_id: int = 0,
+        chunk_size: int = 10000,
+        shards: int = 1,
+        shard: int = 0,
+    ):
+        cursor = await conn.cursor(
+            """
+            SELECT a.id, a.seller_id, a.category, a.images_qty, a.description_length,
+                   u.is_verified_seller
+            FROM ads a
+            INNER JOIN users u ON a.seller_id = u.id
+            WHERE a.is_closed = FALSE AND a.id > $1 AND a.id % $2 = $3
+            ORDER BY a.id
+            """,
+            after_id,
+            shards,
+            shard,
+            prefetch=chunk_size,
         )
+        while True:
+            rows = await record_db_duration(
+                "select", cursor.fetch(chunk_size), query="ads.iter_open_features"
+            )
+            if not rows:
+                return
+            yield rows
 
     async def close(self, item_id: int, conn: asyncpg.Connection | None = None) -> bool:
         conn_or_pool = conn if conn is not None else self.pool
@@ -30,9 +154,31 @@ class AdsRepository:
                 "UPDATE ads SET is_closed = TRUE WHERE id = $1 AND is_closed = FALSE RETURNING id",
                 item_id,
             ),
+            query="ads.close",
         )
+        mark_written(self.pool, "ads", [item_id])
         return row is not None
 
+    async def close_with_results(self, item_id: int) -> list[int] | None:
+        row = await record_db_duration(
+            "update",
+            self.pool.fetchrow(CLOSE_WITH_RESULTS_QUERY, item_id),
+            query="ads.close_with_results",
+        )
+        mark_written(self.pool, "ads", [item_id])
+        return list(row["task_ids"]) if row is not None else None
+
+    async def close_many_with_results(self, item_ids: list[int]) -> dict[int, list[int]]:
+        if not item_ids:
+            return {}
+        rows = await record_db_duration(
+            "update",
+            self.pool.fetch(CLOSE_MANY_WITH_RESULTS_QUERY, list(item_ids)),
+            query="ads.close_many_with_results",
+        )
+        mark_written(self.pool, "ads", item_ids)
+        return {r["id"]: list(r["task_ids"]) for r in rows}
+
     async def create(
         self,
         seller_id: int,
@@ -55,5 +201,7 @@ class AdsRepository:
                 category,
                 images_qty,
             ),
+            query="ads.create",
         )
+        mark_written(self.pool, "ads", [row["id"]])
         return row["id"]
@@ -0,0 +1,6 @@
+from repositories.ads import HOT_QUERIES as ADS_HOT_QUERIES
+from repositories.moderation_results import HOT_QUERIES as MODERATION_RESULTS_HOT_QUERIES
+
+# Prepared on every new connection of the API and worker pools, see
+# db.connection.create_pool(hot_queries=...)
+HOT_QUERIES = ADS_HOT_QUERIES + MODERATION_RESULTS_HOT_QUERIES
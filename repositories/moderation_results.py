@@ -1,7 +1,76 @@
+from datetime import datetime
+
 import asyncpg
 
+from db.replica import mark_written, read_pool
 from metrics import record_db_duration
 
+CREATE_PENDING_QUERY = """
+INSERT INTO moderation_results (item_id, status)
+VALUES ($1, 'pending')
+RETURNING id
+"""
+
+GET_BY_ID_QUERY = """
+SELECT id, item_id, status, is_violation, probability, error_message,
+       created_at, processed_at
+FROM moderation_results
+WHERE id = $1
+"""
+
+UPDATE_COMPLETED_QUERY = """
+UPDATE moderation_results
+SET status = 'completed',
+    is_violation = $1,
+    probability = $2,
+    processed_at = CURRENT_TIMESTAMP
+WHERE id = $3
+"""
+
+UPDATE_FAILED_QUERY = """
+UPDATE moderation_results
+SET status = 'failed',
+    error_message = $1,
+    processed_at = CURRENT_TIMESTAMP
+WHERE id = $2
+"""
+
+CREATE_PENDING_MANY_QUERY = """
+INSERT INTO moderation_results (item_id, status)
+SELECT t.item_id, 'pending'
+FROM UNNEST($1::integer[]) WITH ORDINALITY AS t(item_id, position)
+ORDER BY t.position
+RETURNING id
+"""
+
+UPDATE_COMPLETED_MANY_QUERY = """
+UPDATE moderation_results AS m
+SET status = 'completed',
+    is_violation = t.is_violation,
+    probability = t.probability,
+    processed_at = CURRENT_TIMESTAMP
+FROM UNNEST($1::integer[], $2::boolean[], $3::float8[]) AS t(id, is_violation, probability)
+WHERE m.id = t.id
+"""
+
+UPDATE_FAILED_MANY_QUERY = """
+UPDATE moderation_results AS m
+SET status = 'failed',
+    error_message = t.error_message,
+    processed_at = CURRENT_TIMESTAMP
+FROM UNNEST($1::integer[], $2::text[]) AS t(id, error_message)
+WHERE m.id = t.id
+"""
+
+HOT_QUERIES = (
+    CREATE_PENDING_QUERY,
+    GET_BY_ID_QUERY,
+    UPDATE_COMPLETED_QUERY,
+    UPDATE_FAILED_QUERY,
+    UPDATE_COMPLETED_MANY_QUERY,
+    UPDATE_FAILED_MANY_QUERY,
+)
+
 
 class ModerationResultsRepository:
     def __init__(self, pool: asyncpg.Pool):
@@ -10,29 +79,49 @@ class ModerationResultsRepository:
     async def create(self, item_id: int) -> int:
         row = await record_db_duration(
             "insert",
-            self.pool.fetchrow(
-                """
-                INSERT INTO moderation_results (item_id, status)
-                VALUES ($1, 'pending')
-                RETURNING id
-                """,
-                item_id,
-            ),
+            self.pool.fetchrow(CREATE_PENDING_QUERY, item_id),
+            query="moderation_results.create",
         )
+        mark_written(self.pool, "moderation_results", [row["id"]])
         return row["id"]
 
+    async def create_many(self, item_ids: list[int]) -> list[int]:
+        if not item_ids:
+            return []
+        rows = await record_db_duration(
+            "insert",
+            self.pool.fetch(CREATE_PENDING_MANY_QUERY, list(item_ids)),
+            query="moderation_results.create_many",
+        )
+        task_ids = [r["id"] for r in rows]
+        mark_written(self.pool, "moderation_results", task_ids)
+        return task_ids
+
+    async def copy_completed(
+        self,
+        records: list[tuple[int, bool, float]],
+        conn: asyncpg.Connection | None = None,
+    ) -> None:
+        conn_or_pool = conn if conn is not None else self.pool
+        processed_at = datetime.utcnow()
+        await record_db_duration(
+            "copy",
+            conn_or_pool.copy_records_to_table(
+                "moderation_results",
+                records=[
+                    (item_id, "completed", is_violation, probability, processed_at)
+                    for item_id, is_violation, probability in records
+                ],
+                columns=["item_id", "status", "is_violation", "probability", "processed_at"],
+            ),
+            query="moderation_results.copy_completed",
+        )
+
     async def get_by_id(self, task_id: int):
         return await record_db_duration(
             "select",
-            self.pool.fetchrow(
-                """
-                SELECT id, item_id, status, is_violation, probability, error_message,
-                       created_at, processed_at
-                FROM moderation_results
-                WHERE id = $1
-                """,
-                task_id,
-            ),
+            read_pool(self.pool, "moderation_results", [task_id]).fetchrow(GET_BY_ID_QUERY, task_id),
+            query="moderation_results.get_by_id",
         )
 
     async def update_completed(
@@ -40,36 +129,45 @@ class ModerationResultsRepository:
     ):
         await record_db_duration(
             "update",
-            self.pool.execute(
-                """
-                UPDATE moderation_results
-                SET status = 'completed',
-                    is_violation = $1,
-                    probability = $2,
-                    processed_at = CURRENT_TIMESTAMP
-                WHERE id = $3
-                """,
-                is_violation,
-                probability,
-                task_id,
-            ),
+            self.pool.execute(UPDATE_COMPLETED_QUERY, is_violation, probability, task_id),
+            query="moderation_results.update_completed",
         )
+        mark_written(self.pool, "moderation_results", [task_id])
 
     async def update_failed(self, task_id: int, error_message: str):
+        await record_db_duration(
+            "update",
+            self.pool.execute(UPDATE_FAILED_QUERY, error_message, task_id),
+            query="moderation_results.update_failed",
+        )
+        mark_written(self.pool, "moderation_results", [task_id])
+
+    async def update_completed_many(self, records: list[tuple[int, bool, float]]) -> None:
+        if not records:
+            return
+        task_ids, is_violations, probabilities = zip(*records)
         await record_db_duration(
             "update",
             self.pool.execute(
-                """
-                UPDATE moderation_results
-                SET status = 'failed',
-                    error_message = $1,
-                    processed_at = CURRENT_TIMESTAMP
-                WHERE id = $2
-                """,
-                error_message,
-                task_id,
+                UPDATE_COMPLETED_MANY_QUERY,
+                list(task_ids),
+                list(is_violations),
+                list(probabilities),
             ),
+            query="moderation_results.update_completed_many",
+        )
+        mark_written(self.pool, "moderation_results", task_ids)
+
+    async def update_failed_many(self, records: list[tuple[int, str]]) -> None:
+        if not records:
+            return
+        task_ids, error_messages = zip(*records)
+        await record_db_duration(
+            "update",
+            self.pool.execute(UPDATE_FAILED_MANY_QUERY, list(task_ids), list(error_messages)),
+            query="moderation_results.update_failed_many",
         )
+        mark_written(self.pool, "moderation_results", task_ids)
 
     async def get_task_ids_by_item_id(
         self, item_id: int, conn: asyncpg.Connection | None = None
@@ -81,6 +179,7 @@ class ModerationResultsRepository:
                 "SELECT id FROM moderation_results WHERE item_id = $1",
                 item_id,
             ),
+            query="moderation_results.get_task_ids_by_item_id",
         )
         return [r["id"] for r in rows]
 
@@ -92,4 +191,5 @@ class ModerationResultsRepository:
                 "DELETE FROM moderation_results WHERE item_id = $1",
                 item_id,
             ),
+            query="moderation_results.delete_by_item_id",
         )
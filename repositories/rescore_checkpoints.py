@@ -0,0 +1,47 @@
+import asyncpg
+
+from metrics import record_db_duration
+
+SAVE_CHECKPOINT_QUERY = """
+INSERT INTO rescore_checkpoints (name, shard, shards, last_id)
+VALUES ($1, $2, $3, $4)
+ON CONFLICT (name, shard) DO UPDATE
+SET shards = EXCLUDED.shards, last_id = EXCLUDED.last_id, updated_at = CURRENT_TIMESTAMP
+"""
+
+
+class RescoreCheckpointsRepository:
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+    async def load(self, name: str) -> list[asyncpg.Record]:
+        return await record_db_duration(
+            "select",
+            self.pool.fetch(
+                "SELECT shard, shards, last_id FROM rescore_checkpoints WHERE name = $1",
+                name,
+            ),
+            query="rescore_checkpoints.load",
+        )
+
+    async def save(
+        self,
+        name: str,
+        shard: int,
+        shards: int,
+        last_id: int,
+        conn: asyncpg.Connection | None = None,
+    ) -> None:
+        conn_or_pool = conn if conn is not None else self.pool
+        await record_db_duration(
+            "insert",
+            conn_or_pool.execute(SAVE_CHECKPOINT_QUERY, name, shard, shards, last_id),
+            query="rescore_checkpoints.save",
+        )
+
+    async def reset(self, name: str) -> None:
+        await record_db_duration(
+            "delete",
+            self.pool.execute("DELETE FROM rescore_checkpoints WHERE name = $1", name),
+            query="rescore_checkpoints.reset",
+        )
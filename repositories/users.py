@@ -1,5 +1,6 @@
 import asyncpg
 
+from db.replica import mark_written, read_pool
 from metrics import record_db_duration
 
 
@@ -10,10 +11,11 @@ class UsersRepository:
     async def get_by_id(self, user_id: int):
         return await record_db_duration(
             "select",
-            self.pool.fetchrow(
+            read_pool(self.pool, "users", [user_id]).fetchrow(
                 "SELECT id, is_verified_seller FROM users WHERE id = $1",
                 user_id,
             ),
+            query="users.get_by_id",
         )
 
     async def create(self, is_verified_seller: bool) -> int:
@@ -23,5 +25,7 @@ class UsersRepository:
                 "INSERT INTO users (is_verified_seller) VALUES ($1) RETURNING id",
                 is_verified_seller,
             ),
+            query="users.create",
         )
+        mark_written(self.pool, "users", [row["id"]])
         return row["id"]
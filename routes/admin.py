@@ -0,0 +1,30 @@
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from services.model_reloader import ModelReloader
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin")
+
+
+def get_model_reloader(request: Request) -> ModelReloader:
+    reloader = getattr(request.app.state, "model_reloader", None)
+    if reloader is None:
+        raise HTTPException(status_code=503, detail="Model reloader not available")
+    return reloader
+
+
+@router.get("/model")
+async def get_model_info(reloader=Depends(get_model_reloader)):
+    return {"version": reloader.version}
+
+
+@router.post("/model/reload")
+async def reload_model(force: bool = False, reloader=Depends(get_model_reloader)):
+    try:
+        reloaded = await reloader.reload(force=force)
+    except Exception as exc:
+        logger.exception("Model reload failed")
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return {"version": reloader.version, "reloaded": reloaded}
@@ -1,13 +1,16 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
-from clients.kafka import KafkaProducer, KAFKA_BOOTSTRAP_SERVERS
+from circuit_breaker import CircuitOpenError, get_breaker
+from clients.kafka import KafkaProducer, KAFKA_BOOTSTRAP_SERVERS, KAFKA_FAILURES
+from db.connection import DatabaseTimeoutError
 from exceptions import AdNotFoundError
 from repositories.moderation_results import ModerationResultsRepository
 from services.async_predict_service import create_moderation_task
-from storages.cache import PredictionCache, cache_key_moderation_result
+from services.single_flight import SingleFlight
+from storages.cache import PredictionCache, cache_key_moderation_result, cache_tag_item
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -28,9 +31,17 @@ def get_cache(request: Request) -> PredictionCache | None:
     return getattr(request.app.state, "cache", None)
 
 
+def get_single_flight(request: Request) -> SingleFlight | None:
+    return getattr(request.app.state, "single_flight", None)
+
+
 def get_kafka_producer(request: Request) -> KafkaProducer:
     if not hasattr(request.app.state, "kafka_producer"):
-        request.app.state.kafka_producer = KafkaProducer(KAFKA_BOOTSTRAP_SERVERS)
+        request.app.state.kafka_producer = KafkaProducer(
+            KAFKA_BOOTSTRAP_SERVERS, get_breaker("kafka", KAFKA_FAILURES)
+        )
+    if request.app.state.kafka_producer is None:
+        raise HTTPException(status_code=503, detail="Kafka not available")
     return request.app.state.kafka_producer
 
 
@@ -39,10 +50,11 @@ async def async_predict(
     payload: AsyncPredictRequest,
     pool=Depends(get_pool),
     kafka_producer=Depends(get_kafka_producer),
+    cache=Depends(get_cache),
 ):
     try:
         task_id = await create_moderation_task(
-            payload.item_id, pool, kafka_producer
+            payload.item_id, pool, kafka_producer, cache
         )
         return {
             "task_id": task_id,
@@ -51,6 +63,10 @@ async def async_predict(
         }
     except AdNotFoundError:
         raise HTTPException(status_code=404, detail="Ad not found")
+    except CircuitOpenError:
+        raise
+    except DatabaseTimeoutError:
+        raise
     except Exception as exc:
         logger.exception("Failed to create moderation task")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
@@ -61,14 +77,26 @@ async def get_moderation_result(
     task_id: int,
     pool=Depends(get_pool),
     cache=Depends(get_cache),
+    single_flight=Depends(get_single_flight),
 ):
+    key = cache_key_moderation_result(task_id)
     if cache:
         try:
-            cached = await cache.get(cache_key_moderation_result(task_id))
+            cached, _ = await cache.get_entry_json(key)
             if cached is not None:
-                return cached
+                return Response(content=cached, media_type="application/json")
         except Exception:
             pass
+
+    async def load():
+        return await _load_moderation_result(task_id, pool, cache)
+
+    if single_flight is not None:
+        return await single_flight.do(key, load, cache)
+    return await load()
+
+
+async def _load_moderation_result(task_id: int, pool, cache: PredictionCache | None):
     results_repo = ModerationResultsRepository(pool)
     result = await results_repo.get_by_id(task_id)
     if result is None:
@@ -82,7 +110,11 @@ async def get_moderation_result(
     }
     if result["status"] in ("completed", "failed") and cache:
         try:
-            await cache.set(cache_key_moderation_result(task_id), response)
+            await cache.set(
+                cache_key_moderation_result(task_id),
+                response,
+                tags=[cache_tag_item(result["item_id"])],
+            )
         except Exception:
             pass
     return response
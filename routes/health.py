@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from circuit_breaker import get_breakers
+
+router = APIRouter()
+
+
+@router.get("/ready")
+async def readiness(request: Request):
+    state = request.app.state
+    dependencies = getattr(state, "dependencies", None)
+    status = dependencies.status() if dependencies is not None else {}
+    breakers = get_breakers()
+    for name, dependency in status.items():
+        if name in breakers:
+            dependency["circuit"] = breakers[name].state
+    reloader = getattr(state, "model_reloader", None)
+    model_ready = getattr(state, "model", None) is not None
+    ready = model_ready and dependencies is not None and dependencies.ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "model": {
+                "state": "ready" if model_ready else "unavailable",
+                "version": reloader.version if reloader is not None else None,
+            },
+            "dependencies": status,
+        },
+    )
@@ -1,13 +1,23 @@
 import logging
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, Field, ValidationError
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 
 from exceptions import AdNotFoundError, PredictionError
 from metrics import PREDICTION_ERRORS_TOTAL
-from services.close_ad_service import close_ad
-from services.predict_service import run_prediction
+from services.close_ad_service import CLOSE_BATCH_MAX_ITEMS, close_ad, close_ads
+from services.inference_executor import InferenceExecutor
+from services.batch_predict_service import BATCH_PREDICT_MAX_ITEMS, batch_predict
+from services.batcher import PredictionBatcher
+from services.feature_cache import feature_cache_key, get_feature_cached, set_feature_cached
+from services.predict_service import run_prediction_async
+from services.scorer import get_scorer_version
 from services.simple_predict_service import simple_predict
+from services.single_flight import SingleFlight
+from services.stream_predict_service import iter_ndjson_lines, stream_predict
 from storages.cache import PredictionCache, cache_key_predict, cache_key_simple_predict
 
 logger = logging.getLogger(__name__)
@@ -28,11 +38,30 @@ class PredictRequest(BaseModel):
     images_qty: int = Field(..., ge=0)
 
 
-def get_model(request: Request):
+class BatchPredictRequest(BaseModel):
+    # Items are validated one by one so a bad entry fails only itself
+    items: list[Any] = Field(..., min_length=1, max_length=BATCH_PREDICT_MAX_ITEMS)
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
+
+
+MODEL_VERSION_HEADER = "X-Model-Version"
+
+
+def get_model(request: Request, response: Response):
     model = getattr(request.app.state, "model", None)
     if model is None:
         PREDICTION_ERRORS_TOTAL.labels(error_type="model_unavailable").inc()
         raise HTTPException(status_code=503, detail="Model not loaded")
+    version = get_scorer_version(model)
+    if version is not None:
+        response.headers[MODEL_VERSION_HEADER] = version
     return model
 
 
@@ -47,13 +76,35 @@ def get_cache(request: Request) -> PredictionCache | None:
     return getattr(request.app.state, "cache", None)
 
 
+def get_batcher(request: Request) -> PredictionBatcher | None:
+    return getattr(request.app.state, "batcher", None)
+
+
+def get_executor(request: Request) -> InferenceExecutor | None:
+    return getattr(request.app.state, "executor", None)
+
+
+def cached_json_response(content: bytes, response: Response) -> Response:
+    # Headers set by dependencies (X-Model-Version) are not merged into a
+    # Response returned directly by the endpoint.
+    return Response(content=content, media_type="application/json", headers=response.headers)
+
+
+def get_single_flight(request: Request) -> SingleFlight | None:
+    return getattr(request.app.state, "single_flight", None)
+
+
 @router.post("/predict")
 async def predict(
     payload: PredictRequest,
+    response: Response,
     model=Depends(get_model),
     cache=Depends(get_cache),
+    batcher=Depends(get_batcher),
+    executor=Depends(get_executor),
 ):
     key = cache_key_predict(
+        get_scorer_version(model),
         payload.seller_id,
         payload.is_verified_seller,
         payload.item_id,
@@ -61,22 +112,25 @@ async def predict(
         payload.category,
         payload.images_qty,
     )
-    if cache:
-        try:
-            cached = await cache.get(key)
-            if cached is not None:
-                return cached
-        except Exception:
-            pass
-    try:
-        is_violation, probability = run_prediction(
+    feature_key = feature_cache_key(
+        model,
+        payload.is_verified_seller,
+        payload.images_qty,
+        len(payload.description),
+        payload.category,
+    )
+
+    async def compute():
+        is_violation, probability = await run_prediction_async(
             model=model,
             seller_id=payload.seller_id,
             is_verified_seller=payload.is_verified_seller,
             item_id=payload.item_id,
-            description=payload.description,
+            description_length=len(payload.description),
             category=payload.category,
             images_qty=payload.images_qty,
+            batcher=batcher,
+            executor=executor,
         )
         result = {"is_violation": is_violation, "probability": probability}
         if cache:
@@ -84,7 +138,23 @@ async def predict(
                 await cache.set(key, result)
             except Exception:
                 pass
+            await set_feature_cached(cache, feature_key, result)
         return result
+
+    cached = await get_feature_cached(cache, feature_key, as_json=True)
+    if cached is not None:
+        return cached_json_response(cached, response)
+    if cache:
+        try:
+            cached, stale = await cache.get_entry_json(key)
+            if cached is not None:
+                if stale:
+                    cache.refresh(key, compute)
+                return cached_json_response(cached, response)
+        except Exception:
+            pass
+    try:
+        return await compute()
     except HTTPException:
         raise
     except PredictionError as exc:
@@ -97,15 +167,83 @@ async def predict(
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+@router.post("/predict/batch")
+async def predict_batch_handler(
+    payload: BatchPredictRequest,
+    model=Depends(get_model),
+    cache=Depends(get_cache),
+    executor=Depends(get_executor),
+):
+    results: list[dict | None] = [None] * len(payload.items)
+    valid: list[tuple[int, PredictRequest]] = []
+    for index, item in enumerate(payload.items):
+        try:
+            valid.append((index, PredictRequest.model_validate(item)))
+        except ValidationError as exc:
+            results[index] = {"index": index, "error": _format_validation_error(exc)}
+    if valid:
+        try:
+            predictions = await batch_predict(
+                [request for _, request in valid], model, cache, executor
+            )
+        except PredictionError as exc:
+            PREDICTION_ERRORS_TOTAL.labels(error_type="prediction_error").inc()
+            raise HTTPException(status_code=500, detail=str(exc)) from exc
+        for (index, request), prediction in zip(valid, predictions):
+            results[index] = {"index": index, "item_id": request.item_id, **prediction}
+    return {"results": results}
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    # The body iterator itself reads the request stream, so the base class's
+    # disconnect listener must not consume request messages concurrently.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def _parse_stream_item(line: bytes) -> tuple[PredictRequest | None, str | None]:
+    try:
+        return PredictRequest.model_validate_json(line), None
+    except ValidationError as exc:
+        return None, _format_validation_error(exc)
+
+
+@router.post("/predict/stream")
+async def predict_stream_handler(
+    request: Request,
+    model=Depends(get_model),
+    executor=Depends(get_executor),
+):
+    version = get_scorer_version(model)
+    return DuplexStreamingResponse(
+        stream_predict(
+            iter_ndjson_lines(request.stream()), model, _parse_stream_item, executor
+        ),
+        media_type="application/x-ndjson",
+        headers={MODEL_VERSION_HEADER: version} if version is not None else None,
+    )
+
+
 @router.post("/simple_predict")
 async def simple_predict_handler(
     payload: SimplePredictRequest,
+    response: Response,
     model=Depends(get_model),
     pool=Depends(get_pool),
     cache=Depends(get_cache),
+    batcher=Depends(get_batcher),
+    executor=Depends(get_executor),
+    single_flight=Depends(get_single_flight),
 ):
     try:
-        return await simple_predict(payload.item_id, model, pool, cache)
+        result = await simple_predict(
+            payload.item_id, model, pool, cache, batcher, executor, single_flight
+        )
+        if isinstance(result, bytes):
+            return cached_json_response(result, response)
+        return result
     except AdNotFoundError:
         raise HTTPException(status_code=404, detail="Ad not found")
     except PredictionError as exc:
@@ -128,3 +266,21 @@ async def close_ad_handler(
     except AdNotFoundError:
         raise HTTPException(status_code=404, detail="Ad not found or already closed")
     return {"message": "Ad closed"}
+
+
+class CloseAdsBatchRequest(BaseModel):
+    item_ids: list[Annotated[int, Field(gt=0)]] = Field(
+        ..., min_length=1, max_length=CLOSE_BATCH_MAX_ITEMS
+    )
+
+
+@router.post("/close/batch")
+async def close_ads_batch_handler(
+    payload: CloseAdsBatchRequest,
+    pool=Depends(get_pool),
+    cache=Depends(get_cache),
+):
+    closed = await close_ads(payload.item_ids, pool, cache)
+    closed_set = set(closed)
+    not_found = [item_id for item_id in dict.fromkeys(payload.item_ids) if item_id not in closed_set]
+    return {"closed": closed, "not_found": not_found}
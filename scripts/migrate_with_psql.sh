@@ -16,7 +16,7 @@ else
 fi
 
 echo "Миграции для $USER@$HOST:$PORT/$DB"
-for f in migrations/migrations/V0001__Initial_schema.sql migrations/migrations/V0002__Create_moderation_results.sql migrations/migrations/V0003__Add_is_closed_to_ads.sql; do
+for f in migrations/migrations/V*.sql; do
   echo "  $f"
   psql -v ON_ERROR_STOP=1 -h "$HOST" -p "$PORT" -U "$USER" -d "$DB" -f "$f"
 done
@@ -0,0 +1,60 @@
+from typing import TYPE_CHECKING
+
+from exceptions import AdNotFoundError
+from metrics import NEGATIVE_CACHE_REQUESTS_TOTAL, NEGATIVE_CACHE_STORES_TOTAL
+from repositories.ads import AdsRepository
+from storages.cache import NEGATIVE_CACHE_TTL_SECONDS, cache_key_missing_ad
+
+if TYPE_CHECKING:
+    from storages.cache import PredictionCache
+
+_negative_hit = NEGATIVE_CACHE_REQUESTS_TOTAL.labels(result="hit")
+_negative_miss = NEGATIVE_CACHE_REQUESTS_TOTAL.labels(result="miss")
+
+
+async def get_open_ad(item_id: int, pool, cache: "PredictionCache | None" = None):
+    negative = cache is not None and NEGATIVE_CACHE_TTL_SECONDS > 0
+    key = cache_key_missing_ad(item_id)
+    if negative:
+        try:
+            missing = await cache.has_negative(key)
+        except Exception:
+            missing = False
+        if missing:
+            _negative_hit.inc()
+            raise AdNotFoundError("Ad not found")
+        _negative_miss.inc()
+    row = await AdsRepository(pool).get_features_by_id(item_id)
+    if row is None:
+        if negative:
+            try:
+                await cache.set_negative(key)
+                NEGATIVE_CACHE_STORES_TOTAL.inc()
+            except Exception:
+                pass
+        raise AdNotFoundError("Ad not found")
+    return row
+
+
+async def create_ad(
+    pool,
+    seller_id: int,
+    name: str,
+    description: str,
+    category: int,
+    images_qty: int,
+    cache: "PredictionCache | None" = None,
+) -> int:
+    item_id = await AdsRepository(pool).create(
+        seller_id=seller_id,
+        name=name,
+        description=description,
+        category=category,
+        images_qty=images_qty,
+    )
+    if cache is not None:
+        try:
+            await cache.delete(cache_key_missing_ad(item_id))
+        except Exception:
+            pass
+    return item_id
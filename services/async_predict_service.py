@@ -1,18 +1,23 @@
 import logging
+from typing import TYPE_CHECKING
 
 from clients.kafka import KafkaProducer
-from exceptions import AdNotFoundError
-from repositories.ads import AdsRepository
 from repositories.moderation_results import ModerationResultsRepository
+from services.ads_service import get_open_ad
+
+if TYPE_CHECKING:
+    from storages.cache import PredictionCache
 
 logger = logging.getLogger(__name__)
 
 
-async def create_moderation_task(item_id: int, pool, kafka_producer: KafkaProducer) -> int:
-    ads_repo = AdsRepository(pool)
-    ad = await ads_repo.get_by_id(item_id)
-    if ad is None:
-        raise AdNotFoundError("Ad not found")
+async def create_moderation_task(
+    item_id: int,
+    pool,
+    kafka_producer: KafkaProducer,
+    cache: "PredictionCache | None" = None,
+) -> int:
+    await get_open_ad(item_id, pool, cache)
 
     results_repo = ModerationResultsRepository(pool)
     task_id = await results_repo.create(item_id)
@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+
+from exceptions import PredictionError
+from services.predict_service import build_features_batch, observe_batch_prediction, predict_batch
+from services.scorer import get_scorer_version
+from storages.cache import cache_key_predict
+
+if TYPE_CHECKING:
+    from services.inference_executor import InferenceExecutor
+    from storages.cache import PredictionCache
+
+logger = logging.getLogger(__name__)
+
+BATCH_PREDICT_MAX_ITEMS = int(os.environ.get("BATCH_PREDICT_MAX_ITEMS", "10000"))
+
+
+async def batch_predict(
+    payloads: Sequence,
+    model,
+    cache: "PredictionCache | None" = None,
+    executor: "InferenceExecutor | None" = None,
+) -> list[dict]:
+    version = get_scorer_version(model)
+    keys = [
+        cache_key_predict(
+            version,
+            p.seller_id,
+            p.is_verified_seller,
+            p.item_id,
+            len(p.description),
+            p.category,
+            p.images_qty,
+        )
+        for p in payloads
+    ]
+    results: list[dict | None] = [None] * len(payloads)
+    if cache:
+        try:
+            results = await cache.get_many(keys)
+        except Exception:
+            pass
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    features = build_features_batch(
+        is_verified_seller=np.fromiter(
+            (payloads[i].is_verified_seller for i in missing), dtype=np.float64, count=len(missing)
+        ),
+        images_qty=np.fromiter(
+            (payloads[i].images_qty for i in missing), dtype=np.float64, count=len(missing)
+        ),
+        description_length=np.fromiter(
+            (len(payloads[i].description) for i in missing), dtype=np.float64, count=len(missing)
+        ),
+        category=np.fromiter(
+            (payloads[i].category for i in missing), dtype=np.float64, count=len(missing)
+        ),
+    )
+    start = time.perf_counter()
+    try:
+        if executor is not None:
+            labels, probabilities = await executor.run(predict_batch, model, features)
+        else:
+            labels, probabilities = predict_batch(model, features)
+    except Exception as exc:
+        logger.exception("Batch predict failed")
+        raise PredictionError(str(exc)) from exc
+    observe_batch_prediction(labels, probabilities, time.perf_counter() - start)
+
+    fresh = {}
+    for i, is_violation, probability in zip(missing, labels.tolist(), probabilities.tolist()):
+        result = {"is_violation": bool(is_violation), "probability": probability}
+        results[i] = result
+        fresh[keys[i]] = result
+    if cache:
+        try:
+            await cache.set_many(fresh)
+        except Exception:
+            pass
+    return results
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import time
+
+import numpy as np
+
+from metrics import PREDICTION_BATCH_QUEUE_WAIT_SECONDS, PREDICTION_BATCH_SIZE
+from services.inference_executor import INLINE_EXECUTOR, InferenceExecutor
+from services.predict_service import predict_batch
+
+logger = logging.getLogger(__name__)
+
+BATCHING_ENABLED = os.environ.get("PREDICT_BATCHING_ENABLED", "true").lower() == "true"
+BATCH_MAX_SIZE = int(os.environ.get("PREDICT_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+
+
+class PredictionBatcher:
+    def __init__(
+        self,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        executor: InferenceExecutor | None = None,
+    ):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._executor = executor or INLINE_EXECUTOR
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._scoring: set[asyncio.Task] = set()
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                "Prediction batcher started (max_batch_size=%s, max_wait_ms=%s)",
+                self.max_batch_size,
+                self.max_wait * 1000,
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._scoring:
+            await asyncio.gather(*self._scoring, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Prediction batcher stopped"))
+            self._queue = None
+
+    async def submit(self, model, features: np.ndarray) -> tuple[bool, float]:
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model, features, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._score(batch))
+            self._scoring.add(task)
+            task.add_done_callback(self._scoring.discard)
+
+    async def _score(self, batch: list) -> None:
+        now = time.perf_counter()
+        groups: dict[int, list] = {}
+        for item in batch:
+            PREDICTION_BATCH_QUEUE_WAIT_SECONDS.observe(now - item[3])
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            pending = [item for item in items if not item[2].done()]
+            if not pending:
+                continue
+            model = pending[0][0]
+            PREDICTION_BATCH_SIZE.observe(len(pending))
+            try:
+                labels, probabilities = await self._executor.run(
+                    predict_batch, model, np.vstack([item[1] for item in pending])
+                )
+            except Exception as exc:
+                for _, _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, _, future, _), label, probability in zip(
+                pending, labels, probabilities
+            ):
+                if not future.done():
+                    future.set_result((bool(label), float(probability)))
@@ -1,23 +1,41 @@
+import os
+
 from exceptions import AdNotFoundError
 from repositories.ads import AdsRepository
-from repositories.moderation_results import ModerationResultsRepository
-from storages.cache import PredictionCache, cache_key_moderation_result, cache_key_simple_predict
-
-
-async def close_ad(item_id: int, pool, cache: PredictionCache | None) -> None:
-    ads_repo = AdsRepository(pool)
-    results_repo = ModerationResultsRepository(pool)
-    async with pool.acquire() as conn:
-        async with conn.transaction():
-            closed = await ads_repo.close(item_id, conn=conn)
-            if not closed:
-                raise AdNotFoundError("Ad not found or already closed")
-            task_ids = await results_repo.get_task_ids_by_item_id(item_id, conn=conn)
-            await results_repo.delete_by_item_id(item_id, conn=conn)
-    if cache:
-        keys = [cache_key_simple_predict(item_id)]
-        keys.extend(cache_key_moderation_result(tid) for tid in task_ids)
+from storages.cache import PredictionCache, cache_key_moderation_result, cache_tag_item
+
+CLOSE_BATCH_MAX_ITEMS = int(os.environ.get("CLOSE_BATCH_MAX_ITEMS", "10000"))
+CLOSE_INVALIDATION_CHUNK_SIZE = int(os.environ.get("CLOSE_INVALIDATION_CHUNK_SIZE", "500"))
+
+
+async def _invalidate(cache: PredictionCache | None, closed: dict[int, list[int]]) -> None:
+    if not cache:
+        return
+    # simple_predict:* (every model version) keys are found through the item's
+    # tag set. The deleted tasks' moderation_result:* keys are passed
+    # explicitly, so they go even if a tag set expired or missed a SADD.
+    # Chunks keep each Lua call short so Redis is not blocked by a big batch.
+    item_ids = list(closed)
+    for start in range(0, len(item_ids), CLOSE_INVALIDATION_CHUNK_SIZE):
+        chunk = item_ids[start:start + CLOSE_INVALIDATION_CHUNK_SIZE]
         try:
-            await cache.delete_many(keys)
+            await cache.invalidate_tags(
+                [cache_tag_item(item_id) for item_id in chunk],
+                keys=[cache_key_moderation_result(t) for item_id in chunk for t in closed[item_id]],
+            )
         except Exception:
             pass
+
+
+async def close_ad(item_id: int, pool, cache: PredictionCache | None) -> list[int]:
+    task_ids = await AdsRepository(pool).close_with_results(item_id)
+    if task_ids is None:
+        raise AdNotFoundError("Ad not found or already closed")
+    await _invalidate(cache, {item_id: task_ids})
+    return task_ids
+
+
+async def close_ads(item_ids: list[int], pool, cache: PredictionCache | None) -> list[int]:
+    closed = await AdsRepository(pool).close_many_with_results(list(dict.fromkeys(item_ids)))
+    await _invalidate(cache, closed)
+    return list(closed)
@@ -0,0 +1,86 @@
+import logging
+import os
+from typing import TYPE_CHECKING
+
+from metrics import FEATURE_CACHE_REQUESTS_TOTAL
+from services.scorer import get_scorer_version
+from storages.cache import cache_key_features
+
+if TYPE_CHECKING:
+    from storages.cache import PredictionCache
+
+logger = logging.getLogger(__name__)
+
+FEATURE_CACHE_ENABLED = os.environ.get("FEATURE_CACHE_ENABLED", "").lower() == "true"
+
+_hit = FEATURE_CACHE_REQUESTS_TOTAL.labels(result="hit")
+_miss = FEATURE_CACHE_REQUESTS_TOTAL.labels(result="miss")
+
+
+def feature_cache_key(
+    model,
+    is_verified_seller: bool,
+    images_qty: int,
+    description_length: int,
+    category: int,
+    enabled: bool = FEATURE_CACHE_ENABLED,
+) -> str | None:
+    if not enabled:
+        return None
+    # Without a version a model reload could serve another model's scores
+    version = get_scorer_version(model)
+    if version is None:
+        return None
+    return cache_key_features(version, is_verified_seller, images_qty, description_length, category)
+
+
+async def get_feature_cached(cache: "PredictionCache | None", key: str | None, as_json: bool = False):
+    if cache is None or key is None:
+        return None
+    try:
+        if as_json:
+            cached, _ = await cache.get_entry_json(key)
+        else:
+            cached = await cache.get(key)
+    except Exception:
+        return None
+    (_hit if cached is not None else _miss).inc()
+    return cached
+
+
+async def set_feature_cached(cache: "PredictionCache | None", key: str | None, result: dict) -> None:
+    if cache is None or key is None:
+        return
+    try:
+        await cache.set(key, result)
+    except Exception:
+        pass
+
+
+async def get_features_cached_many(
+    cache: "PredictionCache | None", keys: list[str | None]
+) -> list[dict | None]:
+    results: list[dict | None] = [None] * len(keys)
+    if cache is None:
+        return results
+    positions = [i for i, key in enumerate(keys) if key is not None]
+    if not positions:
+        return results
+    try:
+        cached = await cache.get_many([keys[i] for i in positions])
+    except Exception:
+        return results
+    for i, value in zip(positions, cached):
+        results[i] = value
+        (_hit if value is not None else _miss).inc()
+    return results
+
+
+async def set_features_cached_many(cache: "PredictionCache | None", items: dict[str | None, dict]) -> None:
+    items = {key: value for key, value in items.items() if key is not None}
+    if cache is None or not items:
+        return
+    try:
+        await cache.set_many(items)
+    except Exception:
+        pass
@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from metrics import INFERENCE_EXECUTION_SECONDS, INFERENCE_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_EXECUTOR = os.environ.get("INFERENCE_EXECUTOR", "inline").lower()
+INFERENCE_POOL_SIZE = int(os.environ.get("INFERENCE_POOL_SIZE", str(os.cpu_count() or 1)))
+INFERENCE_WARMUP_TIMEOUT_SECONDS = float(os.environ.get("INFERENCE_WARMUP_TIMEOUT_SECONDS", "60"))
+
+_worker_model = None
+
+
+def _timed_call(fn: Callable, model, args: tuple, kwargs: dict) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn(model, *args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _init_process_worker(model) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _call_with_worker_model(fn: Callable, args: tuple, kwargs: dict) -> tuple[Any, float]:
+    return _timed_call(fn, _worker_model, args, kwargs)
+
+
+def _warm_worker(features) -> int:
+    if features is not None:
+        _worker_model.score(features)
+    return os.getpid()
+
+
+class InferenceExecutor:
+    kind = "inline"
+
+    async def set_model(self, model, warmup_features=None) -> None:
+        pass
+
+    async def run(self, fn: Callable, model, *args, **kwargs):
+        INFERENCE_QUEUE_DEPTH.labels(executor=self.kind).inc()
+        try:
+            result, elapsed = await self._submit(fn, model, args, kwargs)
+        finally:
+            INFERENCE_QUEUE_DEPTH.labels(executor=self.kind).dec()
+        INFERENCE_EXECUTION_SECONDS.labels(executor=self.kind).observe(elapsed)
+        return result
+
+    async def _submit(self, fn: Callable, model, args: tuple, kwargs: dict):
+        return _timed_call(fn, model, args, kwargs)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ThreadInferenceExecutor(InferenceExecutor):
+    kind = "thread"
+
+    def __init__(self, pool_size: int = INFERENCE_POOL_SIZE):
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="inference")
+
+    async def _submit(self, fn: Callable, model, args: tuple, kwargs: dict):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, functools.partial(_timed_call, fn, model, args, kwargs)
+        )
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProcessInferenceExecutor(InferenceExecutor):
+    kind = "process"
+
+    def __init__(
+        self,
+        pool_size: int = INFERENCE_POOL_SIZE,
+        warmup_timeout: float = INFERENCE_WARMUP_TIMEOUT_SECONDS,
+    ):
+        self.pool_size = pool_size
+        self.warmup_timeout = warmup_timeout
+        self._pool: Executor | None = None
+        self._model = None
+        # Pools of replaced models stay up until the calls already on them finish
+        self._retired: dict[int, tuple[Any, Executor]] = {}
+        self._in_flight: dict[int, int] = {}
+
+    def _start_pool(self, model) -> Executor:
+        pool = ProcessPoolExecutor(
+            max_workers=self.pool_size,
+            initializer=_init_process_worker,
+            initargs=(model,),
+        )
+        logger.info("Inference process pool started with %s workers", self.pool_size)
+        return pool
+
+    async def _warm(self, pool: Executor, features) -> None:
+        # Workers start (and unpickle the model) on demand; keep submitting
+        # until every one of them has answered, so none starts cold under traffic
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.warmup_timeout
+        pids: set[int] = set()
+        while len(pids) < self.pool_size:
+            if loop.time() > deadline:
+                logger.warning(
+                    "Only %s of %s inference workers warmed up in %ss",
+                    len(pids),
+                    self.pool_size,
+                    self.warmup_timeout,
+                )
+                return
+            pids.update(
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, _warm_worker, features)
+                        for _ in range(self.pool_size)
+                    )
+                )
+            )
+            await asyncio.sleep(0)
+
+    async def set_model(self, model, warmup_features=None) -> None:
+        if model is self._model and self._pool is not None:
+            return
+        pool = self._start_pool(model)
+        try:
+            await self._warm(pool, warmup_features)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        previous_model, previous_pool = self._model, self._pool
+        self._model, self._pool = model, pool
+        if previous_pool is not None:
+            self._retired[id(previous_model)] = (previous_model, previous_pool)
+            self._release(id(previous_model))
+
+    def _release(self, key: int) -> None:
+        if self._in_flight.get(key) or key not in self._retired:
+            return
+        _, pool = self._retired.pop(key)
+        pool.shutdown(wait=False)
+
+    async def _submit(self, fn: Callable, model, args: tuple, kwargs: dict):
+        if self._pool is None:
+            self._model, self._pool = model, self._start_pool(model)
+        loop = asyncio.get_running_loop()
+        if model is None or model is self._model:
+            key, pool = id(self._model), self._pool
+        elif id(model) in self._retired:
+            key, pool = id(model), self._retired[id(model)][1]
+        else:
+            # The model's pool is already gone; ship the model with the call so
+            # the result still comes from the version the caller reports
+            return await loop.run_in_executor(self._pool, _timed_call, fn, model, args, kwargs)
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            return await loop.run_in_executor(pool, _call_with_worker_model, fn, args, kwargs)
+        finally:
+            self._in_flight[key] -= 1
+            if not self._in_flight[key]:
+                del self._in_flight[key]
+                self._release(key)
+
+    def shutdown(self) -> None:
+        for _, pool in self._retired.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._retired.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+INLINE_EXECUTOR = InferenceExecutor()
+
+
+def create_executor(
+    kind: str = INFERENCE_EXECUTOR, pool_size: int = INFERENCE_POOL_SIZE
+) -> InferenceExecutor:
+    if kind == "inline":
+        return InferenceExecutor()
+    if kind == "thread":
+        return ThreadInferenceExecutor(pool_size)
+    if kind == "process":
+        return ProcessInferenceExecutor(pool_size)
+    raise ValueError(f"Unknown inference executor: {kind}")
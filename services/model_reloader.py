@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+
+import numpy as np
+
+from metrics import MODEL_INFO, MODEL_RELOADS_TOTAL
+from model import ModelArtifact, get_model_version, get_model_with_version
+from services.inference_executor import InferenceExecutor
+from services.predict_service import FEATURE_SCALES, build_features
+from services.scorer import LinearScorer, SklearnScorer, build_scorer, get_scorer_version
+
+logger = logging.getLogger(__name__)
+
+MODEL_RELOAD_INTERVAL_SECONDS = float(os.environ.get("MODEL_RELOAD_INTERVAL_SECONDS", "0"))
+MODEL_WARMUP_ROWS = int(os.environ.get("MODEL_WARMUP_ROWS", "256"))
+
+
+def warmup_features(rows: int = MODEL_WARMUP_ROWS) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.vstack(
+        [
+            build_features(
+                is_verified_seller=bool(rng.integers(0, 2)),
+                images_qty=int(rng.integers(0, 10)),
+                description_length=int(rng.integers(1, 5000)),
+                category=int(rng.integers(1, 100)),
+            )
+            for _ in range(max(1, rows))
+        ]
+    )
+
+
+def warmup_scorer(scorer: LinearScorer | SklearnScorer, rows: int = MODEL_WARMUP_ROWS) -> None:
+    features = warmup_features(rows)
+    for chunk in (features[:1], features):
+        labels, probabilities = scorer.score(chunk)
+        if len(probabilities) != len(chunk) or not np.all(np.isfinite(probabilities)):
+            raise ValueError("Model warmup produced invalid probabilities")
+
+
+class ModelReloader:
+    def __init__(
+        self,
+        state,
+        executor: InferenceExecutor | None = None,
+        interval: float = MODEL_RELOAD_INTERVAL_SECONDS,
+        warmup_rows: int = MODEL_WARMUP_ROWS,
+    ):
+        self._state = state
+        self._executor = executor
+        self.interval = interval
+        self.warmup_rows = warmup_rows
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def version(self) -> str | None:
+        return get_scorer_version(getattr(self._state, "model", None))
+
+    def _load(self) -> LinearScorer | SklearnScorer:
+        model, version = get_model_with_version()
+        if isinstance(model, ModelArtifact) and tuple(model.feature_scales) != FEATURE_SCALES:
+            raise ValueError(
+                f"Model artifact feature scales {tuple(model.feature_scales)} "
+                f"do not match build_features {FEATURE_SCALES}"
+            )
+        scorer = build_scorer(model, version)
+        warmup_scorer(scorer, self.warmup_rows)
+        return scorer
+
+    async def reload(self, force: bool = False) -> bool:
+        async with self._lock:
+            if not force and getattr(self._state, "model", None) is not None:
+                source_version = await asyncio.to_thread(get_model_version)
+                if source_version == self.version:
+                    return False
+            previous = getattr(self._state, "model", None)
+            previous_version = self.version
+            try:
+                scorer = await asyncio.to_thread(self._load)
+                # Executor workers (e.g. a new process pool) are warmed before the swap too
+                if self._executor is not None:
+                    await self._executor.set_model(scorer, warmup_features(self.warmup_rows))
+            except Exception:
+                MODEL_RELOADS_TOTAL.labels(result="failed").inc()
+                raise
+            self._state.model = scorer
+            if previous is not None and previous_version != scorer.version:
+                try:
+                    MODEL_INFO.remove(str(previous_version))
+                except KeyError:
+                    pass
+            MODEL_INFO.labels(version=str(scorer.version)).set(1)
+            MODEL_RELOADS_TOTAL.labels(result="success").inc()
+            logger.info("Model version %s activated (previous: %s)", scorer.version, previous_version)
+            return True
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reload()
+            except Exception as exc:
+                logger.error("Model reload failed: %s", exc)
@@ -1,5 +1,6 @@
 import logging
 import time
+from typing import TYPE_CHECKING
 
 import numpy as np
 
@@ -8,10 +9,30 @@ from metrics import (
     PREDICTION_DURATION_SECONDS,
     PREDICTIONS_TOTAL,
 )
+from services.scorer import build_scorer
+
+if TYPE_CHECKING:
+    from services.batcher import PredictionBatcher
+    from services.inference_executor import InferenceExecutor
 
 logger = logging.getLogger(__name__)
 
 
+class _LoggedFeatures:
+    # Rendered by the log handler only for records that pass sampling
+    __slots__ = ("features",)
+
+    def __init__(self, features: np.ndarray):
+        self.features = features
+
+    def __str__(self) -> str:
+        return str(self.features.tolist())
+
+
+FEATURE_NAMES = ("is_verified_seller", "images_qty", "description_length", "category")
+FEATURE_SCALES = (1.0, 10.0, 1000.0, 100.0)
+
+
 def build_features(
     is_verified_seller: bool,
     images_qty: int,
@@ -20,19 +41,70 @@ def build_features(
 ) -> np.ndarray:
     return np.array(
         [
-            float(is_verified_seller),
-            images_qty / 10.0,
-            description_length / 1000.0,
-            category / 100.0,
+            float(is_verified_seller) / FEATURE_SCALES[0],
+            images_qty / FEATURE_SCALES[1],
+            description_length / FEATURE_SCALES[2],
+            category / FEATURE_SCALES[3],
         ]
     ).reshape(1, -1)
 
 
+def build_features_batch(
+    is_verified_seller: np.ndarray,
+    images_qty: np.ndarray,
+    description_length: np.ndarray,
+    category: np.ndarray,
+) -> np.ndarray:
+    features = np.column_stack(
+        [
+            np.asarray(is_verified_seller, dtype=np.float64),
+            np.asarray(images_qty, dtype=np.float64),
+            np.asarray(description_length, dtype=np.float64),
+            np.asarray(category, dtype=np.float64),
+        ]
+    )
+    features /= np.asarray(FEATURE_SCALES)
+    return features
+
+
 def predict(model, features: np.ndarray) -> tuple[bool, float]:
-    pred = model.predict(features)[0]
-    proba = model.predict_proba(features)[0]
-    proba_violation = float(proba[1])
-    return bool(pred), proba_violation
+    labels, probabilities = build_scorer(model).score(features)
+    return bool(labels[0]), float(probabilities[0])
+
+
+def predict_batch(model, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return build_scorer(model).score(features)
+
+
+def _observe_prediction(is_violation: bool, probability: float, duration: float) -> None:
+    PREDICTION_DURATION_SECONDS.observe(duration)
+    result_label = "violation" if is_violation else "no_violation"
+    PREDICTIONS_TOTAL.labels(result=result_label).inc()
+    MODEL_PREDICTION_PROBABILITY.observe(probability)
+    logger.info(
+        "Prediction: is_violation=%s, probability=%s",
+        is_violation,
+        probability,
+    )
+
+
+def observe_batch_prediction(
+    labels: np.ndarray, probabilities: np.ndarray, duration: float
+) -> None:
+    PREDICTION_DURATION_SECONDS.observe(duration)
+    violations = int(np.count_nonzero(labels))
+    if violations:
+        PREDICTIONS_TOTAL.labels(result="violation").inc(violations)
+    if len(labels) - violations:
+        PREDICTIONS_TOTAL.labels(result="no_violation").inc(len(labels) - violations)
+    for probability in probabilities:
+        MODEL_PREDICTION_PROBABILITY.observe(float(probability))
+    logger.info(
+        "Batch prediction: rows=%s, violations=%s, duration=%.6f",
+        len(labels),
+        violations,
+        duration,
+    )
 
 
 def run_prediction(
@@ -40,31 +112,57 @@ def run_prediction(
     seller_id: int,
     is_verified_seller: bool,
     item_id: int,
-    description: str,
+    description_length: int,
     category: int,
     images_qty: int,
 ) -> tuple[bool, float]:
     features = build_features(
         is_verified_seller=is_verified_seller,
         images_qty=images_qty,
-        description_length=len(description),
+        description_length=description_length,
         category=category,
     )
     logger.info(
         "Request: seller_id=%s, item_id=%s, features=%s",
         seller_id,
         item_id,
-        features.tolist(),
+        _LoggedFeatures(features),
     )
     start = time.perf_counter()
     is_violation, probability = predict(model, features)
-    PREDICTION_DURATION_SECONDS.observe(time.perf_counter() - start)
-    result_label = "violation" if is_violation else "no_violation"
-    PREDICTIONS_TOTAL.labels(result=result_label).inc()
-    MODEL_PREDICTION_PROBABILITY.observe(probability)
+    _observe_prediction(is_violation, probability, time.perf_counter() - start)
+    return is_violation, probability
+
+
+async def run_prediction_async(
+    model,
+    seller_id: int,
+    is_verified_seller: bool,
+    item_id: int,
+    description_length: int,
+    category: int,
+    images_qty: int,
+    batcher: "PredictionBatcher | None" = None,
+    executor: "InferenceExecutor | None" = None,
+) -> tuple[bool, float]:
+    features = build_features(
+        is_verified_seller=is_verified_seller,
+        images_qty=images_qty,
+        description_length=description_length,
+        category=category,
+    )
     logger.info(
-        "Prediction: is_violation=%s, probability=%s",
-        is_violation,
-        probability,
+        "Request: seller_id=%s, item_id=%s, features=%s",
+        seller_id,
+        item_id,
+        _LoggedFeatures(features),
     )
+    start = time.perf_counter()
+    if batcher is not None:
+        is_violation, probability = await batcher.submit(model, features)
+    elif executor is not None:
+        is_violation, probability = await executor.run(predict, model, features)
+    else:
+        is_violation, probability = predict(model, features)
+    _observe_prediction(is_violation, probability, time.perf_counter() - start)
     return is_violation, probability
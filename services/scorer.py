@@ -0,0 +1,73 @@
+import numpy as np
+
+from model import ModelArtifact
+
+
+class LinearScorer:
+    def __init__(self, model, version: str | None = None):
+        self.model = model
+        self.version = version
+        self.coef = np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64).ravel())
+        self.intercept = float(np.asarray(model.intercept_, dtype=np.float64).ravel()[0])
+
+    def __reduce__(self):
+        return LinearScorer, (self.model, self.version)
+
+    @staticmethod
+    def supports(model) -> bool:
+        if isinstance(model, ModelArtifact):
+            return list(model.classes_) == [0, 1]
+        from sklearn.linear_model import LogisticRegression
+
+        if not isinstance(model, LogisticRegression):
+            return False
+        coef = getattr(model, "coef_", None)
+        classes = getattr(model, "classes_", None)
+        return (
+            coef is not None
+            and classes is not None
+            and np.shape(coef)[0] == 1
+            and list(classes) == [0, 1]
+        )
+
+    def score(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        decision = np.asarray(features, dtype=np.float64) @ self.coef + self.intercept
+        probability = 1.0 / (1.0 + np.exp(-decision))
+        return decision > 0, probability
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.score(features)[0].astype(int)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        probability = self.score(features)[1]
+        return np.column_stack([1.0 - probability, probability])
+
+
+class SklearnScorer:
+    def __init__(self, model, version: str | None = None):
+        self.model = model
+        self.version = version
+
+    def score(self, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        probability = np.asarray(self.model.predict_proba(features), dtype=np.float64)[:, 1]
+        return probability > 0.5, probability
+
+    def predict(self, features: np.ndarray):
+        return self.model.predict(features)
+
+    def predict_proba(self, features: np.ndarray):
+        return self.model.predict_proba(features)
+
+
+def build_scorer(model, version: str | None = None) -> LinearScorer | SklearnScorer:
+    if isinstance(model, (LinearScorer, SklearnScorer)):
+        return model
+    if LinearScorer.supports(model):
+        return LinearScorer(model, version)
+    return SklearnScorer(model, version)
+
+
+def get_scorer_version(model) -> str | None:
+    if isinstance(model, (LinearScorer, SklearnScorer)):
+        return model.version
+    return None
@@ -1,48 +1,84 @@
 import logging
 from typing import TYPE_CHECKING
 
-from exceptions import AdNotFoundError, PredictionError
-from repositories.ads import AdsRepository
-from services.predict_service import run_prediction
-from storages.cache import cache_key_simple_predict
+from exceptions import PredictionError
+from services.ads_service import get_open_ad
+from services.feature_cache import feature_cache_key, get_feature_cached, set_feature_cached
+from services.predict_service import run_prediction_async
+from services.scorer import get_scorer_version
+from storages.cache import cache_key_simple_predict, cache_tag_item
 
 if TYPE_CHECKING:
+    from services.batcher import PredictionBatcher
+    from services.inference_executor import InferenceExecutor
+    from services.single_flight import SingleFlight
     from storages.cache import PredictionCache
 
 logger = logging.getLogger(__name__)
 
 
-async def simple_predict(item_id: int, model, pool, cache: "PredictionCache | None" = None):
+async def simple_predict(
+    item_id: int,
+    model,
+    pool,
+    cache: "PredictionCache | None" = None,
+    batcher: "PredictionBatcher | None" = None,
+    executor: "InferenceExecutor | None" = None,
+    single_flight: "SingleFlight | None" = None,
+) -> dict | bytes:
+    key = cache_key_simple_predict(get_scorer_version(model), item_id)
+
+    async def compute():
+        return await _predict_and_cache(item_id, model, pool, cache, batcher, executor)
+
     if cache:
         try:
-            cached = await cache.get(cache_key_simple_predict(item_id))
+            cached, stale = await cache.get_entry_json(key)
             if cached is not None:
+                if stale:
+                    cache.refresh(key, compute)
                 return cached
         except Exception:
             pass
-    ads_repo = AdsRepository(pool)
-    row = await ads_repo.get_by_id(item_id)
-    if row is None:
-        raise AdNotFoundError("Ad not found")
-    try:
-        is_violation, probability = run_prediction(
-            model=model,
-            seller_id=row["seller_id"],
-            is_verified_seller=row["is_verified_seller"],
-            item_id=row["id"],
-            description=row["description"],
-            category=row["category"],
-            images_qty=row["images_qty"],
-        )
+
+    if single_flight is not None:
+        return await single_flight.do(key, compute, cache)
+    return await compute()
+
+
+async def _predict_and_cache(item_id, model, pool, cache, batcher, executor):
+    row = await get_open_ad(item_id, pool, cache)
+    feature_key = feature_cache_key(
+        model, row["is_verified_seller"], row["images_qty"], row["description_length"], row["category"]
+    )
+    result = await get_feature_cached(cache, feature_key)
+    if result is None:
+        try:
+            is_violation, probability = await run_prediction_async(
+                model=model,
+                seller_id=row["seller_id"],
+                is_verified_seller=row["is_verified_seller"],
+                item_id=row["id"],
+                description_length=row["description_length"],
+                category=row["category"],
+                images_qty=row["images_qty"],
+                batcher=batcher,
+                executor=executor,
+            )
+        except PredictionError:
+            raise
+        except Exception as exc:
+            logger.exception("Simple predict failed")
+            raise PredictionError(str(exc)) from exc
         result = {"is_violation": is_violation, "probability": probability}
-        if cache:
-            try:
-                await cache.set(cache_key_simple_predict(item_id), result)
-            except Exception:
-                pass
-        return result
-    except (AdNotFoundError, PredictionError):
-        raise
-    except Exception as exc:
-        logger.exception("Simple predict failed")
-        raise PredictionError(str(exc)) from exc
+        await set_feature_cached(cache, feature_key, result)
+    if cache:
+        try:
+            await cache.set(
+                cache_key_simple_predict(get_scorer_version(model), item_id),
+                result,
+                tags=[cache_tag_item(item_id)],
+            )
+        except Exception:
+            pass
+    return result
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from metrics import SINGLE_FLIGHT_COALESCED_TOTAL
+
+if TYPE_CHECKING:
+    from storages.cache import PredictionCache
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_REDIS_LOCK = os.environ.get("SINGLE_FLIGHT_REDIS_LOCK", "").lower() == "true"
+SINGLE_FLIGHT_LOCK_TTL_MS = int(os.environ.get("SINGLE_FLIGHT_LOCK_TTL_MS", "2000"))
+SINGLE_FLIGHT_LOCK_WAIT_MS = int(os.environ.get("SINGLE_FLIGHT_LOCK_WAIT_MS", "500"))
+SINGLE_FLIGHT_LOCK_POLL_MS = 20
+
+
+def _key_type(key: str) -> str:
+    return key.partition(":")[0]
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # The leader may be gone (e.g. cancelled) while followers still hold the
+    # task; make sure a failure is never reported as "never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        redis_lock: bool = SINGLE_FLIGHT_REDIS_LOCK,
+        lock_ttl_ms: int = SINGLE_FLIGHT_LOCK_TTL_MS,
+        lock_wait_ms: int = SINGLE_FLIGHT_LOCK_WAIT_MS,
+    ):
+        self.redis_lock = redis_lock
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait_ms = lock_wait_ms
+        self._calls: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        cache: "PredictionCache | None" = None,
+    ) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn, cache))
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            SINGLE_FLIGHT_COALESCED_TOTAL.labels(key_type=_key_type(key), scope="local").inc()
+        # shield: one cancelled caller must not cancel the computation for the rest
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        _consume_exception(task)
+
+    async def _run(self, key: str, fn, cache: "PredictionCache | None"):
+        if not self.redis_lock or cache is None:
+            return await fn()
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        acquired = False
+        deadline = time.monotonic() + self.lock_wait_ms / 1000
+        try:
+            while True:
+                acquired = await cache.acquire_lock(lock_key, token, self.lock_ttl_ms)
+                if acquired or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(SINGLE_FLIGHT_LOCK_POLL_MS / 1000)
+                cached = await cache.get(key)
+                if cached is not None:
+                    SINGLE_FLIGHT_COALESCED_TOTAL.labels(key_type=_key_type(key), scope="redis").inc()
+                    return cached
+        except Exception as exc:
+            logger.warning("Single-flight lock unavailable for %s: %s", key, exc)
+        try:
+            return await fn()
+        finally:
+            if acquired:
+                try:
+                    await cache.release_lock(lock_key, token)
+                except Exception:
+                    pass
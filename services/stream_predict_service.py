@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable
+
+from exceptions import PredictionError
+from services.batch_predict_service import batch_predict
+
+if TYPE_CHECKING:
+    from services.inference_executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+STREAM_CHUNK_SIZE = int(os.environ.get("PREDICT_STREAM_CHUNK_SIZE", "1000"))
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _score_chunk(
+    pending: list[tuple[int, Any, str | None]],
+    model,
+    executor: "InferenceExecutor | None",
+) -> bytes:
+    payloads = [payload for _, payload, error in pending if error is None]
+    predictions = iter([])
+    failure = None
+    if payloads:
+        try:
+            predictions = iter(await batch_predict(payloads, model, executor=executor))
+        except PredictionError as exc:
+            failure = str(exc)
+    lines = []
+    for line_no, payload, error in pending:
+        if error is None and failure is not None:
+            error = failure
+        if error is not None:
+            lines.append(json.dumps({"line": line_no, "error": error}))
+        else:
+            lines.append(json.dumps({"line": line_no, "item_id": payload.item_id, **next(predictions)}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def stream_predict(
+    lines: AsyncIterator[bytes],
+    model,
+    parse: Callable[[bytes], tuple[Any, str | None]],
+    executor: "InferenceExecutor | None" = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    pending: list[tuple[int, Any, str | None]] = []
+    valid = 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        payload, error = parse(line)
+        pending.append((line_no, payload, error))
+        if error is None:
+            valid += 1
+        if valid >= chunk_size or len(pending) >= 2 * chunk_size:
+            yield await _score_chunk(pending, model, executor)
+            pending = []
+            valid = 0
+    if pending:
+        yield await _score_chunk(pending, model, executor)
+    logger.info("Stream predict finished: lines=%s", line_no)
@@ -1,45 +1,394 @@
+import asyncio
 import json
+import logging
+import math
 import os
+import random
+import time
+from collections import OrderedDict
 
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from circuit_breaker import CircuitBreaker
+
+from metrics import CACHE_REFRESHES_TOTAL, CACHE_REQUESTS_TOTAL
+from storages.cache_codec import decode_value, encode_value, get_codec, payload_to_json
+
+logger = logging.getLogger(__name__)
 
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 # TTL 1 hour: balance between reducing DB/model load and freshness of moderation results
 CACHE_TTL_SECONDS = 3600
+# Extra lifetime past the TTL during which a stale value is served while it is
+# refreshed in the background
+CACHE_STALE_TTL_SECONDS = int(os.environ.get("CACHE_STALE_TTL_SECONDS", "0"))
+# Mean of the exponential head start for probabilistic early expiry (XFetch)
+CACHE_EARLY_EXPIRY_SECONDS = float(os.environ.get("CACHE_EARLY_EXPIRY_SECONDS", "0"))
+
+# Short TTL for "ad not found" markers; 0 disables negative caching
+NEGATIVE_CACHE_TTL_SECONDS = int(os.environ.get("NEGATIVE_CACHE_TTL_SECONDS", "30"))
+
+CACHE_L1_ENABLED = os.environ.get("CACHE_L1_ENABLED", "").lower() == "true"
+CACHE_L1_MAX_SIZE = int(os.environ.get("CACHE_L1_MAX_SIZE", "10000"))
+# Short L1 TTL bounds staleness if an invalidation message is lost
+CACHE_L1_TTL_SECONDS = float(os.environ.get("CACHE_L1_TTL_SECONDS", "30"))
+CACHE_INVALIDATION_CHANNEL = "prediction_cache:invalidate"
+
+# KEYS: tag sets; ARGV[1]: pub/sub channel or ""; ARGV[2..]: extra keys.
+# Deletes every key listed in the tag sets plus the extra keys, deletes the
+# tag sets and returns the deleted keys, all in one round trip.
+_INVALIDATE_TAGS_SCRIPT = """
+local keys = {}
+for i = 2, #ARGV do
+    keys[#keys + 1] = ARGV[i]
+end
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call("smembers", tag)) do
+        keys[#keys + 1] = key
+    end
+end
+for i = 1, #keys, 1000 do
+    redis.call("del", unpack(keys, i, math.min(i + 999, #keys)))
+end
+if #KEYS > 0 then
+    redis.call("del", unpack(KEYS))
+end
+if ARGV[1] ~= "" and #keys > 0 then
+    redis.call("publish", ARGV[1], cjson.encode(keys))
+end
+return keys
+"""
+
+REDIS_FAILURES = (RedisConnectionError, RedisTimeoutError, OSError)
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_l1_hit = CACHE_REQUESTS_TOTAL.labels(tier="l1", result="hit")
+_l1_miss = CACHE_REQUESTS_TOTAL.labels(tier="l1", result="miss")
+_redis_hit = CACHE_REQUESTS_TOTAL.labels(tier="redis", result="hit")
+_redis_miss = CACHE_REQUESTS_TOTAL.labels(tier="redis", result="miss")
+_redis_stale = CACHE_REQUESTS_TOTAL.labels(tier="redis", result="stale")
+_refresh_ok = CACHE_REFRESHES_TOTAL.labels(result="ok")
+_refresh_error = CACHE_REFRESHES_TOTAL.labels(result="error")
+
+
+class LocalCache:
+    def __init__(self, max_size: int = CACHE_L1_MAX_SIZE, ttl: float = CACHE_L1_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> bytes | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete_many(self, keys: list[str]) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
 
 
 class PredictionCache:
-    def __init__(self, client: redis.Redis):
+    def __init__(
+        self,
+        client: redis.Redis,
+        local: LocalCache | None = None,
+        invalidation_channel: str | None = None,
+        stale_ttl: int = CACHE_STALE_TTL_SECONDS,
+        early_expiry: float = CACHE_EARLY_EXPIRY_SECONDS,
+        codec=None,
+        breaker: CircuitBreaker | None = None,
+    ):
         self._client = client
         self._ttl = CACHE_TTL_SECONDS
+        self._local = local
+        self._invalidation_channel = invalidation_channel
+        self._listener: asyncio.Task | None = None
+        self._stale_ttl = stale_ttl
+        self._early_expiry = early_expiry
+        self._refreshes: dict[str, asyncio.Task] = {}
+        self._codec = codec if codec is not None else get_codec()
+        self._breaker = breaker
 
-    async def get(self, key: str):
-        data = await self._client.get(key)
-        if data is None:
-            return None
-        return json.loads(data)
+    async def _call(self, fn, *args, **kwargs):
+        if self._breaker is None:
+            return await fn(*args, **kwargs)
+        return await self._breaker.call(fn, *args, **kwargs)
 
-    async def set(self, key: str, value: dict, ttl: int | None = None):
-        await self._client.set(
-            key,
-            json.dumps(value),
-            ex=ttl if ttl is not None else self._ttl,
-        )
+    def _expire_seconds(self, ttl: int | None) -> int:
+        return (ttl if ttl is not None else self._ttl) + self._stale_ttl
+
+    def _is_stale(self, pttl: int) -> bool:
+        # pttl counts down the hard TTL; the value is fresh until only the
+        # stale window is left.
+        fresh_left = pttl / 1000 - self._stale_ttl
+        if fresh_left <= 0:
+            return True
+        if self._early_expiry > 0:
+            return fresh_left <= -self._early_expiry * math.log(1.0 - random.random())
+        return False
+
+    async def _get_payload(self, key: str, check_stale: bool) -> tuple[bytes | None, bool]:
+        if self._local is not None:
+            payload = self._local.get(key)
+            if payload is not None:
+                _l1_hit.inc()
+                return payload, False
+            _l1_miss.inc()
+        stale = False
+        if check_stale and (self._stale_ttl or self._early_expiry):
+            pipe = self._client.pipeline(transaction=False)
+            pipe.get(key)
+            pipe.pttl(key)
+            payload, pttl = await self._call(pipe.execute)
+            # pttl is -1 for keys written without an expiry
+            stale = payload is not None and pttl >= 0 and self._is_stale(pttl)
+        else:
+            payload = await self._call(self._client.get, key)
+        if payload is None:
+            _redis_miss.inc()
+            return None, False
+        if stale:
+            _redis_stale.inc()
+            return payload, True
+        _redis_hit.inc()
+        if self._local is not None:
+            self._local.set(key, payload)
+        return payload, False
+
+    async def get(self, key: str) -> dict | None:
+        payload, _ = await self._get_payload(key, check_stale=False)
+        return decode_value(payload) if payload is not None else None
+
+    async def get_entry(self, key: str) -> tuple[dict | None, bool]:
+        payload, stale = await self._get_payload(key, check_stale=True)
+        return (decode_value(payload) if payload is not None else None), stale
+
+    async def get_entry_json(self, key: str) -> tuple[bytes | None, bool]:
+        payload, stale = await self._get_payload(key, check_stale=True)
+        return (payload_to_json(payload) if payload is not None else None), stale
+
+    def refresh(self, key: str, compute) -> None:
+        if key in self._refreshes:
+            return
+        task = asyncio.create_task(self._refresh(key, compute))
+        self._refreshes[key] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+
+    async def _refresh(self, key: str, compute):
+        try:
+            await compute()
+            _refresh_ok.inc()
+        except Exception as exc:
+            _refresh_error.inc()
+            logger.warning("Background refresh of %s failed: %s", key, exc)
+
+    async def set(
+        self, key: str, value: dict, ttl: int | None = None, tags: list[str] | None = None
+    ):
+        payload = encode_value(value, self._codec)
+        expire = self._expire_seconds(ttl)
+        if tags:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.set(key, payload, ex=expire)
+            self._add_tags(pipe, key, tags, expire)
+            await self._call(pipe.execute)
+        else:
+            await self._call(self._client.set, key, payload, ex=expire)
+        if self._local is not None:
+            self._local.set(key, payload, ttl)
+
+    @staticmethod
+    def _add_tags(pipe, key: str, tags: list[str], expire: int):
+        # Every member shares the same TTL, so the tag set only has to outlive
+        # the most recently added one.
+        for tag in tags:
+            pipe.sadd(tag, key)
+            pipe.expire(tag, expire)
+
+    async def get_many(self, keys: list[str]) -> list[dict | None]:
+        if not keys:
+            return []
+        payloads: list[bytes | None] = [None] * len(keys)
+        remote = list(range(len(keys)))
+        if self._local is not None:
+            remote = []
+            for i, key in enumerate(keys):
+                payloads[i] = self._local.get(key)
+                if payloads[i] is None:
+                    remote.append(i)
+            _l1_hit.inc(len(keys) - len(remote))
+            _l1_miss.inc(len(remote))
+        if remote:
+            values = await self._call(self._client.mget, [keys[i] for i in remote])
+            hits = 0
+            for i, payload in zip(remote, values):
+                if payload is None:
+                    continue
+                hits += 1
+                payloads[i] = payload
+                if self._local is not None:
+                    self._local.set(keys[i], payload)
+            _redis_hit.inc(hits)
+            _redis_miss.inc(len(remote) - hits)
+        return [decode_value(p) if p is not None else None for p in payloads]
+
+    async def set_many(
+        self,
+        items: dict[str, dict],
+        ttl: int | None = None,
+        tags: dict[str, list[str]] | None = None,
+    ):
+        if not items:
+            return
+        payloads = {key: encode_value(value, self._codec) for key, value in items.items()}
+        expire = self._expire_seconds(ttl)
+        pipe = self._client.pipeline(transaction=False)
+        for key, payload in payloads.items():
+            pipe.set(key, payload, ex=expire)
+            if tags and key in tags:
+                self._add_tags(pipe, key, tags[key], expire)
+        await self._call(pipe.execute)
+        if self._local is not None:
+            for key, payload in payloads.items():
+                self._local.set(key, payload, ttl)
 
     async def delete(self, key: str):
-        await self._client.delete(key)
+        await self.delete_many([key])
 
     async def delete_many(self, keys: list[str]):
-        if keys:
-            await self._client.delete(*keys)
+        if not keys:
+            return
+        if self._local is not None:
+            self._local.delete_many(keys)
+        await self._call(self._client.delete, *keys)
+        if self._invalidation_channel is not None:
+            await self._call(self._client.publish, self._invalidation_channel, json.dumps(keys))
+
+    async def has_negative(self, key: str) -> bool:
+        return bool(await self._call(self._client.exists, key))
+
+    async def set_negative(self, key: str, ttl: int = NEGATIVE_CACHE_TTL_SECONDS):
+        await self._call(self._client.set, key, b"", ex=ttl)
+
+    async def invalidate_tags(self, tags: list[str], keys: list[str] | None = None) -> list[str]:
+        keys = keys or []
+        if not tags and not keys:
+            return []
+        deleted = await self._call(
+            self._client.eval,
+            _INVALIDATE_TAGS_SCRIPT,
+            len(tags),
+            *tags,
+            self._invalidation_channel or "",
+            *keys,
+        )
+        deleted = [k.decode() if isinstance(k, bytes) else k for k in deleted]
+        if self._local is not None:
+            self._local.delete_many(deleted)
+        return deleted
+
+    async def acquire_lock(self, key: str, token: str, ttl_ms: int) -> bool:
+        return bool(await self._call(self._client.set, key, token, nx=True, px=ttl_ms))
+
+    async def release_lock(self, key: str, token: str):
+        await self._call(self._client.eval, _RELEASE_LOCK_SCRIPT, 1, key, token)
+
+    async def start_invalidation_listener(self):
+        if self._local is None or self._invalidation_channel is None or self._listener is not None:
+            return
+        self._listener = asyncio.create_task(self._listen_invalidations())
+
+    async def close(self):
+        await self.stop_invalidation_listener()
+        for task in list(self._refreshes.values()):
+            task.cancel()
+        if self._refreshes:
+            await asyncio.gather(*self._refreshes.values(), return_exceptions=True)
+
+    async def stop_invalidation_listener(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen_invalidations(self):
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self._invalidation_channel)
+                # Entries cached before the subscription was (re)established may
+                # have missed invalidations.
+                self._local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._local.delete_many(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Cache invalidation listener failed: %s", exc)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+# Prediction keys carry the model version, so a hot reload never serves the
+# previous model's scores under the new X-Model-Version
+def cache_key_predict(
+    model_version: str | None,
+    seller_id: int,
+    is_verified: bool,
+    item_id: int,
+    desc_len: int,
+    category: int,
+    images_qty: int,
+) -> str:
+    return f"predict:{model_version}:{seller_id}:{int(is_verified)}:{item_id}:{desc_len}:{category}:{images_qty}"
+
+
+def cache_tag_item(item_id: int) -> str:
+    return f"tag:item:{item_id}"
+
+
+def cache_key_features(model_version: str, is_verified: bool, images_qty: int, desc_len: int, category: int) -> str:
+    return f"features:{model_version}:{int(is_verified)}:{images_qty}:{desc_len}:{category}"
 
 
-def cache_key_predict(seller_id: int, is_verified: bool, item_id: int, desc_len: int, category: int, images_qty: int) -> str:
-    return f"predict:{seller_id}:{int(is_verified)}:{item_id}:{desc_len}:{category}:{images_qty}"
+def cache_key_simple_predict(model_version: str | None, item_id: int) -> str:
+    return f"simple_predict:{model_version}:{item_id}"
 
 
-def cache_key_simple_predict(item_id: int) -> str:
-    return f"simple_predict:{item_id}"
+def cache_key_missing_ad(item_id: int) -> str:
+    return f"missing_ad:{item_id}"
 
 
 def cache_key_moderation_result(task_id: int) -> str:
@@ -0,0 +1,92 @@
+import json
+import os
+import struct
+
+CACHE_CODEC = os.environ.get("CACHE_CODEC", "struct").lower()
+
+
+def _dump_json(value: dict) -> bytes:
+    # Same bytes FastAPI's JSONResponse renders, so cached payloads can be
+    # returned as-is.
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class JsonCodec:
+    codec_id = 1
+
+    def encode(self, value: dict) -> bytes | None:
+        return _dump_json(value)
+
+    def decode(self, body: bytes) -> dict:
+        return json.loads(body)
+
+    def to_json(self, body: bytes) -> bytes:
+        return body
+
+
+class PredictionStructCodec:
+    # {"is_violation": bool, "probability": float} packed into 9 bytes
+    codec_id = 2
+    _format = struct.Struct("<?d")
+
+    def encode(self, value: dict) -> bytes | None:
+        if value.keys() != {"is_violation", "probability"}:
+            return None
+        is_violation, probability = value["is_violation"], value["probability"]
+        if not isinstance(is_violation, bool) or not isinstance(probability, float):
+            return None
+        return self._format.pack(is_violation, probability)
+
+    def decode(self, body: bytes) -> dict:
+        is_violation, probability = self._format.unpack(body)
+        return {"is_violation": is_violation, "probability": probability}
+
+    def to_json(self, body: bytes) -> bytes:
+        is_violation, probability = self._format.unpack(body)
+        # float repr is what json.dumps emits for floats
+        return b'{"is_violation":%s,"probability":%s}' % (
+            b"true" if is_violation else b"false",
+            repr(probability).encode(),
+        )
+
+
+CODECS = {codec.codec_id: codec for codec in (JsonCodec(), PredictionStructCodec())}
+CODECS_BY_NAME = {"json": CODECS[JsonCodec.codec_id], "struct": CODECS[PredictionStructCodec.codec_id]}
+_JSON = CODECS[JsonCodec.codec_id]
+
+
+def get_codec(name: str = CACHE_CODEC):
+    try:
+        return CODECS_BY_NAME[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec: {name}") from None
+
+
+def encode_value(value: dict, codec=_JSON) -> bytes:
+    body = codec.encode(value)
+    if body is None:
+        codec = _JSON
+        body = codec.encode(value)
+    return bytes((codec.codec_id,)) + body
+
+
+def _split(payload: bytes | str):
+    if isinstance(payload, str):
+        payload = payload.encode()
+    # Entries written before the codec header existed are plain JSON text
+    if payload[:1] == b"{":
+        return _JSON, payload
+    codec = CODECS.get(payload[0])
+    if codec is None:
+        raise ValueError(f"Unknown cache codec id: {payload[0]}")
+    return codec, payload[1:]
+
+
+def decode_value(payload: bytes | str) -> dict:
+    codec, body = _split(payload)
+    return codec.decode(body)
+
+
+def payload_to_json(payload: bytes | str) -> bytes:
+    codec, body = _split(payload)
+    return codec.to_json(body)
@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from exceptions import AdNotFoundError
+from repositories.ads import AdsRepository
+from services.ads_service import create_ad, get_open_ad
+from services.async_predict_service import create_moderation_task
+
+
+@pytest.fixture
+def mock_cache():
+    cache = MagicMock()
+    cache.has_negative = AsyncMock(return_value=False)
+    cache.set_negative = AsyncMock()
+    cache.delete = AsyncMock()
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_missing_ad_is_cached_negatively(mock_cache):
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=None):
+        with pytest.raises(AdNotFoundError):
+            await get_open_ad(7, MagicMock(), mock_cache)
+    mock_cache.has_negative.assert_awaited_once_with("missing_ad:7")
+    mock_cache.set_negative.assert_awaited_once_with("missing_ad:7")
+
+
+@pytest.mark.asyncio
+async def test_negative_hit_skips_db(mock_cache):
+    mock_cache.has_negative.return_value = True
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock) as get_features_by_id:
+        with pytest.raises(AdNotFoundError):
+            await get_open_ad(7, MagicMock(), mock_cache)
+    get_features_by_id.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cache_errors_fall_back_to_db(mock_cache):
+    mock_cache.has_negative.side_effect = ConnectionError("redis down")
+    row = {"id": 7}
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=row):
+        assert await get_open_ad(7, MagicMock(), mock_cache) == row
+    mock_cache.set_negative.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_create_ad_clears_negative_entry(mock_cache):
+    with patch.object(AdsRepository, "create", new_callable=AsyncMock, return_value=8):
+        assert await create_ad(MagicMock(), 1, "Ad", "text", 2, 0, cache=mock_cache) == 8
+    mock_cache.delete.assert_awaited_once_with("missing_ad:8")
+
+
+@pytest.mark.asyncio
+async def test_async_predict_rejects_cached_missing_ad(mock_cache):
+    mock_cache.has_negative.return_value = True
+    kafka = AsyncMock()
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock) as get_features_by_id:
+        with pytest.raises(AdNotFoundError):
+            await create_moderation_task(7, MagicMock(), kafka, mock_cache)
+    get_features_by_id.assert_not_called()
+    kafka.send_moderation_request.assert_not_called()
@@ -165,3 +165,17 @@ def test_get_moderation_result_not_found(client, monkeypatch):
     )
     response = client.get("/moderation_result/999999")
     assert response.status_code == 404
+
+
+def test_async_predict_database_timeout_returns_503(client, monkeypatch):
+    from db.connection import DatabaseTimeoutError
+
+    monkeypatch.setattr(main.app.state, "db_pool", MagicMock())
+    monkeypatch.setattr(main.app.state, "kafka_producer", MagicMock())
+    with patch(
+        "routes.async_predict.create_moderation_task",
+        new_callable=AsyncMock,
+        side_effect=DatabaseTimeoutError("Timed out acquiring a connection from the primary pool"),
+    ):
+        response = client.post("/async_predict", json={"item_id": 1})
+    assert response.status_code == 503
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import main
+from services.predict_service import build_features, build_features_batch
+from services.scorer import SklearnScorer
+
+
+def build_item(**overrides):
+    item = {
+        "seller_id": 123,
+        "is_verified_seller": False,
+        "item_id": 456,
+        "name": "Phone",
+        "description": "A good phone",
+        "category": 7,
+        "images_qty": 1,
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda x: np.column_stack(
+        [1 - x[:, 1], x[:, 1]]
+    )
+    return model
+
+
+@pytest.fixture
+def batch_client(client, mock_model):
+    original = {
+        name: getattr(main.app.state, name, None) for name in ("model", "cache")
+    }
+    main.app.state.model = mock_model
+    main.app.state.cache = None
+    yield client
+    for name, value in original.items():
+        setattr(main.app.state, name, value)
+
+
+def test_build_features_batch_matches_single_row():
+    rows = [(True, 3, 250, 7), (False, 0, 1, 100), (False, 12, 9000, 1)]
+    batch = build_features_batch(*(np.array(column) for column in zip(*rows)))
+    expected = np.vstack([build_features(*row) for row in rows])
+    np.testing.assert_array_equal(batch, expected)
+
+
+def test_predict_batch_returns_results_in_input_order(batch_client, mock_model):
+    items = [build_item(item_id=i + 1, images_qty=i) for i in range(6)]
+    response = batch_client.post("/predict/batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == list(range(6))
+    assert [r["item_id"] for r in results] == [1, 2, 3, 4, 5, 6]
+    assert [r["probability"] for r in results] == pytest.approx([i / 10 for i in range(6)])
+    assert [r["is_violation"] for r in results] == [False] * 6
+    assert mock_model.predict_proba.call_count == 1
+
+
+def test_predict_batch_reports_per_item_errors(batch_client):
+    items = [build_item(item_id=1), build_item(seller_id=-1), {"item_id": 3}, build_item(item_id=4)]
+    response = batch_client.post("/predict/batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["item_id"] == 1 and "probability" in results[0]
+    assert "seller_id" in results[1]["error"]
+    assert "description" in results[2]["error"]
+    assert results[3]["item_id"] == 4 and "probability" in results[3]
+
+
+def test_predict_batch_reports_non_object_items_per_item(batch_client):
+    items = [build_item(item_id=1), "oops", None, [1, 2]]
+    response = batch_client.post("/predict/batch", json={"items": items})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["item_id"] == 1 and "probability" in results[0]
+    for index in (1, 2, 3):
+        assert results[index]["index"] == index
+        assert "valid dictionary" in results[index]["error"]
+
+
+def test_predict_batch_validation(batch_client):
+    assert batch_client.post("/predict/batch", json={"items": []}).status_code == 422
+    assert batch_client.post("/predict/batch", json={}).status_code == 422
+
+
+def test_predict_batch_uses_cache_for_hits(batch_client, mock_model):
+    cache = MagicMock()
+    cache.get_many = AsyncMock(return_value=[{"is_violation": True, "probability": 0.99}, None])
+    cache.set_many = AsyncMock()
+    main.app.state.cache = cache
+    main.app.state.model = SklearnScorer(mock_model, "v1")
+    items = [build_item(item_id=1), build_item(item_id=2, images_qty=5)]
+    response = batch_client.post("/predict/batch", json={"items": items})
+    results = response.json()["results"]
+    assert results[0]["probability"] == 0.99
+    assert results[1]["probability"] == pytest.approx(0.5)
+    assert mock_model.predict_proba.call_args[0][0].shape == (1, 4)
+    written = cache.set_many.call_args[0][0]
+    assert list(written) == ["predict:v1:123:0:2:12:7:5"]
+    assert cache.get_many.call_args[0][0][0] == "predict:v1:123:0:1:12:7:1"
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from model import train_model
+from services.batcher import PredictionBatcher
+from services.predict_service import build_features, predict
+
+
+@pytest.fixture
+def model():
+    return train_model()
+
+
+def _features(i: int) -> np.ndarray:
+    return build_features(
+        is_verified_seller=bool(i % 2),
+        images_qty=i % 10,
+        description_length=i * 37,
+        category=i % 100 + 1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batcher_matches_single_row_predict(model):
+    batcher = PredictionBatcher(max_batch_size=16, max_wait_ms=5)
+    try:
+        rows = [_features(i) for i in range(40)]
+        results = await asyncio.gather(*(batcher.submit(model, f) for f in rows))
+    finally:
+        await batcher.stop()
+    for features, (is_violation, probability) in zip(rows, results):
+        expected_violation, expected_probability = predict(model, features)
+        assert is_violation == expected_violation
+        assert probability == pytest.approx(expected_probability)
+
+
+@pytest.mark.asyncio
+async def test_batcher_groups_concurrent_requests_into_one_call():
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda x: np.tile([0.3, 0.7], (len(x), 1))
+    batcher = PredictionBatcher(max_batch_size=8, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*(batcher.submit(model, _features(i)) for i in range(8)))
+    finally:
+        await batcher.stop()
+    assert results == [(True, 0.7)] * 8
+    assert model.predict_proba.call_count == 1
+    assert model.predict_proba.call_args[0][0].shape == (8, 4)
+
+
+@pytest.mark.asyncio
+async def test_batcher_propagates_model_errors():
+    model = MagicMock()
+    model.predict_proba.side_effect = RuntimeError("model down")
+    batcher = PredictionBatcher(max_batch_size=4, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError, match="model down"):
+            await batcher.submit(model, _features(1))
+    finally:
+        await batcher.stop()
@@ -1,12 +1,17 @@
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
 from storages.cache import (
+    LocalCache,
     PredictionCache,
     cache_key_moderation_result,
     cache_key_predict,
     cache_key_simple_predict,
 )
+from services.scorer import SklearnScorer
+from storages.cache_codec import decode_value
 
 
 @pytest.fixture
@@ -15,16 +20,20 @@ def mock_redis():
     r.get = AsyncMock(return_value=None)
     r.set = AsyncMock(return_value=True)
     r.delete = AsyncMock(return_value=1)
+    r.mget = AsyncMock(return_value=[])
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    r.pipeline = MagicMock(return_value=pipe)
     return r
 
 
 def test_cache_key_predict():
-    key = cache_key_predict(1, True, 2, 100, 5, 3)
-    assert key == "predict:1:1:2:100:5:3"
+    key = cache_key_predict("v1", 1, True, 2, 100, 5, 3)
+    assert key == "predict:v1:1:1:2:100:5:3"
 
 
 def test_cache_key_simple_predict():
-    assert cache_key_simple_predict(42) == "simple_predict:42"
+    assert cache_key_simple_predict("v1", 42) == "simple_predict:v1:42"
 
 
 def test_cache_key_moderation_result():
@@ -56,7 +65,7 @@ async def test_cache_set_calls_redis_with_ttl(mock_redis):
     mock_redis.set.assert_called_once()
     args, kwargs = mock_redis.set.call_args
     assert args[0] == "key1"
-    assert "is_violation" in args[1]
+    assert decode_value(args[1]) == {"is_violation": False, "probability": 0.1}
     assert kwargs.get("ex") == 3600
 
 
@@ -81,6 +90,207 @@ async def test_cache_delete_many_empty(mock_redis):
     mock_redis.delete.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_cache_get_many(mock_redis):
+    cache = PredictionCache(mock_redis)
+    mock_redis.mget.return_value = ['{"is_violation": true, "probability": 0.9}', None]
+    result = await cache.get_many(["a", "b"])
+    assert result == [{"is_violation": True, "probability": 0.9}, None]
+    mock_redis.mget.assert_called_once_with(["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_cache_set_many_uses_pipeline(mock_redis):
+    cache = PredictionCache(mock_redis)
+    await cache.set_many({"a": {"probability": 0.1}, "b": {"probability": 0.2}})
+    pipe = mock_redis.pipeline.return_value
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    assert pipe.set.call_count == 2
+    assert pipe.set.call_args_list[0].kwargs == {"ex": 3600}
+    pipe.execute.assert_awaited_once()
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(max_size=2, ttl=30)
+    local.set("a", {"v": 1})
+    local.set("b", {"v": 2})
+    local.get("a")
+    local.set("c", {"v": 3})
+    assert local.get("a") == {"v": 1}
+    assert local.get("b") is None
+    assert len(local) == 2
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("storages.cache.time.monotonic", lambda: now[0])
+    local = LocalCache(max_size=10, ttl=30)
+    local.set("a", {"v": 1})
+    local.set("b", {"v": 2}, ttl=5)
+    now[0] += 10
+    assert local.get("a") == {"v": 1}
+    assert local.get("b") is None
+    now[0] += 30
+    assert local.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_l1_hit_skips_redis(mock_redis):
+    cache = PredictionCache(mock_redis, LocalCache())
+    mock_redis.get.return_value = '{"is_violation": true, "probability": 0.9}'
+    assert await cache.get("key1") == {"is_violation": True, "probability": 0.9}
+    assert await cache.get("key1") == {"is_violation": True, "probability": 0.9}
+    mock_redis.get.assert_called_once_with("key1")
+
+
+@pytest.mark.asyncio
+async def test_cache_get_many_reads_only_l1_misses_from_redis(mock_redis):
+    cache = PredictionCache(mock_redis, LocalCache())
+    await cache.set("a", {"probability": 0.1})
+    mock_redis.mget.return_value = [None]
+    result = await cache.get_many(["a", "b"])
+    assert result == [{"probability": 0.1}, None]
+    mock_redis.mget.assert_called_once_with(["b"])
+
+
+@pytest.mark.asyncio
+async def test_cache_delete_many_publishes_invalidation(mock_redis):
+    mock_redis.publish = AsyncMock(return_value=1)
+    local = LocalCache()
+    cache = PredictionCache(mock_redis, local, "invalidate")
+    await cache.set("a", {"probability": 0.1})
+    await cache.delete_many(["a"])
+    assert local.get("a") is None
+    mock_redis.delete.assert_called_once_with("a")
+    mock_redis.publish.assert_called_once_with("invalidate", '["a"]')
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation_listener_drops_local_keys(mock_redis):
+    local = LocalCache()
+    local.set("a", {"probability": 0.1})
+    local.set("b", {"probability": 0.2})
+
+    async def listen():
+        local.set("a", {"probability": 0.1})
+        yield {"type": "subscribe", "data": 1}
+        yield {"type": "message", "data": '["a"]'}
+        await asyncio.Event().wait()
+
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.listen = listen
+    mock_redis.pubsub = MagicMock(return_value=pubsub)
+
+    cache = PredictionCache(mock_redis, local, "invalidate")
+    await cache.start_invalidation_listener()
+    for _ in range(5):
+        await asyncio.sleep(0)
+    await cache.stop_invalidation_listener()
+    pubsub.subscribe.assert_awaited_once_with("invalidate")
+    pubsub.aclose.assert_awaited_once()
+    assert len(local) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_get_entry_json_passes_through_encoded_payload(mock_redis):
+    cache = PredictionCache(mock_redis, LocalCache())
+    await cache.set("key1", {"is_violation": True, "probability": 0.25})
+    assert await cache.get_entry_json("key1") == (b'{"is_violation":true,"probability":0.25}', False)
+    mock_redis.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cache_set_with_tags_indexes_key(mock_redis):
+    cache = PredictionCache(mock_redis)
+    await cache.set("moderation_result:1", {"status": "completed"}, tags=["tag:item:5"])
+    pipe = mock_redis.pipeline.return_value
+    pipe.sadd.assert_called_once_with("tag:item:5", "moderation_result:1")
+    pipe.expire.assert_called_once_with("tag:item:5", 3600)
+    pipe.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidate_tags_runs_one_script_and_evicts_local(mock_redis):
+    mock_redis.eval = AsyncMock(return_value=[b"simple_predict:5", b"moderation_result:1"])
+    local = LocalCache()
+    local.set("moderation_result:1", b"payload")
+    cache = PredictionCache(mock_redis, local, "invalidate")
+    deleted = await cache.invalidate_tags(["tag:item:5"], ["simple_predict:5"])
+    assert deleted == ["simple_predict:5", "moderation_result:1"]
+    assert mock_redis.eval.await_args.args[1:] == (1, "tag:item:5", "invalidate", "simple_predict:5")
+    assert local.get("moderation_result:1") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_set_adds_stale_window_to_expiry(mock_redis):
+    cache = PredictionCache(mock_redis, stale_ttl=600)
+    await cache.set("key1", {"probability": 0.1})
+    assert mock_redis.set.call_args.kwargs["ex"] == 4200
+
+
+@pytest.mark.asyncio
+async def test_cache_get_entry_fresh_and_stale(mock_redis):
+    cache = PredictionCache(mock_redis, stale_ttl=600)
+    pipe = mock_redis.pipeline.return_value
+    pipe.execute.return_value = ['{"probability": 0.1}', 1_000_000]
+    assert await cache.get_entry("key1") == ({"probability": 0.1}, False)
+    pipe.execute.return_value = ['{"probability": 0.1}', 300_000]
+    assert await cache.get_entry("key1") == ({"probability": 0.1}, True)
+    pipe.execute.return_value = [None, -2]
+    assert await cache.get_entry("key1") == (None, False)
+
+
+@pytest.mark.asyncio
+async def test_cache_get_entry_without_stale_window_uses_get(mock_redis):
+    cache = PredictionCache(mock_redis, stale_ttl=0, early_expiry=0)
+    mock_redis.get.return_value = '{"probability": 0.1}'
+    assert await cache.get_entry("key1") == ({"probability": 0.1}, False)
+    mock_redis.pipeline.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_cache_early_expiry_is_probabilistic(mock_redis, monkeypatch):
+    cache = PredictionCache(mock_redis, stale_ttl=0, early_expiry=60)
+    pipe = mock_redis.pipeline.return_value
+    pipe.execute.return_value = ['{"probability": 0.1}', 30_000]
+    monkeypatch.setattr("storages.cache.random.random", lambda: 0.0)
+    assert (await cache.get_entry("key1"))[1] is False
+    monkeypatch.setattr("storages.cache.random.random", lambda: 0.9)
+    assert (await cache.get_entry("key1"))[1] is True
+
+
+@pytest.mark.asyncio
+async def test_cache_refresh_runs_once_per_key(mock_redis):
+    cache = PredictionCache(mock_redis)
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+
+    cache.refresh("key1", compute)
+    cache.refresh("key1", compute)
+    await asyncio.sleep(0)
+    release.set()
+    await cache.close()
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_simple_predict_serves_stale_value_and_refreshes(monkeypatch):
+    from services.simple_predict_service import simple_predict
+
+    cache = MagicMock()
+    cache.get_entry_json = AsyncMock(return_value=(b'{"is_violation":false,"probability":0.1}', True))
+    result = await simple_predict(1, SklearnScorer(MagicMock(), "v2"), MagicMock(), cache)
+    assert result == b'{"is_violation":false,"probability":0.1}'
+    assert cache.refresh.call_args.args[0] == "simple_predict:v2:1"
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_cache_integration_set_get():
@@ -123,3 +333,40 @@ async def test_cache_integration_get_miss():
         pytest.skip("Redis not available")
     finally:
         await client.aclose()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_cache_integration_invalidate_tags():
+    import os
+    import redis.asyncio as redis
+    from redis.exceptions import ConnectionError as RedisConnectionError
+    from storages.cache import REDIS_URL
+
+    url = os.environ.get("REDIS_URL", REDIS_URL)
+    client = redis.from_url(url)
+    try:
+        cache = PredictionCache(client)
+        await cache.set("test:tagged:1", {"status": "completed"}, ttl=10, tags=["test:tag:1"])
+        await cache.set("test:tagged:2", {"status": "failed"}, ttl=10, tags=["test:tag:1"])
+        deleted = await cache.invalidate_tags(["test:tag:1"], ["test:untagged"])
+        assert set(deleted) == {"test:tagged:1", "test:tagged:2", "test:untagged"}
+        assert await client.exists("test:tagged:1", "test:tagged:2", "test:tag:1") == 0
+    except RedisConnectionError:
+        pytest.skip("Redis not available")
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_simple_predict_key_changes_with_model_version():
+    from services.simple_predict_service import simple_predict
+
+    cache = MagicMock()
+    cache.get_entry_json = AsyncMock(return_value=(b'{"is_violation":false,"probability":0.1}', False))
+    await simple_predict(1, SklearnScorer(MagicMock(), "v1"), MagicMock(), cache)
+    await simple_predict(1, SklearnScorer(MagicMock(), "v2"), MagicMock(), cache)
+    assert [c.args[0] for c in cache.get_entry_json.await_args_list] == [
+        "simple_predict:v1:1",
+        "simple_predict:v2:1",
+    ]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from storages.cache_codec import (
+    JsonCodec,
+    PredictionStructCodec,
+    decode_value,
+    encode_value,
+    get_codec,
+    payload_to_json,
+)
+
+
+def _response_bytes(value: dict) -> bytes:
+    from fastapi.responses import JSONResponse
+
+    return JSONResponse(value).body
+
+
+@pytest.mark.parametrize("value", [
+    {"is_violation": True, "probability": 0.9123456789},
+    {"is_violation": False, "probability": 1e-07},
+])
+def test_struct_codec_round_trip_and_json_passthrough(value):
+    payload = encode_value(value, PredictionStructCodec())
+    assert len(payload) == 10
+    assert decode_value(payload) == value
+    assert payload_to_json(payload) == _response_bytes(value)
+
+
+def test_struct_codec_falls_back_to_json_for_other_shapes():
+    value = {"task_id": 1, "status": "failed", "is_violation": None, "probability": None, "error_message": "нет"}
+    payload = encode_value(value, PredictionStructCodec())
+    assert payload[0] == JsonCodec.codec_id
+    assert decode_value(payload) == value
+    assert payload_to_json(payload) == _response_bytes(value)
+
+
+def test_legacy_json_entries_are_readable():
+    legacy = json.dumps({"is_violation": True, "probability": 0.5})
+    assert decode_value(legacy) == {"is_violation": True, "probability": 0.5}
+    assert decode_value(legacy.encode()) == {"is_violation": True, "probability": 0.5}
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("pickle")
+    with pytest.raises(ValueError):
+        decode_value(b"\x7f123")
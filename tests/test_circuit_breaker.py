@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from clients.kafka import KAFKA_FAILURES, KafkaProducer
+from db.connection import POSTGRES_FAILURES, GuardedPool
+from storages.cache import REDIS_FAILURES, PredictionCache
+
+
+def _failing(exc):
+    return AsyncMock(side_effect=exc)
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_threshold_and_rejects():
+    breaker = CircuitBreaker("test", (OSError,), failure_threshold=2, reset_timeout=60)
+    fn = _failing(OSError("down"))
+    for _ in range(2):
+        with pytest.raises(OSError):
+            await breaker.call(fn)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(fn)
+    assert fn.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_breaker_ignores_non_dependency_errors():
+    breaker = CircuitBreaker("test", (OSError,), failure_threshold=1)
+    with pytest.raises(ValueError):
+        await breaker.call(_failing(ValueError("bad input")))
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_half_open_probe(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("circuit_breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("test", (OSError,), failure_threshold=1, reset_timeout=5)
+    with pytest.raises(OSError):
+        await breaker.call(_failing(OSError()))
+    now[0] += 5
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    now[0] += 5
+    assert await breaker.call(AsyncMock(return_value=1)) == 1
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cache_with_open_breaker_skips_redis():
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=ConnectionRefusedError())
+    cache = PredictionCache(client, breaker=CircuitBreaker("redis-test", REDIS_FAILURES, failure_threshold=1))
+    with pytest.raises(ConnectionRefusedError):
+        await cache.get("key1")
+    with pytest.raises(CircuitOpenError):
+        await cache.get("key1")
+    assert client.get.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_guarded_pool_rejects_when_open():
+    pool = MagicMock()
+    pool.acquire = AsyncMock(side_effect=ConnectionRefusedError())
+    guarded = GuardedPool(pool, CircuitBreaker("postgres-test", POSTGRES_FAILURES, failure_threshold=1))
+    with pytest.raises(ConnectionRefusedError):
+        await guarded.fetchrow("SELECT 1")
+    with pytest.raises(CircuitOpenError):
+        async with guarded.acquire():
+            pass
+    assert pool.acquire.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_kafka_producer_rejects_when_open():
+    breaker = CircuitBreaker("kafka-test", KAFKA_FAILURES, failure_threshold=1)
+    breaker.record_failure()
+    producer = KafkaProducer("localhost:1", breaker)
+    with pytest.raises(CircuitOpenError):
+        await producer.send_moderation_request(1, 2)
@@ -29,7 +29,7 @@ def mock_pool():
 @pytest.fixture
 def mock_cache():
     c = MagicMock()
-    c.delete_many = AsyncMock()
+    c.invalidate_tags = AsyncMock(return_value=[])
     return c
 
 
@@ -38,11 +38,10 @@ async def test_close_ad_not_found(mock_pool, mock_cache):
     from unittest.mock import patch
     import services.close_ad_service as close_svc
 
-    with patch.object(close_svc.ModerationResultsRepository, "get_task_ids_by_item_id", new_callable=AsyncMock, return_value=[]):
-        with patch.object(close_svc.ModerationResultsRepository, "delete_by_item_id", new_callable=AsyncMock):
-            with patch.object(close_svc.AdsRepository, "close", new_callable=AsyncMock, return_value=False):
-                with pytest.raises(AdNotFoundError):
-                    await close_ad(999, mock_pool, mock_cache)
+    with patch.object(close_svc.AdsRepository, "close_with_results", new_callable=AsyncMock, return_value=None):
+        with pytest.raises(AdNotFoundError):
+            await close_ad(999, mock_pool, mock_cache)
+    mock_cache.invalidate_tags.assert_not_called()
 
 
 def test_close_validation(client, monkeypatch):
@@ -58,15 +57,40 @@ async def test_close_ad_success_deletes_cache(mock_pool, mock_cache):
     from unittest.mock import patch
     import services.close_ad_service as close_svc
 
-    with patch.object(close_svc.ModerationResultsRepository, "get_task_ids_by_item_id", new_callable=AsyncMock, return_value=[1, 2]):
-        with patch.object(close_svc.ModerationResultsRepository, "delete_by_item_id", new_callable=AsyncMock):
-            with patch.object(close_svc.AdsRepository, "close", new_callable=AsyncMock, return_value=True):
-                await close_ad(5, mock_pool, mock_cache)
-    mock_cache.delete_many.assert_called_once()
-    call_args = mock_cache.delete_many.call_args[0][0]
-    assert "simple_predict:5" in call_args
-    assert "moderation_result:1" in call_args
-    assert "moderation_result:2" in call_args
+    with patch.object(close_svc.AdsRepository, "close_with_results", new_callable=AsyncMock, return_value=[7, 8]) as close:
+        assert await close_ad(5, mock_pool, mock_cache) == [7, 8]
+    close.assert_awaited_once_with(5)
+    mock_pool.acquire.assert_not_called()
+    mock_cache.invalidate_tags.assert_called_once_with(
+        ["tag:item:5"], keys=["moderation_result:7", "moderation_result:8"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_close_ads_invalidates_closed_items_in_chunks(mock_pool, mock_cache, monkeypatch):
+    from unittest.mock import patch
+    import services.close_ad_service as close_svc
+
+    monkeypatch.setattr(close_svc, "CLOSE_INVALIDATION_CHUNK_SIZE", 2)
+    with patch.object(close_svc.AdsRepository, "close_many_with_results", new_callable=AsyncMock, return_value={1: [10, 11], 2: [], 3: [30]}) as close_many:
+        assert await close_svc.close_ads([1, 2, 2, 3, 4], mock_pool, mock_cache) == [1, 2, 3]
+    close_many.assert_awaited_once_with([1, 2, 3, 4])
+    assert [(c.args, c.kwargs) for c in mock_cache.invalidate_tags.await_args_list] == [
+        ((["tag:item:1", "tag:item:2"],), {"keys": ["moderation_result:10", "moderation_result:11"]}),
+        ((["tag:item:3"],), {"keys": ["moderation_result:30"]}),
+    ]
+
+
+def test_close_batch_endpoint(client, monkeypatch):
+    from unittest.mock import patch
+
+    monkeypatch.setattr(main.app.state, "db_pool", MagicMock())
+    with patch("routes.predict.close_ads", new_callable=AsyncMock, return_value=[3, 1]):
+        response = client.post("/close/batch", json={"item_ids": [1, 2, 3, 2]})
+    assert response.status_code == 200
+    assert response.json() == {"closed": [3, 1], "not_found": [2]}
+    assert client.post("/close/batch", json={"item_ids": []}).status_code == 422
+    assert client.post("/close/batch", json={"item_ids": [0]}).status_code == 422
 
 
 @pytest.mark.integration
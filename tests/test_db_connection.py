@@ -0,0 +1,167 @@
+import asyncio
+
+import asyncpg
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from db import connection
+from db.connection import (
+    POSTGRES_FAILURES,
+    DatabaseTimeoutError,
+    GuardedPool,
+    create_pool,
+    prepare_hot_queries,
+)
+from metrics import DB_POOL_ACQUIRE_SECONDS, DB_POOL_IDLE_CONNECTIONS, DB_POOL_SIZE
+from repositories.ads import GET_OPEN_AD_QUERY
+from repositories.hot_queries import HOT_QUERIES
+
+
+def _sample(metric, sample_name: str, pool: str) -> float:
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name == sample_name and sample.labels.get("pool") == pool:
+                return sample.value
+    return 0.0
+
+
+def _pool_with_conn(conn):
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value=conn)
+    pool.release = AsyncMock()
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_guarded_pool_runs_query_on_acquired_connection():
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(return_value={"id": 1})
+    pool = _pool_with_conn(conn)
+    guarded = GuardedPool(pool, CircuitBreaker("postgres-test", POSTGRES_FAILURES), "test", acquire_timeout=2.0)
+
+    assert await guarded.fetchrow("SELECT $1", 1) == {"id": 1}
+    pool.acquire.assert_awaited_once_with(timeout=2.0)
+    conn.fetchrow.assert_awaited_once_with("SELECT $1", 1)
+    pool.release.assert_awaited_once_with(conn)
+
+
+@pytest.mark.asyncio
+async def test_guarded_pool_releases_connection_on_query_error():
+    conn = MagicMock()
+    conn.execute = AsyncMock(side_effect=asyncpg.PostgresError("boom"))
+    pool = _pool_with_conn(conn)
+    guarded = GuardedPool(pool, CircuitBreaker("postgres-test", POSTGRES_FAILURES))
+
+    with pytest.raises(asyncpg.PostgresError):
+        await guarded.execute("UPDATE ads SET is_closed = TRUE")
+    pool.release.assert_awaited_once_with(conn)
+
+
+@pytest.mark.asyncio
+async def test_guarded_pool_observes_acquire_wait():
+    pool = _pool_with_conn(MagicMock())
+    guarded = GuardedPool(pool, CircuitBreaker("postgres-test", POSTGRES_FAILURES), "acquire-test")
+    before = _sample(DB_POOL_ACQUIRE_SECONDS, "db_pool_acquire_seconds_count", "acquire-test")
+
+    async with guarded.acquire():
+        pass
+
+    assert _sample(DB_POOL_ACQUIRE_SECONDS, "db_pool_acquire_seconds_count", "acquire-test") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_prepare_hot_queries_uses_statement_cache():
+    conn = MagicMock()
+    conn._prepare = AsyncMock()
+    await prepare_hot_queries(conn, HOT_QUERIES)
+    assert conn._prepare.await_count == len(HOT_QUERIES)
+    conn._prepare.assert_any_await(GET_OPEN_AD_QUERY, use_cache=True)
+
+
+@pytest.mark.asyncio
+async def test_prepare_hot_queries_tolerates_missing_tables():
+    conn = MagicMock()
+    conn._prepare = AsyncMock(side_effect=asyncpg.UndefinedTableError("relation does not exist"))
+    await prepare_hot_queries(conn, HOT_QUERIES)
+    assert conn._prepare.await_count == len(HOT_QUERIES)
+
+
+@pytest.mark.asyncio
+async def test_prepare_hot_queries_skipped_without_statement_cache():
+    conn = MagicMock()
+    conn._prepare = AsyncMock()
+    with patch.object(connection, "DB_STATEMENT_CACHE_SIZE", 0):
+        await prepare_hot_queries(conn, HOT_QUERIES)
+    conn._prepare.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_pool_applies_settings_and_registers_gauges():
+    raw_pool = MagicMock()
+    raw_pool.get_size.return_value = 4
+    raw_pool.get_idle_size.return_value = 3
+    with patch("db.connection.asyncpg.create_pool", AsyncMock(return_value=raw_pool)) as create, \
+            patch.object(connection, "DB_POOL_MAX_SIZE", 20), \
+            patch.object(connection, "DB_STATEMENT_CACHE_SIZE", 50):
+        pool = await connection._create_guarded_pool(
+            "postgresql://test", "gauge-test", MagicMock(), hot_queries=HOT_QUERIES
+        )
+
+    kwargs = create.await_args.kwargs
+    assert kwargs["max_size"] == 20
+    assert kwargs["statement_cache_size"] == 50
+    assert kwargs["init"].func is prepare_hot_queries
+    assert kwargs["init"].keywords == {"queries": HOT_QUERIES}
+    assert create.await_args.args == ("postgresql://test",)
+    assert pool.name == "gauge-test"
+    assert _sample(DB_POOL_SIZE, "db_pool_size", "gauge-test") == 4
+    assert _sample(DB_POOL_IDLE_CONNECTIONS, "db_pool_idle_connections", "gauge-test") == 3
+
+
+@pytest.mark.asyncio
+async def test_create_pool_without_replica_returns_primary():
+    with patch("db.connection.asyncpg.create_pool", AsyncMock(return_value=MagicMock())) as create:
+        pool = await create_pool("postgresql://primary", replica_dsn="")
+    assert isinstance(pool, GuardedPool)
+    assert pool.name == "primary"
+    create.assert_awaited_once()
+    assert create.await_args.kwargs["init"] is None
+
+
+@pytest.mark.asyncio
+async def test_create_pool_falls_back_to_primary_when_replica_is_down():
+    primary = MagicMock()
+    with patch(
+        "db.connection.asyncpg.create_pool",
+        AsyncMock(side_effect=[primary, ConnectionRefusedError()]),
+    ):
+        pool = await create_pool("postgresql://primary", replica_dsn="postgresql://replica")
+    assert isinstance(pool, GuardedPool)
+    assert pool._pool is primary
+
+
+@pytest.mark.asyncio
+async def test_guarded_pool_timeouts_do_not_open_the_circuit():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=asyncio.TimeoutError())
+    pool = _pool_with_conn(conn)
+    breaker = CircuitBreaker("postgres-test", POSTGRES_FAILURES, failure_threshold=1)
+    guarded = GuardedPool(pool, breaker, "timeout-test")
+
+    with pytest.raises(DatabaseTimeoutError):
+        await guarded.fetch("SELECT pg_sleep(60)")
+    pool.release.assert_awaited_once_with(conn)
+
+    pool.acquire = AsyncMock(side_effect=asyncio.TimeoutError())
+    with pytest.raises(DatabaseTimeoutError):
+        await guarded.fetchrow("SELECT 1")
+    with pytest.raises(DatabaseTimeoutError):
+        async with guarded.acquire():
+            pass
+    assert breaker.state == CLOSED
+
+    pool.acquire = AsyncMock(side_effect=ConnectionRefusedError())
+    with pytest.raises(ConnectionRefusedError):
+        await guarded.fetchrow("SELECT 1")
+    assert breaker.state == OPEN
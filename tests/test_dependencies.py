@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from dependencies import READY, RECONNECTING, DependencyManager
+
+
+@pytest.mark.asyncio
+async def test_dependencies_connect_concurrently():
+    attached = {}
+
+    async def slow_connect():
+        await asyncio.sleep(0.1)
+        return object()
+
+    async def attach(name, resource):
+        attached[name] = resource
+
+    manager = DependencyManager(timeout=1)
+    for name in ("postgres", "redis", "kafka"):
+        manager.add(name, slow_connect, lambda r, name=name: attach(name, r))
+    start = time.perf_counter()
+    await manager.start()
+    assert time.perf_counter() - start < 0.25
+    assert manager.ready
+    assert set(attached) == {"postgres", "redis", "kafka"}
+    assert manager.status()["redis"]["connect_seconds"] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_failed_dependency_reconnects_in_background():
+    attempts = 0
+    attached = []
+
+    async def flaky_connect():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionRefusedError("refused")
+        return "pool"
+
+    async def hanging_connect():
+        await asyncio.Event().wait()
+
+    async def attach(resource):
+        attached.append(resource)
+
+    manager = DependencyManager(timeout=0.05, backoff_initial=0.01, backoff_max=0.02)
+    manager.add("postgres", flaky_connect, attach)
+    manager.add("kafka", hanging_connect, attach)
+    await manager.start()
+    assert not manager.ready
+    assert manager.status()["postgres"]["state"] == RECONNECTING
+    assert manager.status()["postgres"]["last_error"] == "refused"
+
+    for _ in range(50):
+        if attached:
+            break
+        await asyncio.sleep(0.01)
+    await manager.stop()
+    assert attached == ["pool"]
+    assert manager.status()["postgres"]["state"] == READY
+    assert manager.status()["kafka"]["state"] == RECONNECTING
+    assert manager.status()["kafka"]["last_error"] == "TimeoutError"
+
+
+def test_readiness_reports_dependencies(client):
+    response = client.get("/ready")
+    data = response.json()
+    assert response.status_code == (200 if data["ready"] else 503)
+    assert set(data["dependencies"]) == {"postgres", "redis", "kafka"}
+    for dependency in data["dependencies"].values():
+        assert {"state", "attempts", "connect_seconds", "last_error"} <= set(dependency)
+
+
+def test_async_predict_without_kafka_returns_503(client, monkeypatch):
+    import main
+    from unittest.mock import MagicMock
+
+    monkeypatch.setattr(main.app.state, "db_pool", MagicMock())
+    monkeypatch.setattr(main.app.state, "kafka_producer", None)
+    response = client.post("/async_predict", json={"item_id": 1})
+    assert response.status_code == 503
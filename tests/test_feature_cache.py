@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from repositories.ads import AdsRepository
+from repositories.moderation_results import ModerationResultsRepository
+from services.feature_cache import feature_cache_key
+from services.scorer import SklearnScorer
+from workers.moderation_worker import process_message
+
+
+@pytest.fixture
+def scorer():
+    return SklearnScorer(MagicMock(), "v1")
+
+
+def test_feature_cache_key_ignores_seller_and_item(scorer):
+    key = feature_cache_key(scorer, True, 3, 120, 5, enabled=True)
+    assert key == "features:v1:1:3:120:5"
+    assert feature_cache_key(SklearnScorer(MagicMock(), "v2"), True, 3, 120, 5, enabled=True) != key
+
+
+def test_feature_cache_key_disabled_or_unversioned(scorer):
+    assert feature_cache_key(scorer, True, 3, 120, 5, enabled=False) is None
+    assert feature_cache_key(MagicMock(), True, 3, 120, 5, enabled=True) is None
+
+
+@pytest.mark.asyncio
+async def test_worker_uses_feature_cache_hit(scorer, monkeypatch):
+    monkeypatch.setattr(
+        "workers.moderation_worker.feature_cache_key",
+        lambda *args: feature_cache_key(*args, enabled=True),
+    )
+    ad_row = {
+        "id": 1,
+        "seller_id": 10,
+        "is_verified_seller": True,
+        "description_length": 3,
+        "category": 1,
+        "images_qty": 0,
+    }
+    cache = MagicMock()
+    cache.get = AsyncMock(return_value={"is_violation": True, "probability": 0.7})
+    cache.set = AsyncMock()
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=ad_row):
+        with patch.object(
+            ModerationResultsRepository, "update_completed", new_callable=AsyncMock
+        ) as update_completed:
+            with patch("workers.moderation_worker.run_prediction_async") as run_prediction:
+                msg = {"item_id": 1, "task_id": 100}
+                await process_message(msg, scorer, MagicMock(), AsyncMock(), cache=cache)
+    cache.get.assert_awaited_once_with("features:v1:1:0:3:1")
+    run_prediction.assert_not_called()
+    update_completed.assert_called_once_with(100, True, 0.7)
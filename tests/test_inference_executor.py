@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from model import train_model
+from services.inference_executor import (
+    InferenceExecutor,
+    ProcessInferenceExecutor,
+    ThreadInferenceExecutor,
+    create_executor,
+)
+from services.predict_service import predict_batch
+from services.scorer import build_scorer
+
+
+def _thread_name(model):
+    return threading.current_thread().name
+
+
+def _model_id(model):
+    return model.model.coef_.tolist()
+
+
+def _pid(model):
+    return os.getpid()
+
+
+def _sleep_then_model_id(model, seconds):
+    time.sleep(seconds)
+    return _model_id(model)
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return build_scorer(train_model())
+
+
+def test_create_executor_kinds():
+    assert type(create_executor("inline")) is InferenceExecutor
+    thread = create_executor("thread", 2)
+    assert isinstance(thread, ThreadInferenceExecutor)
+    thread.shutdown()
+    assert isinstance(create_executor("process", 1), ProcessInferenceExecutor)
+    with pytest.raises(ValueError):
+        create_executor("gpu")
+
+
+@pytest.mark.asyncio
+async def test_inline_executor_runs_on_event_loop_thread(scorer):
+    executor = InferenceExecutor()
+    name = await executor.run(_thread_name, scorer)
+    assert name == threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_off_event_loop(scorer):
+    executor = ThreadInferenceExecutor(pool_size=2)
+    try:
+        names = await asyncio.gather(*(executor.run(_thread_name, scorer) for _ in range(4)))
+        X = np.random.default_rng(0).random((8, 4))
+        labels, probabilities = await executor.run(predict_batch, scorer, X)
+    finally:
+        executor.shutdown()
+    assert all(name.startswith("inference") for name in names)
+    np.testing.assert_allclose(probabilities, scorer.model.predict_proba(X)[:, 1])
+
+
+@pytest.mark.asyncio
+async def test_process_executor_uses_preloaded_model(scorer):
+    executor = ProcessInferenceExecutor(pool_size=1)
+    await executor.set_model(scorer)
+    try:
+        X = np.random.default_rng(1).random((8, 4))
+        labels, probabilities = await executor.run(predict_batch, None, X)
+        coef = await executor.run(_model_id, None)
+    finally:
+        executor.shutdown()
+    np.testing.assert_array_equal(labels.astype(int), scorer.model.predict(X))
+    assert coef == scorer.model.coef_.tolist()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_swap_warms_new_pool_and_keeps_old_model(scorer):
+    other = build_scorer(LogisticRegression().fit(np.eye(4), [0, 1, 0, 1]))
+    executor = ProcessInferenceExecutor(pool_size=2)
+    try:
+        await executor.set_model(scorer)
+        old_pids = set(await asyncio.gather(*(executor.run(_pid, scorer) for _ in range(4))))
+
+        await executor.set_model(other, np.random.default_rng(2).random((4, 4)))
+        new_pool = executor._pool
+        # Every worker of the new pool was started and ran the model before the swap
+        assert len(new_pool._processes) == 2
+        assert executor._retired == {}
+
+        # A call that still holds the old scorer is scored by the old scorer
+        assert await executor.run(_model_id, scorer) == scorer.model.coef_.tolist()
+        assert await executor.run(_model_id, other) == other.model.coef_.tolist()
+        assert await executor.run(_model_id, None) == other.model.coef_.tolist()
+        assert not set(await asyncio.gather(*(executor.run(_pid, other) for _ in range(4)))) & old_pids
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_keeps_retired_pool_until_in_flight_calls_finish(scorer):
+    other = build_scorer(LogisticRegression().fit(np.eye(4), [0, 1, 0, 1]))
+    executor = ProcessInferenceExecutor(pool_size=1)
+    try:
+        await executor.set_model(scorer)
+        in_flight = asyncio.ensure_future(executor.run(_sleep_then_model_id, scorer, 0.3))
+        await asyncio.sleep(0.05)
+
+        await executor.set_model(other)
+        assert id(scorer) in executor._retired
+        assert await in_flight == scorer.model.coef_.tolist()
+        assert executor._retired == {}
+    finally:
+        executor.shutdown()
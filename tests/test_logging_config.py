@@ -0,0 +1,81 @@
+import json
+import logging
+import queue
+from unittest.mock import MagicMock
+
+from logging_config import (
+    ContextFilter,
+    DroppingQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    parse_sampling,
+    request_id_var,
+    task_id_var,
+)
+from services.predict_service import _LoggedFeatures
+
+
+def _record(name: str = "services.predict_service", level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, "Prediction: %s", ("ok",), None)
+
+
+def test_parse_sampling():
+    assert parse_sampling("") == {}
+    assert parse_sampling("services=0.1, workers.moderation_worker=0") == {
+        "services": 0.1,
+        "workers.moderation_worker": 0.0,
+    }
+
+
+def test_sampling_filter_uses_longest_logger_prefix_and_keeps_warnings():
+    sampling = SamplingFilter({"services": 0.0, "services.scorer": 1.0})
+    assert not sampling.filter(_record("services.predict_service"))
+    assert sampling.filter(_record("services.scorer"))
+    assert sampling.filter(_record("routes.predict"))
+    assert sampling.filter(_record("services.predict_service", logging.WARNING))
+
+
+def test_json_formatter_includes_context_ids():
+    request_token = request_id_var.set("req-1")
+    task_token = task_id_var.set(42)
+    try:
+        record = _record()
+        ContextFilter().filter(record)
+    finally:
+        request_id_var.reset(request_token)
+        task_id_var.reset(task_token)
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Prediction: ok"
+    assert entry["logger"] == "services.predict_service"
+    assert entry["request_id"] == "req-1"
+    assert entry["task_id"] == 42
+
+
+def test_queue_handler_drops_when_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.queue.qsize() == 1
+
+
+def test_request_id_header(client):
+    response = client.get("/", headers={"X-Request-ID": "abc"})
+    assert response.headers["X-Request-ID"] == "abc"
+    assert len(client.get("/").headers["X-Request-ID"]) == 32
+
+
+def test_sampled_out_prediction_log_never_renders_features():
+    features = MagicMock()
+    features.tolist.return_value = [[1.0, 0.2]]
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.addFilter(SamplingFilter({"services.predict_service": 0.0, "routes": 1.0}))
+
+    dropped = _record()
+    dropped.args = (_LoggedFeatures(features),)
+    handler.handle(dropped)
+    features.tolist.assert_not_called()
+
+    kept = _record("routes.predict")
+    kept.args = (_LoggedFeatures(features),)
+    handler.handle(kept)
+    assert handler.queue.get_nowait().getMessage() == "Prediction: [[1.0, 0.2]]"
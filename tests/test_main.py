@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import main
 from repositories.ads import AdsRepository
@@ -75,6 +75,27 @@ def test_predict_violation_false(client_with_mock_model_false):
     assert data["probability"] == 0.1
 
 
+def test_predict_returns_cached_bytes_as_is(client_with_mock_model):
+    from services.scorer import SklearnScorer
+
+    main.app.state.model = SklearnScorer(main.app.state.model, "v1")
+    original_cache = getattr(main.app.state, "cache", None)
+    cache = MagicMock()
+    cache.get_entry_json = AsyncMock(return_value=(b'{"is_violation":true,"probability":0.75}', False))
+    main.app.state.cache = cache
+    try:
+        response = client_with_mock_model.post("/predict", json=build_payload())
+    finally:
+        main.app.state.cache = original_cache
+    assert response.status_code == 200
+    assert response.content == b'{"is_violation":true,"probability":0.75}'
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["X-Model-Version"] == "v1"
+    # The cached bytes were looked up under v1's key, so the header is theirs
+    assert cache.get_entry_json.await_args.args[0].startswith("predict:v1:")
+    main.app.state.model.model.predict_proba.assert_not_called()
+
+
 def test_predict_validation_errors(client):
     payload = build_payload()
     payload.pop("seller_id")
@@ -185,7 +206,7 @@ def test_simple_predict_ad_not_found_mock(client, monkeypatch):
         return None
 
     monkeypatch.setattr(main.app.state, "db_pool", MockPool())
-    monkeypatch.setattr(AdsRepository, "get_by_id", lambda s, i: mock_get_by_id(i))
+    monkeypatch.setattr(AdsRepository, "get_features_by_id", lambda s, i: mock_get_by_id(i))
     response = client.post("/simple_predict", json={"item_id": 999999})
     assert response.status_code == 404
     assert response.json()["detail"] == "Ad not found"
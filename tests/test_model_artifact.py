@@ -0,0 +1,74 @@
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from model import get_artifact_version, load_artifact, save_artifact, train_model
+from services.model_reloader import ModelReloader
+from services.predict_service import FEATURE_NAMES, FEATURE_SCALES
+from services.scorer import LinearScorer, build_scorer
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+@pytest.fixture
+def artifact_path(tmp_path, model):
+    path = tmp_path / "model.bin"
+    save_artifact(model, str(path), FEATURE_NAMES, FEATURE_SCALES, {"source": "test"})
+    return path
+
+
+def test_artifact_roundtrip_matches_sklearn(model, artifact_path):
+    artifact = load_artifact(str(artifact_path))
+    assert artifact.metadata["source"] == "test"
+    assert artifact.metadata["feature_names"] == list(FEATURE_NAMES)
+    assert tuple(artifact.feature_scales) == FEATURE_SCALES
+    assert artifact.version == get_artifact_version(str(artifact_path))
+
+    scorer = build_scorer(artifact)
+    assert isinstance(scorer, LinearScorer)
+    X = np.random.default_rng(3).random((256, 4))
+    labels, probabilities = scorer.score(X)
+    np.testing.assert_array_equal(labels.astype(int), model.predict(X))
+    np.testing.assert_allclose(probabilities, model.predict_proba(X)[:, 1], rtol=1e-12)
+
+
+def test_artifact_is_memory_mapped_and_pickles_by_path(artifact_path):
+    artifact = load_artifact(str(artifact_path))
+    assert not artifact.coef_.flags.owndata
+    assert not artifact.coef_.flags.writeable
+    assert np.shares_memory(build_scorer(artifact).coef, artifact.coef_)
+
+    restored = pickle.loads(pickle.dumps(build_scorer(artifact, artifact.version)))
+    assert restored.model.path == str(artifact_path)
+    assert restored.version == artifact.version
+    np.testing.assert_array_equal(restored.coef, artifact.coef_.ravel())
+
+
+def test_artifact_rejects_other_files(tmp_path):
+    path = tmp_path / "model.bin"
+    path.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        load_artifact(str(path))
+
+
+@pytest.mark.asyncio
+async def test_reloader_loads_artifact(monkeypatch, artifact_path):
+    monkeypatch.setenv("MODEL_ARTIFACT_PATH", str(artifact_path))
+    state = SimpleNamespace(model=None)
+    await ModelReloader(state, warmup_rows=4).reload()
+    assert isinstance(state.model, LinearScorer)
+    assert state.model.version == get_artifact_version(str(artifact_path))
+
+
+@pytest.mark.asyncio
+async def test_reloader_rejects_mismatched_feature_scales(monkeypatch, tmp_path, model):
+    path = tmp_path / "model.bin"
+    save_artifact(model, str(path), FEATURE_NAMES, (1.0, 1.0, 1.0, 1.0))
+    monkeypatch.setenv("MODEL_ARTIFACT_PATH", str(path))
+    with pytest.raises(ValueError, match="feature scales"):
+        await ModelReloader(SimpleNamespace(model=None), warmup_rows=4).reload()
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import main
+from model import save_model, train_model
+from services.model_reloader import ModelReloader
+from services.predict_service import build_features, predict
+from services.scorer import LinearScorer
+
+
+def _other_model():
+    rng = np.random.default_rng(7)
+    X = rng.random((500, 4))
+    return LogisticRegression().fit(X, (X[:, 2] > 0.5).astype(int))
+
+
+@pytest.fixture
+def model_path(tmp_path, monkeypatch):
+    path = tmp_path / "model.pkl"
+    save_model(train_model(), str(path))
+    monkeypatch.setenv("MODEL_PATH", str(path))
+    monkeypatch.delenv("USE_MLFLOW", raising=False)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_reload_loads_and_swaps_on_new_version(model_path):
+    state = SimpleNamespace(model=None)
+    reloader = ModelReloader(state, warmup_rows=8)
+    assert await reloader.reload() is True
+    first = state.model
+    assert isinstance(first, LinearScorer)
+    assert first.version is not None
+
+    assert await reloader.reload() is False
+    assert state.model is first
+
+    save_model(_other_model(), str(model_path))
+    assert await reloader.reload() is True
+    assert state.model is not first
+    assert state.model.version != first.version
+
+    features = build_features(True, 3, 200, 5)
+    assert predict(first, features) == predict(first, features)
+
+
+@pytest.mark.asyncio
+async def test_reload_failure_keeps_active_model(model_path):
+    state = SimpleNamespace(model=None)
+    reloader = ModelReloader(state, warmup_rows=8)
+    await reloader.reload()
+    active = state.model
+
+    model_path.write_bytes(b"not a pickle")
+    with pytest.raises(Exception):
+        await reloader.reload()
+    assert state.model is active
+
+
+def test_admin_reload_endpoint_and_version_header(client, model_path):
+    response = client.post("/admin/model/reload", params={"force": "true"})
+    assert response.status_code == 200
+    version = response.json()["version"]
+    assert response.json()["reloaded"] is True
+    assert client.get("/admin/model").json() == {"version": version}
+
+    response = client.post(
+        "/predict",
+        json={
+            "seller_id": 1,
+            "is_verified_seller": False,
+            "item_id": 2,
+            "name": "Phone",
+            "description": "A good phone",
+            "category": 7,
+            "images_qty": 1,
+        },
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Model-Version"] == version
+    assert main.app.state.model.version == version
+
+
+@pytest.mark.asyncio
+async def test_reload_labels_model_with_version_of_loaded_bytes(model_path, monkeypatch):
+    # The file is replaced right after it is read: the old weights must keep
+    # the old version, so the watcher picks up the new file next time
+    import model as model_module
+
+    original_loads = model_module.pickle.loads
+
+    def loads_then_replace(data):
+        loaded = original_loads(data)
+        save_model(_other_model(), str(model_path))
+        return loaded
+
+    monkeypatch.setattr(model_module.pickle, "loads", loads_then_replace)
+    state = SimpleNamespace(model=None)
+    reloader = ModelReloader(state, warmup_rows=8)
+    await reloader.reload()
+    monkeypatch.setattr(model_module.pickle, "loads", original_loads)
+
+    assert state.model.version != model_module.get_model_version()
+    assert await reloader.reload() is True
+    assert state.model.version == model_module.get_model_version()
@@ -0,0 +1,93 @@
+import argparse
+from datetime import datetime
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+from workers.partition_maintenance import (
+    expired_partitions,
+    maintain,
+    missing_partitions,
+    month_start,
+    parse_bound,
+    retire_partitions,
+)
+
+NOW = datetime(2026, 10, 18, 12, 0)
+PARTITIONS = {
+    "moderation_results_legacy": (None, datetime(2026, 3, 1)),
+    "moderation_results_p202603": (datetime(2026, 3, 1), datetime(2026, 4, 1)),
+    "moderation_results_p202604": (datetime(2026, 4, 1), datetime(2026, 5, 1)),
+    "moderation_results_p202611": (datetime(2026, 11, 1), datetime(2026, 12, 1)),
+}
+
+
+def test_parse_bound():
+    assert parse_bound(
+        "FOR VALUES FROM ('2026-11-01 00:00:00') TO ('2026-12-01 00:00:00')"
+    ) == (datetime(2026, 11, 1), datetime(2026, 12, 1))
+    assert parse_bound("FOR VALUES FROM (MINVALUE) TO ('2026-03-01 00:00:00')") == (
+        None,
+        datetime(2026, 3, 1),
+    )
+    with pytest.raises(ValueError):
+        parse_bound("DEFAULT")
+
+
+def test_month_start_wraps_years():
+    assert month_start(datetime(2026, 12, 31), 1) == datetime(2027, 1, 1)
+    assert month_start(datetime(2026, 1, 15), -2) == datetime(2025, 11, 1)
+
+
+def test_missing_partitions_continue_after_last_bound():
+    planned = missing_partitions(PARTITIONS, NOW, months_ahead=3)
+    assert planned == [
+        ("moderation_results_p202612", datetime(2026, 12, 1), datetime(2027, 1, 1)),
+        ("moderation_results_p202701", datetime(2027, 1, 1), datetime(2027, 2, 1)),
+    ]
+    assert missing_partitions(PARTITIONS, NOW, months_ahead=1) == []
+
+
+def test_expired_partitions_respect_retention():
+    assert expired_partitions(PARTITIONS, NOW, retention_months=6) == [
+        "moderation_results_legacy",
+        "moderation_results_p202603",
+    ]
+    assert expired_partitions(PARTITIONS, NOW, retention_months=7) == ["moderation_results_legacy"]
+
+
+@pytest.mark.asyncio
+async def test_retire_archives_before_detaching(tmp_path):
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.copy_from_table = AsyncMock()
+    await retire_partitions(conn, ["moderation_results_p202603"], str(tmp_path), drop=True)
+    conn.copy_from_table.assert_awaited_once_with(
+        "moderation_results_p202603",
+        output=str(tmp_path / "moderation_results_p202603.csv"),
+        format="csv",
+        header=True,
+    )
+    assert conn.execute.await_args_list == [
+        call("ALTER TABLE moderation_results DETACH PARTITION moderation_results_p202603 CONCURRENTLY"),
+        call("DROP TABLE moderation_results_p202603"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_maintain_dry_run_changes_nothing():
+    conn = MagicMock()
+    conn.fetch = AsyncMock(
+        return_value=[
+            {"relname": "moderation_results_legacy", "bound": "FOR VALUES FROM (MINVALUE) TO ('2026-03-01 00:00:00')"}
+        ]
+    )
+    conn.execute = AsyncMock()
+    conn.close = AsyncMock()
+    args = argparse.Namespace(
+        dsn="postgresql://test", months_ahead=3, retention_months=6, archive_dir=None, drop=False, dry_run=True
+    )
+    with patch("workers.partition_maintenance.asyncpg.connect", AsyncMock(return_value=conn)):
+        await maintain(args, now=NOW)
+    conn.execute.assert_not_awaited()
+    conn.close.assert_awaited_once()
@@ -0,0 +1,188 @@
+import asyncio
+import os
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from circuit_breaker import CircuitBreaker
+from db.connection import POSTGRES_FAILURES, DatabaseTimeoutError, GuardedPool
+from db.replica import (
+    READ_YOUR_WRITES,
+    REPLICA,
+    REPLICA_LAG,
+    REPLICA_UNAVAILABLE,
+    ReplicaRouter,
+)
+from repositories.ads import AdsRepository
+from repositories.moderation_results import ModerationResultsRepository
+from repositories.users import UsersRepository
+from services.ads_service import get_open_ad
+
+
+def _pool(row=None):
+    pool = MagicMock()
+    pool.fetchrow = AsyncMock(return_value=row)
+    pool.fetch = AsyncMock(return_value=[])
+    pool.fetchval = AsyncMock(return_value=0.0)
+    pool.execute = AsyncMock()
+    pool.close = AsyncMock()
+    return pool
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("replica-test", POSTGRES_FAILURES, failure_threshold=1)
+
+
+@pytest.fixture
+def router(breaker):
+    r = ReplicaRouter(_pool({"id": 1, "source": "primary"}), _pool({"id": 1, "source": "replica"}), breaker)
+    r.lag = 0.0
+    return r
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(router):
+    row = await AdsRepository(router).get_by_id(1)
+    assert row["source"] == "replica"
+    router.primary.fetchrow.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_after_create(router):
+    router.primary.fetchrow.return_value = {"id": 7}
+    item_id = await AdsRepository(router).create(1, "Ad", "text", 1, 0)
+    assert router.route("ads", [item_id]) == READ_YOUR_WRITES
+    assert router.route("ads", [8]) == REPLICA
+    assert router.route("users", [item_id]) == REPLICA
+
+    router.primary.fetchrow.return_value = {"id": 7, "source": "primary"}
+    assert (await AdsRepository(router).get_by_id(item_id))["source"] == "primary"
+
+
+@pytest.mark.asyncio
+async def test_updates_pin_task_reads_to_primary(router):
+    repo = ModerationResultsRepository(router)
+    await repo.update_completed_many([(3, True, 0.9)])
+    assert router.route("moderation_results", [3]) == READ_YOUR_WRITES
+    router.read_your_writes = 0
+    assert router.route("moderation_results", [3]) == REPLICA
+
+
+@pytest.mark.asyncio
+async def test_lagging_or_unmeasured_replica_is_skipped(router):
+    router.replica.fetchval.return_value = 5.0
+    await router.check_lag()
+    assert router.route("users", [1]) == REPLICA_LAG
+    router.replica.fetchval.side_effect = ConnectionRefusedError()
+    assert await router.check_lag() is None
+    assert (await UsersRepository(router).get_by_id(1))["source"] == "primary"
+
+
+@pytest.mark.asyncio
+async def test_replica_error_falls_back_to_primary(router, breaker):
+    raw_replica = MagicMock()
+    raw_replica.acquire = AsyncMock(side_effect=ConnectionRefusedError())
+    router.replica = GuardedPool(raw_replica, breaker, "replica")
+    row = await ModerationResultsRepository(router).get_by_id(1)
+    assert row["source"] == "primary"
+    assert router.route("moderation_results", [1]) == REPLICA_UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_replica_miss_is_confirmed_on_primary(router):
+    # Written by another replica of the API or the worker, not yet replayed
+    router.replica.fetchrow.return_value = None
+    router.primary.fetchrow.return_value = {"id": 5, "source": "primary"}
+    row = await ModerationResultsRepository(router).get_by_id(5)
+    assert row["source"] == "primary"
+
+    router.primary.fetchrow.return_value = None
+    assert await AdsRepository(router).get_features_by_id(6) is None
+    router.primary.fetchrow.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replica_miss_does_not_cache_missing_ad(router):
+    cache = MagicMock()
+    cache.has_negative = AsyncMock(return_value=False)
+    cache.set_negative = AsyncMock()
+    router.replica.fetchrow.return_value = None
+    router.primary.fetchrow.return_value = {"id": 9, "source": "primary"}
+    assert (await get_open_ad(9, router, cache))["source"] == "primary"
+    cache.set_negative.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_fetch_with_missing_ids_is_rerun_on_primary(router):
+    router.replica.fetch.return_value = [{"id": 1, "source": "replica"}]
+    router.primary.fetch.return_value = [{"id": 1, "source": "primary"}, {"id": 2, "source": "primary"}]
+    ads = await AdsRepository(router).get_features_many([1, 2])
+    assert {item_id: row["source"] for item_id, row in ads.items()} == {1: "primary", 2: "primary"}
+
+    router.primary.fetch.reset_mock()
+    router.replica.fetch.return_value = [{"id": 1, "source": "replica"}, {"id": 2, "source": "replica"}]
+    ads = await AdsRepository(router).get_features_many([1, 2])
+    assert {row["source"] for row in ads.values()} == {"replica"}
+    router.primary.fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_replica_pool_timeout_falls_back_without_opening_circuit(breaker):
+    raw_replica = MagicMock()
+    raw_replica.acquire = AsyncMock(side_effect=asyncio.TimeoutError())
+    router = ReplicaRouter(
+        _pool({"id": 1, "source": "primary"}),
+        GuardedPool(raw_replica, breaker, "replica"),
+        breaker,
+        fallback_errors=(DatabaseTimeoutError,),
+    )
+    router.lag = 0.0
+    assert (await UsersRepository(router).get_by_id(1))["source"] == "primary"
+    assert router.route("users", [1]) == REPLICA
+
+
+def test_writes_and_unknown_attributes_use_primary(router):
+    assert router.execute is router.primary.execute
+    assert router.acquire is router.primary.acquire
+
+
+def test_recent_writes_are_bounded(router):
+    router.max_recent_writes = 2
+    router.mark_written("ads", [1, 2, 3])
+    assert router.route("ads", [1]) == REPLICA
+    assert router.route("ads", [3]) == READ_YOUR_WRITES
+
+
+@pytest.mark.asyncio
+async def test_close_stops_lag_checks(router):
+    router.lag_check_interval = 3600
+    await router.start()
+    await router.close()
+    router.replica.close.assert_awaited_once()
+    router.primary.close.assert_awaited_once()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_replica_routing_integration():
+    # Two local instances, e.g. a primary and a streaming replica:
+    # DATABASE_URL=... DATABASE_REPLICA_URL=... pytest -m integration tests/test_replica.py
+    from db.connection import create_pool
+
+    replica_dsn = os.environ.get("DATABASE_REPLICA_URL")
+    if not replica_dsn:
+        pytest.skip("DATABASE_REPLICA_URL not set")
+    try:
+        pool = await create_pool(os.environ["DATABASE_URL"], replica_dsn)
+    except Exception:
+        pytest.skip("Database not available")
+    try:
+        assert isinstance(pool, ReplicaRouter)
+        user_id = await UsersRepository(pool).create(is_verified_seller=True)
+        item_id = await AdsRepository(pool).create(user_id, "Replica", "text", 1, 0)
+        assert pool.route("ads", [item_id]) == READ_YOUR_WRITES
+        ad = await AdsRepository(pool).get_features_by_id(item_id)
+        assert ad["id"] == item_id
+    finally:
+        await pool.close()
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from repositories.ads import GET_OPEN_ADS_QUERY, AdsRepository
+from repositories.moderation_results import (
+    CREATE_PENDING_MANY_QUERY,
+    UPDATE_COMPLETED_MANY_QUERY,
+    UPDATE_FAILED_MANY_QUERY,
+    ModerationResultsRepository,
+)
+
+
+@pytest.fixture
+def pool():
+    p = MagicMock()
+    p.fetch = AsyncMock()
+    p.execute = AsyncMock()
+    return p
+
+
+@pytest.mark.asyncio
+async def test_get_many_returns_rows_by_id(pool):
+    pool.fetch.return_value = [{"id": 3, "name": "c"}, {"id": 1, "name": "a"}]
+    ads = await AdsRepository(pool).get_many([1, 2, 3])
+    assert ads == {1: {"id": 1, "name": "a"}, 3: {"id": 3, "name": "c"}}
+    pool.fetch.assert_awaited_once_with(GET_OPEN_ADS_QUERY, [1, 2, 3])
+
+
+@pytest.mark.asyncio
+async def test_bulk_methods_skip_empty_input(pool):
+    assert await AdsRepository(pool).get_many([]) == {}
+    repo = ModerationResultsRepository(pool)
+    assert await repo.create_many([]) == []
+    await repo.update_completed_many([])
+    await repo.update_failed_many([])
+    pool.fetch.assert_not_awaited()
+    pool.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_many_returns_ids_in_input_order(pool):
+    pool.fetch.return_value = [{"id": 10}, {"id": 11}]
+    assert await ModerationResultsRepository(pool).create_many([5, 5]) == [10, 11]
+    pool.fetch.assert_awaited_once_with(CREATE_PENDING_MANY_QUERY, [5, 5])
+
+
+@pytest.mark.asyncio
+async def test_update_many_passes_column_arrays(pool):
+    repo = ModerationResultsRepository(pool)
+    await repo.update_completed_many([(1, True, 0.9), (2, False, 0.1)])
+    pool.execute.assert_awaited_with(UPDATE_COMPLETED_MANY_QUERY, [1, 2], [True, False], [0.9, 0.1])
+    await repo.update_failed_many([(3, "not found")])
+    pool.execute.assert_awaited_with(UPDATE_FAILED_MANY_QUERY, [3], ["not found"])
+
+
+@pytest.mark.asyncio
+async def test_close_with_results_returns_deleted_task_ids(pool):
+    pool.fetchrow = AsyncMock(return_value={"id": 5, "task_ids": [7, 8]})
+    assert await AdsRepository(pool).close_with_results(5) == [7, 8]
+    pool.fetchrow.return_value = None
+    assert await AdsRepository(pool).close_with_results(5) is None
+
+
+@pytest.mark.asyncio
+async def test_feature_queries_do_not_fetch_description(pool):
+    pool.fetchrow = AsyncMock(return_value={"id": 1, "description_length": 12})
+    repo = AdsRepository(pool)
+    assert (await repo.get_features_by_id(1))["description_length"] == 12
+    query = pool.fetchrow.await_args[0][0]
+    assert "description_length" in query and "a.description," not in query
+    pool.fetch.return_value = [{"id": 2, "description_length": 3}]
+    assert await repo.get_features_many([2]) == {2: {"id": 2, "description_length": 3}}
@@ -0,0 +1,133 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from model import train_model
+from repositories.ads import AdsRepository
+from repositories.moderation_results import ModerationResultsRepository
+from repositories.rescore_checkpoints import RescoreCheckpointsRepository
+from services.predict_service import build_features, predict
+from services.scorer import build_scorer
+from workers.rescore_ads import (
+    RescoreStats,
+    load_checkpoint,
+    parse_args,
+    rescore,
+    rescore_shard,
+    score_rows,
+)
+
+
+class _AsyncCtx:
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *args):
+        return None
+
+
+def _row(item_id: int) -> dict:
+    return {
+        "id": item_id,
+        "seller_id": 1,
+        "is_verified_seller": bool(item_id % 2),
+        "description_length": item_id * 13,
+        "category": item_id % 100 + 1,
+        "images_qty": item_id % 10,
+    }
+
+
+@pytest.fixture
+def mock_pool():
+    pool = MagicMock()
+    conn = MagicMock()
+    conn.transaction = MagicMock(return_value=_AsyncCtx(None))
+    pool.acquire = MagicMock(return_value=_AsyncCtx(conn))
+    return pool
+
+
+def test_score_rows_matches_single_row_predict():
+    model = build_scorer(train_model())
+    rows = [_row(i) for i in range(1, 20)]
+    labels, probabilities = score_rows(model, rows)
+    for row, label, probability in zip(rows, labels, probabilities):
+        expected = predict(
+            model,
+            build_features(
+                row["is_verified_seller"], row["images_qty"], row["description_length"], row["category"]
+            ),
+        )
+        assert (bool(label), float(probability)) == pytest.approx(expected)
+
+
+@pytest.mark.asyncio
+async def test_load_checkpoint_rejects_other_parallelism():
+    rows = [{"shard": 1, "shards": 2, "last_id": 21}]
+    with patch.object(RescoreCheckpointsRepository, "load", new_callable=AsyncMock, return_value=rows):
+        assert await load_checkpoint(MagicMock(), "rescore", 2) == {0: 0, 1: 21}
+        with pytest.raises(ValueError):
+            await load_checkpoint(MagicMock(), "rescore", 3)
+
+
+@pytest.mark.asyncio
+async def test_rescore_shard_commits_checkpoint_with_each_chunk(mock_pool):
+    chunks = [[_row(1), _row(3)], [_row(5)]]
+
+    async def iter_chunks(self, conn, after_id, chunk_size, shards, shard):
+        assert (after_id, chunk_size, shards, shard) == (0, 2, 2, 1)
+        for chunk in chunks:
+            yield chunk
+
+    conn = await mock_pool.acquire().__aenter__()
+    cache = MagicMock()
+    cache.set_many = AsyncMock()
+    args = parse_args(["--chunk-size", "2", "--checkpoint", "model-v7"])
+    last_ids = {0: 0, 1: 0}
+    stats = RescoreStats()
+    model = build_scorer(train_model(), "v7")
+    with patch.object(AdsRepository, "iter_open_features", iter_chunks), \
+            patch.object(ModerationResultsRepository, "copy_completed", new_callable=AsyncMock) as copy_completed, \
+            patch.object(RescoreCheckpointsRepository, "save", new_callable=AsyncMock) as save:
+        await rescore_shard(mock_pool, model, cache, 1, 2, last_ids, args, stats)
+    assert copy_completed.await_count == 2
+    assert [r[0] for r in copy_completed.await_args_list[0].args[0]] == [1, 3]
+    # COPY and checkpoint go through the same transaction's connection
+    assert all(c.kwargs["conn"] is conn for c in copy_completed.await_args_list + save.await_args_list)
+    assert [c.args for c in save.await_args_list] == [("model-v7", 1, 2, 3), ("model-v7", 1, 2, 5)]
+    assert conn.transaction.call_count == 3
+    assert set(cache.set_many.await_args_list[1].args[0]) == {"simple_predict:v7:5"}
+    assert stats.rows == 3
+    assert last_ids == {0: 0, 1: 5}
+
+
+@pytest.mark.asyncio
+async def test_rescore_shard_dry_run_writes_nothing(mock_pool):
+    async def iter_chunks(self, conn, after_id, chunk_size, shards, shard):
+        yield [_row(1)]
+
+    cache = MagicMock()
+    cache.set_many = AsyncMock()
+    args = parse_args(["--dry-run", "--refresh-cache"])
+    with patch.object(AdsRepository, "iter_open_features", iter_chunks), \
+            patch.object(ModerationResultsRepository, "copy_completed", new_callable=AsyncMock) as copy_completed, \
+            patch.object(RescoreCheckpointsRepository, "save", new_callable=AsyncMock) as save:
+        await rescore_shard(
+            mock_pool, build_scorer(train_model()), cache, 0, 1, {0: 0}, args, RescoreStats()
+        )
+    copy_completed.assert_not_awaited()
+    save.assert_not_awaited()
+    cache.set_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rescore_sizes_pool_for_cursor_and_copy_per_shard():
+    pool = MagicMock()
+    pool.close = AsyncMock()
+    args = parse_args(["--parallelism", "8"])
+    with patch("workers.rescore_ads.create_pool", AsyncMock(return_value=pool)) as create, \
+            patch("workers.rescore_ads.load_checkpoint", AsyncMock(return_value={})), \
+            patch("workers.rescore_ads.rescore_shard", new_callable=AsyncMock):
+        await rescore(args)
+    assert create.await_args.kwargs["max_size"] >= 16
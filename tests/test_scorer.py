@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from model import train_model
+from services.predict_service import build_features, predict, predict_batch
+from services.scorer import LinearScorer, SklearnScorer, build_scorer
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+def test_build_scorer_uses_linear_fast_path(model):
+    scorer = build_scorer(model)
+    assert isinstance(scorer, LinearScorer)
+    assert scorer.model is model
+    assert build_scorer(scorer) is scorer
+
+
+def test_build_scorer_falls_back_for_non_linear_models():
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 4))
+    tree = DecisionTreeClassifier(max_depth=3).fit(X, (X[:, 0] < 0.5).astype(int))
+    scorer = build_scorer(tree)
+    assert isinstance(scorer, SklearnScorer)
+    labels, probabilities = scorer.score(X[:10])
+    np.testing.assert_array_equal(labels.astype(int), tree.predict(X[:10]))
+    np.testing.assert_allclose(probabilities, tree.predict_proba(X[:10])[:, 1])
+
+
+def test_linear_scorer_parity_with_sklearn_batch(model):
+    rng = np.random.default_rng(42)
+    X = np.vstack([rng.random((5000, 4)), rng.random((5000, 4)) * 5 - 2])
+    labels, probabilities = build_scorer(model).score(X)
+    np.testing.assert_array_equal(labels.astype(int), model.predict(X))
+    np.testing.assert_allclose(probabilities, model.predict_proba(X)[:, 1], rtol=1e-12, atol=1e-12)
+
+
+def test_linear_scorer_parity_with_sklearn_single_row(model):
+    features = build_features(
+        is_verified_seller=False, images_qty=0, description_length=10, category=1
+    )
+    is_violation, probability = predict(build_scorer(model), features)
+    assert is_violation == bool(model.predict(features)[0])
+    assert probability == pytest.approx(float(model.predict_proba(features)[0][1]), abs=1e-12)
+
+
+def test_predict_batch_accepts_raw_model(model):
+    X = np.random.default_rng(1).random((16, 4))
+    labels, probabilities = predict_batch(model, X)
+    np.testing.assert_array_equal(labels.astype(int), model.predict(X))
+    np.testing.assert_allclose(probabilities, model.predict_proba(X)[:, 1])
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.simple_predict_service import simple_predict
+from services.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight(redis_lock=False)
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"probability": 0.5}
+
+    waiters = [asyncio.ensure_future(single_flight.do("simple_predict:1", compute)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == 1
+    assert results == [{"probability": 0.5}] * 10
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors_and_forgets_key():
+    single_flight = SingleFlight(redis_lock=False)
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        single_flight.do("k", fail), single_flight.do("k", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(single_flight) == 0
+    assert await single_flight.do("k", AsyncMock(return_value=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_leader():
+    single_flight = SingleFlight(redis_lock=False)
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return 42
+
+    leader = asyncio.ensure_future(single_flight.do("k", compute))
+    follower = asyncio.ensure_future(single_flight.do("k", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    assert await follower == 42
+
+
+@pytest.mark.asyncio
+async def test_single_flight_waits_for_redis_lock_holder():
+    cache = MagicMock()
+    cache.acquire_lock = AsyncMock(return_value=False)
+    cache.get = AsyncMock(side_effect=[None, {"probability": 0.3}])
+    single_flight = SingleFlight(redis_lock=True, lock_wait_ms=1000)
+    compute = AsyncMock()
+
+    assert await single_flight.do("k", compute, cache) == {"probability": 0.3}
+    compute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_releases_redis_lock():
+    cache = MagicMock()
+    cache.acquire_lock = AsyncMock(return_value=True)
+    cache.release_lock = AsyncMock()
+    single_flight = SingleFlight(redis_lock=True)
+
+    assert await single_flight.do("k", AsyncMock(return_value=7), cache) == 7
+    lock_key, token = cache.release_lock.await_args.args
+    assert lock_key == "lock:k"
+    assert cache.acquire_lock.await_args.args[:2] == (lock_key, token)
+
+
+@pytest.mark.asyncio
+async def test_simple_predict_queries_db_once_for_concurrent_misses(monkeypatch):
+    ads_repo = MagicMock()
+    ads_repo.get_features_by_id = AsyncMock(
+        return_value={
+            "id": 1,
+            "seller_id": 1,
+            "is_verified_seller": True,
+            "description_length": 4,
+            "category": 1,
+            "images_qty": 2,
+        }
+    )
+    monkeypatch.setattr("services.ads_service.AdsRepository", lambda pool: ads_repo)
+    monkeypatch.setattr(
+        "services.simple_predict_service.run_prediction_async",
+        AsyncMock(return_value=(False, 0.1)),
+    )
+    single_flight = SingleFlight(redis_lock=False)
+
+    results = await asyncio.gather(
+        *(simple_predict(1, MagicMock(), MagicMock(), single_flight=single_flight) for _ in range(5))
+    )
+    assert results == [{"is_violation": False, "probability": 0.1}] * 5
+    ads_repo.get_features_by_id.assert_awaited_once_with(1)
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+import main
+from services.stream_predict_service import iter_ndjson_lines, stream_predict
+
+
+def build_item(**overrides):
+    item = {
+        "seller_id": 123,
+        "is_verified_seller": False,
+        "item_id": 456,
+        "name": "Phone",
+        "description": "A good phone",
+        "category": 7,
+        "images_qty": 1,
+    }
+    item.update(overrides)
+    return item
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda x: np.column_stack([1 - x[:, 1], x[:, 1]])
+    return model
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_iter_ndjson_lines_handles_lines_split_across_chunks():
+    chunks = [b'{"a": 1}\n{"b"', b': 2}\n', b"\n", b'{"c": 3}']
+    lines = [line async for line in iter_ndjson_lines(_aiter(chunks))]
+    assert lines == [b'{"a": 1}', b'{"b": 2}', b"", b'{"c": 3}']
+
+
+@pytest.mark.asyncio
+async def test_stream_predict_scores_in_chunks(mock_model):
+    lines = [json.dumps(build_item(item_id=i + 1, images_qty=i)).encode() for i in range(5)]
+
+    def parse(line):
+        return MagicMock(**json.loads(line)), None
+
+    chunks = [
+        chunk
+        async for chunk in stream_predict(_aiter(lines), mock_model, parse, chunk_size=2)
+    ]
+    assert len(chunks) == 3
+    assert mock_model.predict_proba.call_count == 3
+    results = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [r["item_id"] for r in results] == [1, 2, 3, 4, 5]
+
+
+def test_predict_stream_endpoint(client, mock_model):
+    original = main.app.state.model
+    main.app.state.model = mock_model
+    try:
+        body = "\n".join(
+            [
+                json.dumps(build_item(item_id=1, images_qty=2)),
+                "",
+                json.dumps(build_item(item_id=2, seller_id=-1)),
+                "not json",
+                json.dumps(build_item(item_id=3, images_qty=7)),
+            ]
+        )
+        response = client.post(
+            "/predict/stream",
+            content=body.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+    finally:
+        main.app.state.model = original
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["line"] for r in results] == [1, 3, 4, 5]
+    assert results[0]["item_id"] == 1
+    assert results[0]["probability"] == pytest.approx(0.2)
+    assert "seller_id" in results[1]["error"]
+    assert "error" in results[2]
+    assert results[3]["probability"] == pytest.approx(0.7)
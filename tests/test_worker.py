@@ -4,7 +4,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from repositories.ads import AdsRepository
 from repositories.moderation_results import ModerationResultsRepository
 
-from workers.moderation_worker import process_message, MAX_RETRIES
+from logging_config import task_id_var
+from services.predict_service import predict
+from workers.moderation_worker import MAX_RETRIES, process_batch, process_message, score_ads
 
 
 @pytest.fixture
@@ -33,16 +35,18 @@ async def test_process_message_success(mock_model, mock_pool, mock_kafka):
         "id": 1,
         "seller_id": 10,
         "is_verified_seller": True,
-        "description": "x",
+        "description_length": 1,
         "category": 1,
         "images_qty": 0,
     }
-    with patch.object(AdsRepository, "get_by_id", new_callable=AsyncMock, return_value=ad_row):
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=ad_row):
         with patch.object(
             ModerationResultsRepository, "update_completed", new_callable=AsyncMock
         ) as update_completed:
             with patch(
-                "workers.moderation_worker.run_prediction", return_value=(False, 0.1)
+                "workers.moderation_worker.run_prediction_async",
+                new_callable=AsyncMock,
+                return_value=(False, 0.1),
             ):
                 msg = {"item_id": 1, "task_id": 100, "timestamp": "2025-01-01T00:00:00Z"}
                 await process_message(msg, mock_model, mock_pool, mock_kafka)
@@ -50,9 +54,33 @@ async def test_process_message_success(mock_model, mock_pool, mock_kafka):
     mock_kafka.send_to_dlq.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_process_message_sends_only_predict_to_executor(mock_model, mock_pool, mock_kafka):
+    ad_row = {
+        "id": 1,
+        "seller_id": 10,
+        "is_verified_seller": True,
+        "description_length": 1,
+        "category": 1,
+        "images_qty": 0,
+    }
+    executor = MagicMock()
+    executor.run = AsyncMock(return_value=(True, 0.8))
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=ad_row):
+        with patch.object(
+            ModerationResultsRepository, "update_completed", new_callable=AsyncMock
+        ) as update_completed:
+            msg = {"item_id": 1, "task_id": 100}
+            await process_message(msg, mock_model, mock_pool, mock_kafka, executor=executor)
+    func, model, features = executor.run.await_args.args
+    assert func is predict and model is mock_model
+    assert features.shape == (1, 4)
+    update_completed.assert_called_once_with(100, True, 0.8)
+
+
 @pytest.mark.asyncio
 async def test_process_message_ad_not_found_sends_dlq(mock_model, mock_pool, mock_kafka):
-    with patch.object(AdsRepository, "get_by_id", new_callable=AsyncMock, return_value=None):
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=None):
         with patch.object(
             ModerationResultsRepository, "update_failed", new_callable=AsyncMock
         ) as update_failed:
@@ -79,13 +107,15 @@ async def test_process_message_retry_then_dlq(mock_model, mock_pool, mock_kafka)
         "id": 1,
         "seller_id": 1,
         "is_verified_seller": False,
-        "description": "x",
+        "description_length": 1,
         "category": 1,
         "images_qty": 0,
     }
-    with patch.object(AdsRepository, "get_by_id", new_callable=AsyncMock, return_value=ad_row):
+    with patch.object(AdsRepository, "get_features_by_id", new_callable=AsyncMock, return_value=ad_row):
         with patch(
-            "workers.moderation_worker.run_prediction", side_effect=RuntimeError("model down")
+            "workers.moderation_worker.run_prediction_async",
+            new_callable=AsyncMock,
+            side_effect=RuntimeError("model down"),
         ):
             with patch.object(
                 ModerationResultsRepository, "update_failed", new_callable=AsyncMock
@@ -96,3 +126,80 @@ async def test_process_message_retry_then_dlq(mock_model, mock_pool, mock_kafka)
     assert mock_kafka.send_to_dlq.call_count == 1
     call_args = mock_kafka.send_to_dlq.call_args[0]
     assert call_args[2] == MAX_RETRIES
+
+
+def _ad(item_id: int, description_length: int = 1) -> dict:
+    return {
+        "id": item_id,
+        "seller_id": 10,
+        "is_verified_seller": True,
+        "description_length": description_length,
+        "category": 1,
+        "images_qty": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_process_batch_uses_bulk_queries(mock_pool, mock_kafka):
+    model = MagicMock()
+    model.predict_proba.return_value = [[0.9, 0.1], [0.2, 0.8]]
+    ads = {1: _ad(1), 2: _ad(2, 500)}
+    messages = [
+        {"item_id": 1, "task_id": 101},
+        {"item_id": 2, "task_id": 102},
+        {"item_id": 3, "task_id": 103},
+        {"item_id": 4},
+    ]
+    with patch.object(AdsRepository, "get_features_many", new_callable=AsyncMock, return_value=ads) as get_many, \
+            patch.object(ModerationResultsRepository, "update_completed_many", new_callable=AsyncMock) as completed, \
+            patch.object(ModerationResultsRepository, "update_failed_many", new_callable=AsyncMock) as failed:
+        await process_batch(messages, model, mock_pool, mock_kafka)
+
+    get_many.assert_awaited_once_with([1, 2, 3])
+    assert [(task_id, is_violation) for task_id, is_violation, _ in completed.await_args[0][0]] == [
+        (101, False),
+        (102, True),
+    ]
+    failed.assert_awaited_once_with([(103, "Ad with item_id=3 not found")])
+    mock_kafka.send_to_dlq.assert_awaited_once_with(messages[2], "Ad with item_id=3 not found", 0)
+
+
+@pytest.mark.asyncio
+async def test_process_batch_falls_back_to_single_messages(mock_model, mock_pool, mock_kafka):
+    messages = [{"item_id": 1, "task_id": 101}, {"item_id": 2, "task_id": 102}]
+    with patch.object(AdsRepository, "get_features_many", new_callable=AsyncMock, side_effect=RuntimeError("db")), \
+            patch("workers.moderation_worker.process_message", new_callable=AsyncMock) as single:
+        await process_batch(messages, mock_model, mock_pool, mock_kafka)
+    assert [c.args[0] for c in single.await_args_list] == messages
+
+
+@pytest.mark.asyncio
+async def test_score_ads_reuses_feature_cache():
+    model = MagicMock()
+    model.predict_proba.return_value = [[0.2, 0.8]]
+    cache = MagicMock()
+    cache.get_many = AsyncMock(return_value=[{"is_violation": False, "probability": 0.1}, None])
+    cache.set_many = AsyncMock()
+    with patch("workers.moderation_worker.feature_cache_key", side_effect=["k1", "k2"]):
+        scores = await score_ads(model, [_ad(1), _ad(2)], cache=cache)
+    assert scores == [(False, 0.1), (True, 0.8)]
+    cache.get_many.assert_awaited_once_with(["k1", "k2"])
+    cache.set_many.assert_awaited_once_with({"k2": {"is_violation": True, "probability": 0.8}})
+
+
+@pytest.mark.asyncio
+async def test_process_batch_logs_task_ids(mock_pool, mock_kafka, caplog):
+    model = MagicMock()
+    model.predict_proba.return_value = [[0.9, 0.1]]
+    messages = [{"item_id": 1, "task_id": 101}, {"item_id": 3, "task_id": 103}]
+    dlq_task_ids = []
+    mock_kafka.send_to_dlq.side_effect = lambda *args: dlq_task_ids.append(task_id_var.get())
+    with patch.object(AdsRepository, "get_features_many", new_callable=AsyncMock, return_value={1: _ad(1)}), \
+            patch.object(ModerationResultsRepository, "update_completed_many", new_callable=AsyncMock), \
+            patch.object(ModerationResultsRepository, "update_failed_many", new_callable=AsyncMock), \
+            caplog.at_level("INFO", logger="workers.moderation_worker"):
+        await process_batch(messages, model, mock_pool, mock_kafka)
+
+    assert dlq_task_ids == [103]
+    assert task_id_var.get() is None
+    assert "task_ids=[101, 103]" in caplog.records[-1].getMessage()
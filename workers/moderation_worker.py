@@ -3,26 +3,49 @@ import json
 import logging
 import os
 import sys
+import time
+from types import SimpleNamespace
 from typing import Optional
 
+import numpy as np
 from aiokafka import AIOKafkaConsumer
 from aiokafka.errors import KafkaError
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from clients.kafka import KafkaProducer, DLQ_TOPIC, MODERATION_TOPIC
+from circuit_breaker import get_breaker
+from clients.kafka import KafkaProducer, DLQ_TOPIC, KAFKA_FAILURES, MODERATION_TOPIC
 from db.connection import DATABASE_URL, create_pool
-from model import get_model
+from logging_config import setup_logging, task_id_var
 from repositories.ads import AdsRepository
+from repositories.hot_queries import HOT_QUERIES
 from repositories.moderation_results import ModerationResultsRepository
-from services.predict_service import run_prediction
+from services.feature_cache import (
+    FEATURE_CACHE_ENABLED,
+    feature_cache_key,
+    get_feature_cached,
+    get_features_cached_many,
+    set_feature_cached,
+    set_features_cached_many,
+)
+from services.inference_executor import INLINE_EXECUTOR, InferenceExecutor, create_executor
+from services.model_reloader import ModelReloader
+from services.predict_service import (
+    build_features_batch,
+    observe_batch_prediction,
+    predict_batch,
+    run_prediction_async,
+)
+from storages.cache import REDIS_FAILURES, REDIS_URL, PredictionCache
 
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 KAFKA_BOOTSTRAP_SERVERS = os.getenv("KAFKA_BOOTSTRAP_SERVERS", "localhost:9092")
 MAX_RETRIES = 3
 RETRY_DELAYS = [1, 5, 30]
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "100"))
+WORKER_BATCH_WAIT_MS = int(os.getenv("WORKER_BATCH_WAIT_MS", "50"))
 
 
 async def process_message(
@@ -31,7 +54,10 @@ async def process_message(
     pool,
     kafka_producer: KafkaProducer,
     retry_count: int = 0,
+    executor: InferenceExecutor | None = None,
+    cache: PredictionCache | None = None,
 ):
+    executor = executor or INLINE_EXECUTOR
     item_id = message_data.get("item_id")
     task_id = None
 
@@ -40,11 +66,12 @@ async def process_message(
         results_repo = ModerationResultsRepository(pool)
 
         task_id = message_data.get("task_id")
+        task_id_var.set(task_id)
         if not task_id:
             logger.warning("Message missing task_id: %s", message_data)
             return
 
-        ad = await ads_repo.get_by_id(item_id)
+        ad = await ads_repo.get_features_by_id(item_id)
         if ad is None:
             error_msg = f"Ad with item_id={item_id} not found"
             logger.error(error_msg)
@@ -52,15 +79,29 @@ async def process_message(
             await kafka_producer.send_to_dlq(message_data, error_msg, retry_count)
             return
 
-        is_violation, probability = run_prediction(
-            model=model,
-            seller_id=ad["seller_id"],
-            is_verified_seller=ad["is_verified_seller"],
-            item_id=ad["id"],
-            description=ad["description"],
-            category=ad["category"],
-            images_qty=ad["images_qty"],
+        feature_key = feature_cache_key(
+            model, ad["is_verified_seller"], ad["images_qty"], ad["description_length"], ad["category"]
         )
+        cached = await get_feature_cached(cache, feature_key)
+        if cached is not None:
+            is_violation, probability = cached["is_violation"], cached["probability"]
+        else:
+            # Only predict() crosses into the executor; the request log line
+            # and prediction metrics stay in this process, where they are
+            # actually collected (a process pool child would drop them).
+            is_violation, probability = await run_prediction_async(
+                model,
+                seller_id=ad["seller_id"],
+                is_verified_seller=ad["is_verified_seller"],
+                item_id=ad["id"],
+                description_length=ad["description_length"],
+                category=ad["category"],
+                images_qty=ad["images_qty"],
+                executor=executor,
+            )
+            await set_feature_cached(
+                cache, feature_key, {"is_violation": is_violation, "probability": probability}
+            )
 
         await results_repo.update_completed(task_id, is_violation, probability)
         logger.info(
@@ -84,7 +125,7 @@ async def process_message(
             )
             await asyncio.sleep(delay)
             await process_message(
-                message_data, model, pool, kafka_producer, retry_count + 1
+                message_data, model, pool, kafka_producer, retry_count + 1, executor, cache
             )
         else:
             logger.error("Max retries reached, sending to DLQ")
@@ -94,18 +135,130 @@ async def process_message(
             await kafka_producer.send_to_dlq(message_data, error_msg, retry_count)
 
 
+async def score_ads(
+    model,
+    ads: list,
+    executor: InferenceExecutor | None = None,
+    cache: PredictionCache | None = None,
+) -> list[tuple[bool, float]]:
+    executor = executor or INLINE_EXECUTOR
+    keys = [
+        feature_cache_key(
+            model, ad["is_verified_seller"], ad["images_qty"], ad["description_length"], ad["category"]
+        )
+        for ad in ads
+    ]
+    cached = await get_features_cached_many(cache, keys)
+    results = [
+        (value["is_violation"], value["probability"]) if value is not None else None
+        for value in cached
+    ]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if not missing:
+        return results
+
+    count = len(missing)
+    features = build_features_batch(
+        is_verified_seller=np.fromiter((ads[i]["is_verified_seller"] for i in missing), np.float64, count),
+        images_qty=np.fromiter((ads[i]["images_qty"] for i in missing), np.float64, count),
+        description_length=np.fromiter((ads[i]["description_length"] for i in missing), np.float64, count),
+        category=np.fromiter((ads[i]["category"] for i in missing), np.float64, count),
+    )
+    start = time.perf_counter()
+    labels, probabilities = await executor.run(predict_batch, model, features)
+    observe_batch_prediction(labels, probabilities, time.perf_counter() - start)
+
+    fresh = {}
+    for i, is_violation, probability in zip(missing, labels.tolist(), probabilities.tolist()):
+        results[i] = (bool(is_violation), probability)
+        fresh[keys[i]] = {"is_violation": bool(is_violation), "probability": probability}
+    await set_features_cached_many(cache, fresh)
+    return results
+
+
+async def process_batch(
+    messages: list[dict],
+    model,
+    pool,
+    kafka_producer: KafkaProducer,
+    executor: InferenceExecutor | None = None,
+    cache: PredictionCache | None = None,
+):
+    # Batch-level lines carry the task ids in the message; per-message lines set task_id_var
+    task_id_var.set(None)
+    tasks = []
+    for message_data in messages:
+        if not message_data.get("task_id"):
+            logger.warning("Message missing task_id: %s", message_data)
+            continue
+        tasks.append(message_data)
+    if not tasks:
+        return
+
+    not_found = []
+    try:
+        ads = await AdsRepository(pool).get_features_many([m.get("item_id") for m in tasks])
+        found = [m for m in tasks if m.get("item_id") in ads]
+        not_found = [m for m in tasks if m.get("item_id") not in ads]
+        scores = await score_ads(model, [ads[m["item_id"]] for m in found], executor, cache)
+
+        results_repo = ModerationResultsRepository(pool)
+        await results_repo.update_completed_many(
+            [
+                (m["task_id"], is_violation, probability)
+                for m, (is_violation, probability) in zip(found, scores)
+            ]
+        )
+        await results_repo.update_failed_many(
+            [(m["task_id"], f"Ad with item_id={m.get('item_id')} not found") for m in not_found]
+        )
+    except Exception as exc:
+        # Isolate the failing message and keep the per-message retry policy
+        logger.exception("Batch of %s messages failed, processing one by one: %s", len(tasks), exc)
+        for message_data in tasks:
+            await process_message(
+                message_data, model, pool, kafka_producer, executor=executor, cache=cache
+            )
+        return
+
+    for message_data in not_found:
+        task_id_var.set(message_data["task_id"])
+        error_msg = f"Ad with item_id={message_data.get('item_id')} not found"
+        logger.error(error_msg)
+        await kafka_producer.send_to_dlq(message_data, error_msg, 0)
+    task_id_var.set(None)
+    logger.info(
+        "Processed moderation batch: tasks=%s, not_found=%s, task_ids=%s",
+        len(tasks),
+        len(not_found),
+        [m["task_id"] for m in tasks],
+    )
+
+
 async def main():
     logger.info("Starting moderation worker")
 
-    model = get_model()
-    if model is None:
+    state = SimpleNamespace(model=None)
+    executor = create_executor()
+    model_reloader = ModelReloader(state, executor)
+    await model_reloader.reload(force=True)
+    if state.model is None:
         logger.error("Model not loaded, exiting")
         sys.exit(1)
+    await model_reloader.start()
 
-    pool = await create_pool()
-    kafka_producer = KafkaProducer(KAFKA_BOOTSTRAP_SERVERS)
+    pool = await create_pool(hot_queries=HOT_QUERIES)
+    kafka_producer = KafkaProducer(KAFKA_BOOTSTRAP_SERVERS, get_breaker("kafka", KAFKA_FAILURES))
     await kafka_producer.start()
 
+    redis_client = None
+    cache = None
+    if FEATURE_CACHE_ENABLED:
+        from redis.asyncio import Redis
+
+        redis_client = Redis.from_url(REDIS_URL)
+        cache = PredictionCache(redis_client, breaker=get_breaker("redis", REDIS_FAILURES))
+
     consumer = AIOKafkaConsumer(
         MODERATION_TOPIC,
         bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
@@ -118,14 +271,21 @@ async def main():
         await consumer.start()
         logger.info("Consumer started, waiting for messages...")
 
-        async for message in consumer:
+        while True:
+            batches = await consumer.getmany(
+                timeout_ms=WORKER_BATCH_WAIT_MS, max_records=WORKER_BATCH_SIZE
+            )
+            messages = [message.value for records in batches.values() for message in records]
+            if not messages:
+                continue
             try:
-                message_data = message.value
-                logger.info("Received message: %s", message_data)
-                await process_message(message_data, model, pool, kafka_producer)
+                logger.info("Received %s messages", len(messages))
+                await process_batch(
+                    messages, state.model, pool, kafka_producer, executor=executor, cache=cache
+                )
                 await consumer.commit()
             except Exception as exc:
-                logger.exception("Error handling message: %s", exc)
+                logger.exception("Error handling messages: %s", exc)
 
     except KafkaError as exc:
         logger.error("Kafka error: %s", exc)
@@ -133,6 +293,10 @@ async def main():
         await consumer.stop()
         await kafka_producer.stop()
         await pool.close()
+        if redis_client is not None:
+            await redis_client.aclose()
+        await model_reloader.stop()
+        executor.shutdown()
         logger.info("Worker stopped")
 
 
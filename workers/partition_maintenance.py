@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+
+import asyncpg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DATABASE_URL
+from logging_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "moderation_results"
+PARTITION_MONTHS_AHEAD = int(os.environ.get("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_RETENTION_MONTHS = int(os.environ.get("PARTITION_RETENTION_MONTHS", "6"))
+
+_BOUND_RE = re.compile(r"FROM \((?:'([^']+)'|MINVALUE)\) TO \((?:'([^']+)'|MAXVALUE)\)")
+
+
+def month_start(value: datetime, offset: int = 0) -> datetime:
+    months = value.year * 12 + value.month - 1 + offset
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m}"
+
+
+def parse_bound(expr: str) -> tuple[datetime | None, datetime | None]:
+    match = _BOUND_RE.search(expr)
+    if match is None:
+        raise ValueError(f"Unsupported partition bound: {expr}")
+    lower, upper = match.groups()
+    return (
+        datetime.fromisoformat(lower) if lower else None,
+        datetime.fromisoformat(upper) if upper else None,
+    )
+
+
+def missing_partitions(
+    partitions: dict[str, tuple[datetime | None, datetime | None]],
+    now: datetime,
+    months_ahead: int,
+) -> list[tuple[str, datetime, datetime]]:
+    uppers = [upper for _, upper in partitions.values() if upper is not None]
+    start = max(uppers) if uppers else month_start(now)
+    horizon = month_start(now, months_ahead + 1)
+    planned = []
+    while start < horizon:
+        end = month_start(start, 1)
+        planned.append((partition_name(start), start, end))
+        start = end
+    return planned
+
+
+def expired_partitions(
+    partitions: dict[str, tuple[datetime | None, datetime | None]],
+    now: datetime,
+    retention_months: int,
+) -> list[str]:
+    cutoff = month_start(now, -retention_months)
+    return sorted(
+        name
+        for name, (_, upper) in partitions.items()
+        if upper is not None and upper <= cutoff
+    )
+
+
+async def list_partitions(conn: asyncpg.Connection) -> dict[str, tuple[datetime | None, datetime | None]]:
+    rows = await conn.fetch(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = $1::regclass
+        """,
+        PARENT_TABLE,
+    )
+    return {row["relname"]: parse_bound(row["bound"]) for row in rows}
+
+
+async def create_partitions(conn: asyncpg.Connection, planned, dry_run: bool = False) -> None:
+    for name, start, end in planned:
+        logger.info("Creating partition %s [%s, %s)", name, start, end)
+        if not dry_run:
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+
+
+async def archive_partition(conn: asyncpg.Connection, name: str, archive_dir: str) -> str:
+    path = os.path.join(archive_dir, f"{name}.csv")
+    # COPY streams the table without loading rows into Python
+    await conn.copy_from_table(name, output=path, format="csv", header=True)
+    return path
+
+
+async def retire_partitions(
+    conn: asyncpg.Connection,
+    expired: list[str],
+    archive_dir: str | None = None,
+    drop: bool = False,
+    dry_run: bool = False,
+) -> None:
+    for name in expired:
+        logger.info("Retiring partition %s", name)
+        if dry_run:
+            continue
+        # Archive while still attached, so a failed export is retried on the next run
+        if archive_dir is not None:
+            path = await archive_partition(conn, name, archive_dir)
+            logger.info("Archived %s to %s", name, path)
+        # CONCURRENTLY avoids blocking inserts into the parent table
+        await conn.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name} CONCURRENTLY")
+        if drop:
+            await conn.execute(f"DROP TABLE {name}")
+            logger.info("Dropped partition %s", name)
+
+
+async def maintain(args: argparse.Namespace, now: datetime | None = None) -> None:
+    now = now or datetime.utcnow()
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        partitions = await list_partitions(conn)
+        await create_partitions(
+            conn, missing_partitions(partitions, now, args.months_ahead), args.dry_run
+        )
+        await retire_partitions(
+            conn,
+            expired_partitions(partitions, now, args.retention_months),
+            args.archive_dir,
+            args.drop,
+            args.dry_run,
+        )
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-create and retire monthly moderation_results partitions"
+    )
+    parser.add_argument("--dsn", default=DATABASE_URL)
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=PARTITION_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", help="COPY expired partitions to CSV files in this directory")
+    parser.add_argument("--drop", action="store_true", help="drop partitions after detaching (and archiving)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.archive_dir:
+        os.makedirs(args.archive_dir, exist_ok=True)
+    asyncio.run(maintain(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import DB_POOL_MAX_SIZE, create_pool
+from logging_config import setup_logging
+from model import get_model_with_version
+from repositories.ads import AdsRepository
+from repositories.moderation_results import ModerationResultsRepository
+from repositories.rescore_checkpoints import RescoreCheckpointsRepository
+from services.predict_service import build_features_batch, predict_batch
+from services.scorer import build_scorer
+from storages.cache import REDIS_URL, PredictionCache, cache_key_simple_predict, cache_tag_item
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_NAME = "rescore"
+
+
+def score_rows(model, rows) -> tuple[np.ndarray, np.ndarray]:
+    count = len(rows)
+    features = build_features_batch(
+        is_verified_seller=np.fromiter((r["is_verified_seller"] for r in rows), np.float64, count),
+        images_qty=np.fromiter((r["images_qty"] for r in rows), np.float64, count),
+        description_length=np.fromiter((r["description_length"] for r in rows), np.float64, count),
+        category=np.fromiter((r["category"] for r in rows), np.float64, count),
+    )
+    return predict_batch(model, features)
+
+
+async def load_checkpoint(pool, name: str, shards: int) -> dict[int, int]:
+    last_ids = {shard: 0 for shard in range(shards)}
+    for row in await RescoreCheckpointsRepository(pool).load(name):
+        if row["shards"] != shards:
+            raise ValueError(
+                f"Checkpoint {name} was written with parallelism {row['shards']}, "
+                f"use the same value or --reset"
+            )
+        last_ids[row["shard"]] = row["last_id"]
+    return last_ids
+
+
+class RescoreStats:
+    def __init__(self):
+        self.rows = 0
+        self.violations = 0
+        self.started = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+
+async def rescore_shard(
+    pool,
+    model,
+    cache: PredictionCache | None,
+    shard: int,
+    shards: int,
+    last_ids: dict[int, int],
+    args: argparse.Namespace,
+    stats: RescoreStats,
+) -> None:
+    ads_repo = AdsRepository(pool)
+    results_repo = ModerationResultsRepository(pool)
+    checkpoints_repo = RescoreCheckpointsRepository(pool)
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            async for rows in ads_repo.iter_open_features(
+                conn, last_ids[shard], args.chunk_size, shards, shard
+            ):
+                labels, probabilities = score_rows(model, rows)
+                item_ids = [r["id"] for r in rows]
+                if not args.dry_run:
+                    # The checkpoint commits with the chunk, so a crash never
+                    # leaves rows that a resumed run would insert again
+                    async with pool.acquire() as write_conn:
+                        async with write_conn.transaction():
+                            await results_repo.copy_completed(
+                                list(zip(item_ids, labels.tolist(), probabilities.tolist())),
+                                conn=write_conn,
+                            )
+                            await checkpoints_repo.save(
+                                args.checkpoint, shard, shards, item_ids[-1], conn=write_conn
+                            )
+                if cache is not None and not args.dry_run:
+                    await cache.set_many(
+                        {
+                            cache_key_simple_predict(model.version, item_id): {
+                                "is_violation": is_violation,
+                                "probability": probability,
+                            }
+                            for item_id, is_violation, probability in zip(
+                                item_ids, labels.tolist(), probabilities.tolist()
+                            )
+                        },
+                        tags={
+                            cache_key_simple_predict(model.version, item_id): [cache_tag_item(item_id)]
+                            for item_id in item_ids
+                        },
+                    )
+                last_ids[shard] = item_ids[-1]
+                stats.rows += len(rows)
+                stats.violations += int(np.count_nonzero(labels))
+                logger.info(
+                    "shard=%s last_id=%s rows=%s (%.0f rows/s)",
+                    shard,
+                    last_ids[shard],
+                    stats.rows,
+                    stats.rate,
+                )
+
+
+async def rescore(args: argparse.Namespace) -> RescoreStats:
+    shards = max(1, args.parallelism)
+    model = build_scorer(*get_model_with_version())
+    logger.info("Rescoring open ads with model version %s", model.version)
+
+    # Each shard holds one connection for its cursor and needs another for COPY
+    pool = await create_pool(max_size=max(DB_POOL_MAX_SIZE, 2 * shards))
+    redis_client = None
+    cache = None
+    if args.refresh_cache:
+        from redis.asyncio import Redis
+
+        redis_client = Redis.from_url(REDIS_URL)
+        cache = PredictionCache(redis_client)
+
+    stats = RescoreStats()
+    try:
+        if args.reset:
+            if not args.dry_run:
+                await RescoreCheckpointsRepository(pool).reset(args.checkpoint)
+            last_ids = {shard: 0 for shard in range(shards)}
+        else:
+            last_ids = await load_checkpoint(pool, args.checkpoint, shards)
+        await asyncio.gather(
+            *(
+                rescore_shard(pool, model, cache, shard, shards, last_ids, args, stats)
+                for shard in range(shards)
+            )
+        )
+    finally:
+        await pool.close()
+        if redis_client is not None:
+            await redis_client.aclose()
+    return stats
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-score every open ad with the current model")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument(
+        "--checkpoint", default=DEFAULT_CHECKPOINT_NAME, help="checkpoint name in rescore_checkpoints"
+    )
+    parser.add_argument("--reset", action="store_true", help="ignore the checkpoint and start over")
+    parser.add_argument("--refresh-cache", action="store_true", help="refresh simple_predict:* keys in Redis")
+    parser.add_argument("--dry-run", action="store_true", help="score without writing results or cache")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    stats = asyncio.run(rescore(args))
+    elapsed = time.perf_counter() - stats.started
+    print(
+        f"Rescored {stats.rows} ads ({stats.violations} violations) "
+        f"in {elapsed:.1f}s: {stats.rate:.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()